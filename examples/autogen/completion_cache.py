@@ -0,0 +1,310 @@
+"""
+Disk-backed completion cache and record/replay for AutoGen agents.
+Completions are keyed by model, messages and sampling parameters and stored in
+SQLite, so they are shared by every agent and process using the same file.
+A recorded conversation, including code execution results, can be replayed
+offline turn by turn.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple, Union
+
+import autogen
+from autogen import ConversableAgent
+
+if TYPE_CHECKING:
+    from conversation_compactor import ConversationCompactor
+
+MODES = ("off", "cache", "record", "replay")
+
+# llm_config keys that change what the model returns; everything else (keys, timeouts) is ignored
+SAMPLING_PARAMS = (
+    "temperature", "top_p", "max_tokens", "presence_penalty", "frequency_penalty",
+    "stop", "n", "seed", "response_format", "functions", "tools"
+)
+
+Reply = Union[str, Dict[str, Any]]
+ReplyFunc = Callable[..., Tuple[bool, Optional[Reply]]]
+
+
+def completion_key(model: str, messages: List[Dict[str, Any]], params: Dict[str, Any]) -> str:
+    """Stable hash of a completion request."""
+    payload = json.dumps(
+        {"model": model, "messages": messages, "params": params},
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CompletionCache:
+    """SQLite store of completions with least-recently-used eviction by total size."""
+
+    def __init__(self, path: str = "data/completion_cache.sqlite", max_bytes: int = 256 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        # WAL plus a busy timeout lets several processes share the file
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS completions (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                reply TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS completions_last_used ON completions (last_used)"
+        )
+        self._connection.commit()
+
+    def get(self, key: str) -> Optional[Reply]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT reply FROM completions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._connection.execute(
+                "UPDATE completions SET last_used = ? WHERE key = ?", (time.time(), key)
+            )
+            self._connection.commit()
+            self.hits += 1
+            return json.loads(row[0])
+
+    def put(self, key: str, model: str, reply: Reply) -> None:
+        data = json.dumps(reply)
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO completions VALUES (?, ?, ?, ?, ?)",
+                (key, model, data, len(data), time.time())
+            )
+            self._evict()
+            self._connection.commit()
+
+    def size(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM completions").fetchone()[0]
+
+    def _evict(self) -> None:
+        total = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM completions").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._connection.execute(
+            "SELECT key, size FROM completions ORDER BY last_used"
+        ).fetchall():
+            self._connection.execute("DELETE FROM completions WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+
+class ConversationRecording:
+    """Ordered log of each agent's completions, written in record mode and read in replay mode."""
+
+    def __init__(self, path: str, mode: str):
+        self.path = path
+        self.mode = mode
+        self.divergences = 0
+        self._lock = threading.Lock()
+        self._turns: Dict[str, List[dict]] = {}
+        self._positions: Dict[str, int] = {}
+
+        if mode == "record":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            open(path, "w").close()
+        elif mode == "replay":
+            with open(path) as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._turns.setdefault(entry["agent"], []).append(entry)
+
+    def append(self, agent_name: str, key: str, reply: Reply) -> None:
+        with self._lock:
+            turn = self._positions.get(agent_name, 0)
+            self._positions[agent_name] = turn + 1
+            with open(self.path, "a") as f:
+                f.write(json.dumps({"agent": agent_name, "turn": turn, "key": key, "reply": reply}) + "\n")
+
+    def next(self, agent_name: str, key: str) -> Reply:
+        """Return the agent's next recorded reply; the conversation follows the recording even if inputs drift."""
+        with self._lock:
+            turn = self._positions.get(agent_name, 0)
+            turns = self._turns.get(agent_name, [])
+            if turn >= len(turns):
+                raise RuntimeError(f"Recording {self.path} has no turn {turn} for agent {agent_name}")
+            self._positions[agent_name] = turn + 1
+            entry = turns[turn]
+            if entry["key"] != key:
+                self.divergences += 1
+            return entry["reply"]
+
+
+class CachedCompletions:
+    """Puts a completion cache (or recording) in front of agents' LLM replies."""
+
+    def __init__(
+        self,
+        mode: str = "cache",
+        cache: Optional[CompletionCache] = None,
+        recording_path: str = "data/conversation.jsonl",
+        compactor: Optional["ConversationCompactor"] = None
+    ):
+        """
+        Initialize the layer.
+
+        Args:
+            mode: "off", "cache" (read-through), "record" (call the model, store
+                and log every completion) or "replay" (serve the logged
+                conversation without calling the model)
+            cache: Completion store used in cache and record modes
+            recording_path: JSONL log written in record mode and read in replay mode
+            compactor: Optional compaction applied to the history before every
+                call (and before computing the cache key)
+        """
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}")
+        if cache is None and mode in ("cache", "record"):
+            cache = CompletionCache()
+        self.mode = mode
+        self.cache = cache
+        self.recording = ConversationRecording(recording_path, mode) if mode in ("record", "replay") else None
+        self.compactor = compactor
+        self.llm_calls = 0
+        self.llm_seconds = 0.0
+
+    def attach(self, *agents: ConversableAgent) -> None:
+        """Register the cached reply function on each agent, just ahead of its LLM reply."""
+        if self.mode == "off" and self.compactor is None:
+            return
+        for agent in agents:
+            position = next(
+                (i for i, entry in enumerate(agent._reply_func_list)
+                 if entry["reply_func"] is ConversableAgent.generate_oai_reply),
+                0
+            )
+            agent.register_reply([autogen.Agent, None], self._reply, position=position)
+
+    def attach_execution(
+        self,
+        agent: ConversableAgent,
+        execution_reply: ReplyFunc = ConversableAgent.generate_code_execution_reply
+    ) -> None:
+        """
+        Record or replay the code execution replies of ``agent``.
+
+        A reply function is registered just ahead of ``execution_reply`` (the
+        built-in code execution, or e.g. ``PooledCodeExecution.generate_reply``).
+        In record mode it runs the execution itself and logs the result; in
+        replay mode it returns the logged result, so no code is executed.
+        """
+        if self.mode not in ("record", "replay"):
+            return
+        position, config = next(
+            ((i, entry["config"]) for i, entry in enumerate(agent._reply_func_list)
+             if entry["reply_func"] == execution_reply),
+            (0, None)
+        )
+        agent.register_reply(
+            [autogen.Agent, None], self._execution_reply, position=position, config=(execution_reply, config)
+        )
+
+    def llm_reply(
+        self,
+        agent: ConversableAgent,
+        messages: List[Dict[str, Any]],
+        sender: Optional[autogen.Agent] = None
+    ) -> Tuple[bool, Optional[Reply]]:
+        """Call the agent's LLM (no caching) and record the wall time."""
+        started = time.perf_counter()
+        final, reply = agent.generate_oai_reply(messages=messages, sender=sender)
+        self.llm_calls += 1
+        self.llm_seconds += time.perf_counter() - started
+        return final, reply
+
+    def request_key(self, agent: ConversableAgent, messages: List[Dict[str, Any]]) -> Tuple[str, str]:
+        """Return (model, key) for the completion ``agent`` would request for ``messages``."""
+        llm_config = agent.llm_config or {}
+        config_list = llm_config.get("config_list") or [{}]
+        model = llm_config.get("model") or config_list[0].get("model", "")
+        params = {name: llm_config[name] for name in SAMPLING_PARAMS if name in llm_config}
+        return model, completion_key(model, agent._oai_system_message + messages, params)
+
+    def stats(self) -> dict:
+        stats = {"mode": self.mode, "llm_calls": self.llm_calls, "llm_seconds": round(self.llm_seconds, 2)}
+        if self.cache is not None:
+            stats.update(cache_hits=self.cache.hits, cache_misses=self.cache.misses, cache_bytes=self.cache.size())
+        if self.recording is not None and self.mode == "replay":
+            stats["replay_divergences"] = self.recording.divergences
+        if self.compactor is not None:
+            stats["compaction"] = self.compactor.totals()
+        return stats
+
+    def _reply(
+        self,
+        recipient: ConversableAgent,
+        messages: Optional[List[Dict[str, Any]]] = None,
+        sender: Optional[autogen.Agent] = None,
+        config: Optional[Any] = None
+    ) -> Tuple[bool, Optional[Reply]]:
+        if recipient.llm_config is False:
+            return False, None
+        if messages is None:
+            messages = recipient._oai_messages[sender]
+        if self.compactor is not None:
+            messages = self.compactor.compact(recipient.name, messages, recipient._oai_system_message)
+
+        model, key = self.request_key(recipient, messages)
+
+        if self.mode == "replay":
+            return True, self.recording.next(recipient.name, key)
+
+        if self.mode == "cache":
+            reply = self.cache.get(key)
+            if reply is not None:
+                return True, reply
+
+        final, reply = self.llm_reply(recipient, messages, sender)
+        if reply is not None:
+            if self.cache is not None:
+                self.cache.put(key, model, reply)
+            if self.recording is not None:
+                self.recording.append(recipient.name, key, reply)
+        return final, reply
+
+    def _execution_reply(
+        self,
+        recipient: ConversableAgent,
+        messages: Optional[List[Dict[str, Any]]] = None,
+        sender: Optional[autogen.Agent] = None,
+        config: Optional[Tuple[ReplyFunc, Any]] = None
+    ) -> Tuple[bool, Optional[Reply]]:
+        execution_reply, execution_config = config
+        if messages is None:
+            messages = recipient._oai_messages[sender]
+        # Logged separately from the agent's completions, keyed by the message holding the code
+        name = f"{recipient.name}:execution"
+        key = completion_key("code_execution", messages[-1:], {})
+
+        if self.mode == "replay":
+            reply = self.recording.next(name, key)
+            # None means no code ran at this turn; the execution reply finds none again
+            return reply is not None, reply
+
+        final, reply = execution_reply(recipient, messages=messages, sender=sender, config=execution_config)
+        self.recording.append(name, key, reply if final else None)
+        return final, reply
@@ -0,0 +1,248 @@
+"""
+Conversation compaction applied before each LLM call.
+Shortens oversized code outputs, replaces superseded versions of the same code
+and trims the oldest turns to a per-agent token budget, logging how many
+tokens each turn sends before and after.
+"""
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
+
+from termcolor import cprint
+
+CODE_BLOCK = re.compile(r"```[ \t]*(\w*)[ \t]*\r?\n(.*?)\r?\n[ \t]*```", re.DOTALL)
+FILENAME = re.compile(r"^\s*#\s*filename:\s*([\w./-]+)")
+
+# Per-message overhead of the chat format, as counted by OpenAI's cookbook
+TOKENS_PER_MESSAGE = 4
+# Rough size of a token in English text, used when tiktoken is unavailable
+CHARS_PER_TOKEN = 4
+
+
+@lru_cache(maxsize=None)
+def get_encoding():
+    """
+    The cl100k_base tokenizer, loaded on first use.
+
+    Returns None if tiktoken is not installed or its encoding file cannot be
+    downloaded (e.g. offline), in which case tokens are estimated.
+    """
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens with a local tokenizer, or estimate them from the length."""
+    encoding = get_encoding()
+    if encoding is None:
+        return len(text) // CHARS_PER_TOKEN
+    return len(encoding.encode(text))
+
+
+def count_message_tokens(messages: List[Dict[str, Any]]) -> int:
+    """Approximate prompt tokens for a list of chat messages."""
+    return sum(TOKENS_PER_MESSAGE + count_tokens(str(message.get("content") or "")) for message in messages)
+
+
+def is_execution_output(message: Dict[str, Any]) -> bool:
+    """True for code execution results and tool/function responses."""
+    content = message.get("content")
+    return (
+        message.get("role") in ("tool", "function")
+        or (isinstance(content, str) and content.startswith("exitcode:"))
+    )
+
+
+@dataclass
+class CompactionStats:
+    """Token counts for one compacted LLM call."""
+    agent: str
+    tokens_before: int
+    tokens_after: int
+    truncated_outputs: int
+    superseded_blocks: int
+    dropped_messages: int
+
+
+class ConversationCompactor:
+    """Shrinks the message history an agent sends to the model."""
+
+    def __init__(
+        self,
+        budget: int = 6000,
+        budgets: Optional[Dict[str, int]] = None,
+        max_output_tokens: int = 400,
+        keep_recent: int = 4,
+        summarize: Optional[Callable[[str], str]] = None,
+        verbose: bool = True
+    ):
+        """
+        Initialize the compactor.
+
+        Args:
+            budget: Default maximum prompt tokens per call
+            budgets: Per-agent overrides of ``budget`` by agent name
+            max_output_tokens: Execution outputs longer than this are shortened
+            keep_recent: Most recent messages never dropped or shortened
+            summarize: Optional function (e.g. a cheap LLM call) summarizing an
+                oversized output; head-and-tail truncation is used otherwise
+            verbose: Print tokens before and after compaction for every call
+        """
+        self.budget = budget
+        self.budgets = budgets or {}
+        self.max_output_tokens = max_output_tokens
+        self.keep_recent = keep_recent
+        self.summarize = summarize
+        self.verbose = verbose
+        self.turns: List[CompactionStats] = []
+
+    def compact(
+        self,
+        agent_name: str,
+        messages: List[Dict[str, Any]],
+        system_messages: Optional[List[Dict[str, Any]]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Return a compacted copy of ``messages``; the input is not modified.
+
+        The first message (the task) and the last ``keep_recent`` messages
+        are kept verbatim. ``system_messages`` count toward the budget but are
+        never changed.
+        """
+        system_messages = system_messages or []
+        messages = [dict(message) for message in messages]
+        tokens_before = count_message_tokens(system_messages + messages)
+        protected = max(1, len(messages) - self.keep_recent)
+
+        truncated = self._shorten_outputs(messages, protected)
+        superseded = self._drop_superseded_code(messages, protected)
+        messages, dropped = self._fit_budget(
+            messages, self.budgets.get(agent_name, self.budget) - count_message_tokens(system_messages)
+        )
+
+        stats = CompactionStats(
+            agent=agent_name,
+            tokens_before=tokens_before,
+            tokens_after=count_message_tokens(system_messages + messages),
+            truncated_outputs=truncated,
+            superseded_blocks=superseded,
+            dropped_messages=dropped
+        )
+        self.turns.append(stats)
+        if self.verbose:
+            cprint(
+                f"[compaction] {agent_name}: {stats.tokens_before} -> {stats.tokens_after} tokens "
+                f"({truncated} outputs shortened, {superseded} code blocks superseded, {dropped} messages dropped)",
+                "yellow"
+            )
+        return messages
+
+    def totals(self) -> dict:
+        """Token totals over all compacted calls."""
+        before = sum(turn.tokens_before for turn in self.turns)
+        after = sum(turn.tokens_after for turn in self.turns)
+        return {
+            "calls": len(self.turns),
+            "tokens_before": before,
+            "tokens_after": after,
+            "saved_ratio": round(1 - after / before, 3) if before else 0.0
+        }
+
+    def _shorten_outputs(self, messages: List[Dict[str, Any]], protected: int) -> int:
+        shortened = 0
+        for message in messages[1:protected]:
+            content = message.get("content")
+            if not is_execution_output(message) or not isinstance(content, str):
+                continue
+            encoding = get_encoding()
+            tokens = encoding.encode(content) if encoding is not None else None
+            total = len(tokens) if tokens is not None else count_tokens(content)
+            if total <= self.max_output_tokens:
+                continue
+
+            if self.summarize is not None:
+                message["content"] = f"[summary of {total}-token output]\n{self.summarize(content)}"
+            else:
+                half = self.max_output_tokens // 2
+                if tokens is not None:
+                    head, tail = encoding.decode(tokens[:half]), encoding.decode(tokens[len(tokens) - half:])
+                else:
+                    chars = half * CHARS_PER_TOKEN
+                    head, tail = content[:chars], content[len(content) - chars:]
+                message["content"] = (
+                    head
+                    + f"\n[... {total - 2 * half} tokens of output truncated ...]\n"
+                    + tail
+                )
+            shortened += 1
+        return shortened
+
+    def _drop_superseded_code(self, messages: List[Dict[str, Any]], protected: int) -> int:
+        """Replace code blocks rewritten later (same filename or identical code) with a short note."""
+        latest = {}
+        for position, message in enumerate(messages):
+            content = message.get("content")
+            if isinstance(content, str):
+                for language, code in CODE_BLOCK.findall(content):
+                    latest[self._block_identity(code)] = position
+
+        superseded = 0
+
+        def replace(match: re.Match, position: int) -> str:
+            nonlocal superseded
+            identity = self._block_identity(match.group(2))
+            if latest[identity] == position:
+                return match.group(0)
+            superseded += 1
+            if identity.startswith("file:"):
+                note = f"# [{identity[5:]} superseded by a later version below]"
+            else:
+                note = "# [same code repeated below]"
+            return f"```{match.group(1)}\n{note}\n```"
+
+        for position in range(1, protected):
+            content = messages[position].get("content")
+            if isinstance(content, str) and "```" in content:
+                messages[position]["content"] = CODE_BLOCK.sub(lambda m: replace(m, position), content)
+        return superseded
+
+    def _fit_budget(self, messages: List[Dict[str, Any]], budget: int):
+        """
+        Drop the oldest messages after the first until the history fits ``budget``.
+
+        The note inserted in their place counts toward the budget too, so room
+        for it is reserved before any message is dropped.
+        """
+        total = count_message_tokens(messages)
+        if total <= budget:
+            return messages, 0
+
+        # The note never names more messages than the history holds
+        budget -= count_message_tokens([self._omission_note(len(messages))])
+        keep_tail = min(self.keep_recent, len(messages) - 1)
+        dropped = 0
+        while total > budget and len(messages) - 1 > keep_tail:
+            total -= count_message_tokens([messages.pop(1)])
+            dropped += 1
+            # A tool result is meaningless without the call that produced it
+            while len(messages) - 1 > keep_tail and messages[1].get("role") in ("tool", "function"):
+                total -= count_message_tokens([messages.pop(1)])
+                dropped += 1
+
+        if dropped:
+            messages.insert(1, self._omission_note(dropped))
+        return messages, dropped
+
+    @staticmethod
+    def _omission_note(dropped: int) -> Dict[str, Any]:
+        return {"role": "user", "content": f"[{dropped} earlier messages omitted to fit the context budget]"}
+
+    @staticmethod
+    def _block_identity(code: str) -> str:
+        match = FILENAME.match(code)
+        return f"file:{match.group(1)}" if match else code.strip()
@@ -0,0 +1,437 @@
+"""
+Pool of pre-warmed worker processes for running agent code blocks.
+Each worker imports numpy/pandas/matplotlib once, runs in its own scratch
+directory under CPU, memory and wall-time limits, and streams output back
+while it runs. Blocks from one reply run in order; with ``parallel=True``,
+blocks that share no file or string literal run at the same time.
+"""
+
+import os
+import re
+import ast
+import sys
+import json
+import time
+import queue
+import shutil
+import signal
+import resource
+import itertools
+import threading
+import subprocess
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import autogen
+from autogen.code_utils import UNKNOWN, extract_code
+from termcolor import cprint
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "execution_worker.py")
+PYTHON_LANGUAGES = ("python", "py", "")
+SHELL_LANGUAGES = ("sh", "bash", "shell")
+FILENAME_PATTERN = re.compile(r"^\s*#\s*filename:\s*([\w./-]+)", re.MULTILINE)
+
+OutputCallback = Callable[[int, str, str], None]
+
+
+@dataclass
+class BlockResult:
+    """Outcome of one code block."""
+    index: int
+    language: str
+    exitcode: int
+    output: str
+    seconds: float
+    worker: int
+
+
+def print_output(index: int, stream: str, data: str) -> None:
+    """Default output callback: print each chunk prefixed with its block number."""
+    for line in data.splitlines():
+        cprint(f"[block {index}] {line}", "red" if stream == "stderr" else None)
+
+
+def code_filename(code: str) -> Optional[str]:
+    """Filename declared by a ``# filename: <name>`` first line, as AutoGen uses."""
+    first_line = code.lstrip().split("\n", 1)[0]
+    match = FILENAME_PATTERN.match(first_line)
+    return match.group(1) if match else None
+
+
+def block_names(language: str, code: str) -> Optional[Set[str]]:
+    """
+    String literals of a Python block plus its declared filename, or None
+    when they cannot be known (shell blocks, code that does not parse).
+    """
+    if language not in PYTHON_LANGUAGES:
+        return None
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return None
+    names = {node.value for node in ast.walk(tree) if isinstance(node, ast.Constant) and isinstance(node.value, str)}
+    filename = code_filename(code)
+    if filename:
+        names.add(filename)
+    return names
+
+
+def plan_batches(blocks: List[Tuple[str, str]]) -> List[List[int]]:
+    """
+    Group block indices into batches that can run in parallel.
+
+    Two blocks in a batch share no file name and no string literal, so a
+    block reading ``"data.csv"`` never runs alongside the block writing it.
+    Shell blocks and Python that does not parse run alone. Files named only
+    by computed strings are not detected, which is why parallel execution
+    is opt-in.
+    """
+    batches, current, names = [], [], set()
+    for index, (language, code) in enumerate(blocks):
+        block = block_names(language, code)
+        if current and (block is None or block & names):
+            batches.append(current)
+            current, names = [], set()
+        current.append(index)
+        if block is None:
+            batches.append(current)
+            current, names = [], set()
+        else:
+            names |= block
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _kill_group(process: subprocess.Popen) -> None:
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+def _signature(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.lstat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _copy_file(source: str, target: str) -> None:
+    """Copy one file or symlink with its metadata, replacing whatever is at target."""
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    if os.path.isdir(target) and not os.path.islink(target):
+        shutil.rmtree(target)
+    elif os.path.lexists(target):
+        os.remove(target)
+    shutil.copy2(source, target, follow_symlinks=False)
+
+
+class _Worker:
+    """One warm Python process with its scratch directory."""
+
+    def __init__(self, worker_id: int, scratch_dir: str, memory_mb: int, preload: Tuple[str, ...]):
+        self.worker_id = worker_id
+        self.scratch_dir = scratch_dir
+        self.jobs = 0
+        self.messages: "queue.Queue[Optional[dict]]" = queue.Queue()
+        os.makedirs(scratch_dir, exist_ok=True)
+        self.process = subprocess.Popen(
+            [sys.executable, WORKER_SCRIPT, scratch_dir, str(memory_mb), ",".join(preload)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            bufsize=1,
+            start_new_session=True
+        )
+        self._ready = False
+        threading.Thread(target=self._read, daemon=True).start()
+
+    def _read(self) -> None:
+        for line in self.process.stdout:
+            self.messages.put(json.loads(line))
+        self.messages.put(None)  # process exited
+
+    def wait_ready(self, timeout: float) -> bool:
+        if not self._ready:
+            try:
+                message = self.messages.get(timeout=timeout)
+            except queue.Empty:
+                return False
+            self._ready = message is not None and message.get("type") == "ready"
+        return self._ready
+
+    def send(self, job: dict) -> None:
+        self.process.stdin.write(json.dumps(job) + "\n")
+        self.process.stdin.flush()
+        self.jobs += 1
+
+    def kill(self) -> None:
+        _kill_group(self.process)
+        self.process.wait()
+
+
+class ExecutionPool:
+    """Runs code blocks on pre-warmed, resource-limited worker processes."""
+
+    def __init__(
+        self,
+        work_dir: str = "coding",
+        size: int = 4,
+        timeout: float = 60,
+        cpu_seconds: int = 60,
+        memory_mb: int = 2048,
+        preload: Tuple[str, ...] = ("numpy", "pandas", "matplotlib.pyplot"),
+        max_jobs_per_worker: int = 50,
+        on_output: Optional[OutputCallback] = print_output,
+        parallel: bool = False
+    ):
+        """
+        Start the pool; workers warm up in the background.
+
+        Args:
+            work_dir: Shared directory; files created by blocks are moved here
+            size: Number of worker processes (and blocks run at once)
+            timeout: Wall-clock seconds per block before the worker is killed
+            cpu_seconds: CPU seconds per block
+            memory_mb: Address-space limit per worker (0 for none)
+            preload: Modules imported once per worker
+            max_jobs_per_worker: Replace a worker after this many blocks to drop leaked state
+            on_output: Callback(block index, "stdout"/"stderr", text) for streamed output
+            parallel: Run independent blocks of one reply at the same time
+                (see ``plan_batches``); by default blocks run one by one
+        """
+        self.work_dir = os.path.abspath(work_dir)
+        self.size = size
+        self.timeout = timeout
+        self.cpu_seconds = cpu_seconds
+        self.memory_mb = memory_mb
+        self.preload = tuple(preload)
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.on_output = on_output
+        self.parallel = parallel
+        self._job_ids = itertools.count()
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=size)
+        os.makedirs(self.work_dir, exist_ok=True)
+        for worker_id in range(size):
+            self._idle.put(self._start_worker(worker_id))
+
+    def execute_blocks(self, blocks: List[Tuple[str, str]]) -> List[BlockResult]:
+        """
+        Run (language, code) blocks in order, or in parallel where they are
+        independent if the pool was created with ``parallel=True``.
+
+        Batches from ``plan_batches`` run one after another; execution stops
+        after the first batch containing a failed block, as AutoGen does.
+
+        Returns:
+            BlockResult for every block that ran, in block order
+        """
+        results = []
+        batches = plan_batches(blocks) if self.parallel else [[index] for index in range(len(blocks))]
+        for batch in batches:
+            futures = [self._executor.submit(self.execute, index, *blocks[index]) for index in batch]
+            batch_results = [future.result() for future in futures]
+            results.extend(batch_results)
+            if any(result.exitcode != 0 for result in batch_results):
+                break
+        return results
+
+    def execute(self, index: int, language: str, code: str) -> BlockResult:
+        """Run one block on the next idle worker."""
+        worker = self._idle.get()
+        started = time.perf_counter()
+        try:
+            inputs = self._prepare_scratch(worker.scratch_dir)
+            if language in PYTHON_LANGUAGES:
+                exitcode, output = self._run_python(worker, index, code)
+            elif language in SHELL_LANGUAGES:
+                exitcode, output = self._run_shell(worker.scratch_dir, index, code)
+            else:
+                exitcode, output = 1, f"unknown language {language}"
+            self._collect_outputs(worker.scratch_dir, inputs)
+        finally:
+            if worker.process.poll() is not None or worker.jobs >= self.max_jobs_per_worker:
+                worker.kill()
+                worker = self._start_worker(worker.worker_id)
+            self._idle.put(worker)
+        return BlockResult(index, language, exitcode, output, time.perf_counter() - started, worker.worker_id)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown()
+        while not self._idle.empty():
+            self._idle.get().kill()
+
+    def _start_worker(self, worker_id: int) -> _Worker:
+        scratch_dir = os.path.join(self.work_dir, ".scratch", f"worker-{worker_id}")
+        return _Worker(worker_id, scratch_dir, self.memory_mb, self.preload)
+
+    def _run_python(self, worker: _Worker, index: int, code: str) -> Tuple[int, str]:
+        deadline = time.monotonic() + self.timeout
+        if not worker.wait_ready(timeout=max(0.0, deadline - time.monotonic())):
+            return 1, "worker failed to start"
+
+        job_id = next(self._job_ids)
+        worker.send({
+            "id": job_id,
+            "code": code,
+            "filename": code_filename(code),
+            "cwd": worker.scratch_dir,
+            "cpu_seconds": self.cpu_seconds
+        })
+
+        output = []
+        while True:
+            try:
+                message = worker.messages.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                worker.kill()
+                output.append("Timeout")
+                return 124, "".join(output)
+
+            if message is None:
+                # Killed by the CPU or memory limit (or crashed)
+                returncode = worker.process.wait()
+                output.append(f"\nworker exited with code {returncode} (resource limit exceeded?)")
+                return 1, "".join(output)
+            if message.get("id") != job_id:
+                continue
+            if message["type"] == "done":
+                return message["exitcode"], "".join(output)
+
+            output.append(message["data"])
+            if self.on_output:
+                self.on_output(index, message["type"], message["data"])
+
+    def _run_shell(self, scratch_dir: str, index: int, code: str) -> Tuple[int, str]:
+        process = subprocess.Popen(
+            ["bash", "-c", code],
+            cwd=scratch_dir,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            preexec_fn=self._limit_child,
+            start_new_session=True
+        )
+        timer = threading.Timer(self.timeout, _kill_group, args=(process,))
+        timer.start()
+        output = []
+        try:
+            for line in process.stdout:
+                output.append(line)
+                if self.on_output:
+                    self.on_output(index, "stdout", line)
+            exitcode = process.wait()
+        finally:
+            timer.cancel()
+        if exitcode == -signal.SIGKILL:
+            output.append("Timeout")
+            exitcode = 124
+        return exitcode, "".join(output)
+
+    def _limit_child(self) -> None:
+        resource.setrlimit(resource.RLIMIT_CPU, (self.cpu_seconds, self.cpu_seconds + 1))
+        if self.memory_mb:
+            limit = self.memory_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    def _prepare_scratch(self, scratch_dir: str) -> Dict[str, Tuple[int, int]]:
+        """
+        Bring the scratch directory in line with the shared work_dir.
+
+        The scratch directory is kept between blocks, so only files that
+        changed in work_dir since the worker's last block are copied, and
+        files that are gone from work_dir (or were left behind by an earlier
+        block) are removed. Copies rather than links, so a block cannot change
+        work_dir (or a block running next to it) until ``_collect_outputs``.
+
+        Returns:
+            (size, mtime_ns) of every synced file, by path relative to scratch_dir
+        """
+        inputs = dict(self._tree_files(self.work_dir, skip=".scratch"))
+        for relative, signature in self._tree_files(scratch_dir):
+            if inputs.get(relative) != signature:
+                os.remove(os.path.join(scratch_dir, relative))
+        present = dict(self._tree_files(scratch_dir))
+        for relative, signature in inputs.items():
+            if relative not in present:
+                _copy_file(os.path.join(self.work_dir, relative), os.path.join(scratch_dir, relative))
+        return inputs
+
+    def _collect_outputs(self, scratch_dir: str, inputs: Dict[str, Tuple[int, int]]) -> None:
+        """Copy files a block created or modified into work_dir, and delete the ones it removed."""
+        outputs = dict(self._tree_files(scratch_dir))
+        for relative, signature in outputs.items():
+            if inputs.get(relative) != signature:
+                # copy2 keeps size and mtime, so the next sync sees scratch and work_dir as equal
+                _copy_file(os.path.join(scratch_dir, relative), os.path.join(self.work_dir, relative))
+        for relative, signature in inputs.items():
+            target = os.path.join(self.work_dir, relative)
+            if relative not in outputs and _signature(target) == signature:
+                os.remove(target)  # unless another block has replaced it meanwhile
+
+    @staticmethod
+    def _tree_files(root: str, skip: Optional[str] = None):
+        """Yield (relative path, (size, mtime_ns)) for every file and symlink under root."""
+        for directory, dirs, files in os.walk(root):
+            if skip and directory == root and skip in dirs:
+                dirs.remove(skip)
+            links = [name for name in dirs if os.path.islink(os.path.join(directory, name))]
+            for name in files + links:
+                path = os.path.join(directory, name)
+                yield os.path.relpath(path, root), _signature(path)
+
+
+class PooledCodeExecution:
+    """Reply function running the code blocks in a message on an ExecutionPool."""
+
+    def __init__(self, pool: ExecutionPool):
+        self.pool = pool
+        self.blocks_run = 0
+        self.seconds = 0.0
+
+    def attach(self, agent) -> None:
+        """Register on ``agent`` in place of its built-in code execution reply.
+
+        The reply is inserted where ``generate_code_execution_reply`` sits, so
+        the termination check registered ahead of it still runs first.
+        """
+        position = next(
+            (i for i, entry in enumerate(agent._reply_func_list)
+             if entry["reply_func"] is autogen.ConversableAgent.generate_code_execution_reply),
+            0
+        )
+        agent.register_reply([autogen.Agent, None], self.generate_reply, position=position)
+
+    def generate_reply(
+        self,
+        recipient,
+        messages: Optional[List[Dict[str, Any]]] = None,
+        sender=None,
+        config: Optional[Any] = None
+    ) -> Tuple[bool, Optional[str]]:
+        """Run the code blocks of the last message, like ``generate_code_execution_reply``."""
+        if messages is None:
+            messages = recipient._oai_messages[sender]
+        if not messages or not messages[-1].get("content"):
+            return False, None
+
+        blocks = extract_code(messages[-1]["content"])
+        if len(blocks) == 1 and blocks[0][0] == UNKNOWN:
+            return False, None
+
+        started = time.perf_counter()
+        results = self.pool.execute_blocks(blocks)
+        self.blocks_run += len(results)
+        self.seconds += time.perf_counter() - started
+
+        exitcode = next((result.exitcode for result in results if result.exitcode != 0), 0)
+        logs = "".join(
+            f"\n[block {result.index}: {result.seconds:.2f}s on worker {result.worker}]\n{result.output}"
+            for result in results
+        )
+        status = "execution succeeded" if exitcode == 0 else "execution failed"
+        return True, f"exitcode: {exitcode} ({status})\nCode output: {logs}"
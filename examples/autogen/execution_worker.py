@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Worker process for ExecutionPool.
+Imports heavy libraries once, then runs Python code blocks sent as JSON lines
+on stdin inside its scratch directory, streaming output back as JSON lines on
+stdout.
+
+Usage (started by ExecutionPool):
+    python execution_worker.py <scratch_dir> <memory_mb> <preload,modules>
+"""
+
+import os
+import sys
+import json
+import time
+import resource
+import importlib
+import traceback
+
+# Protocol messages use the real stdout; anything else writing to fd 1 goes to stderr instead
+_protocol = os.fdopen(os.dup(1), "w", buffering=1)
+os.dup2(2, 1)
+
+
+def send(message: dict) -> None:
+    _protocol.write(json.dumps(message) + "\n")
+
+
+class StreamWriter:
+    """File-like object forwarding writes as protocol messages."""
+
+    def __init__(self, stream: str):
+        self.stream = stream
+        self.job_id = None
+
+    def write(self, data: str) -> int:
+        if data:
+            send({"id": self.job_id, "type": self.stream, "data": data})
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def isatty(self) -> bool:
+        return False
+
+
+def preload(modules) -> None:
+    os.environ.setdefault("MPLBACKEND", "Agg")
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except Exception:
+            pass  # optional; the code block will report the import error itself
+
+
+def forget_modules(directory: str) -> None:
+    """Drop modules imported from ``directory`` so the next job imports its own copy."""
+    prefix = os.path.join(directory, "")
+    for name, module in list(sys.modules.items()):
+        path = getattr(module, "__file__", None)
+        if path and os.path.abspath(path).startswith(prefix):
+            del sys.modules[name]
+
+
+def run(job: dict, stdout: StreamWriter, stderr: StreamWriter) -> int:
+    cwd = job["cwd"]
+    os.chdir(cwd)
+    # Like ``python script.py``, let the block import modules saved next to it
+    sys.path.insert(0, cwd)
+    importlib.invalidate_caches()
+
+    # CPU limit applies to this job only: allow cpu_seconds beyond what the worker has used so far
+    if job.get("cpu_seconds"):
+        used = resource.getrusage(resource.RUSAGE_SELF)
+        soft = int(used.ru_utime + used.ru_stime) + job["cpu_seconds"]
+        _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+        resource.setrlimit(resource.RLIMIT_CPU, (soft if hard == resource.RLIM_INFINITY else min(soft, hard), hard))
+
+    filename = job.get("filename")
+    if filename:
+        with open(filename, "w") as f:
+            f.write(job["code"])
+
+    stdout.job_id = stderr.job_id = job["id"]
+    sys.stdout, sys.stderr = stdout, stderr
+    try:
+        exec(compile(job["code"], filename or "<code>", "exec"), {"__name__": "__main__"})
+        return 0
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except BaseException:
+        traceback.print_exc()
+        return 1
+    finally:
+        sys.stdout, sys.stderr = sys.__stdout__, sys.__stderr__
+        if cwd in sys.path:
+            sys.path.remove(cwd)
+        forget_modules(cwd)
+        if "matplotlib.pyplot" in sys.modules:
+            sys.modules["matplotlib.pyplot"].close("all")
+
+
+def main():
+    scratch_dir, memory_mb, modules = sys.argv[1], int(sys.argv[2]), sys.argv[3]
+    preload([name for name in modules.split(",") if name])
+    if memory_mb:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    os.chdir(scratch_dir)
+
+    stdout, stderr = StreamWriter("stdout"), StreamWriter("stderr")
+    send({"type": "ready", "pid": os.getpid()})
+    for line in sys.stdin:
+        job = json.loads(line)
+        started = time.perf_counter()
+        exitcode = run(job, stdout, stderr)
+        send({"id": job["id"], "type": "done", "exitcode": exitcode, "seconds": time.perf_counter() - started})
+
+
+if __name__ == "__main__":
+    main()
@@ -5,10 +5,14 @@ This example shows how multiple agents can work together to solve a complex task
 """
 
 import os
+import argparse
 import autogen
 from dotenv import find_dotenv, load_dotenv
 from termcolor import cprint
 
+from completion_cache import MODES, CachedCompletions, CompletionCache
+from execution_pool import ExecutionPool, PooledCodeExecution
+
 # Load environment variables
 dotenv_path = find_dotenv()
 print(f"Loading environment variables from: {dotenv_path}")
@@ -30,34 +34,98 @@ assistant_config = {
     "timeout": 120,
 }
 
-# Initialize agents
-assistant = autogen.AssistantAgent(
-    name="Assistant",
-    llm_config=assistant_config,
-    system_message="You are a helpful AI assistant focused on problem-solving."
-)
-
-coder = autogen.AssistantAgent(
-    name="Coder",
-    llm_config=assistant_config,
-    system_message="You are an expert programmer who writes clean, efficient code."
-)
-
-user_proxy = autogen.UserProxyAgent(
-    name="User_Proxy",
-    human_input_mode="NEVER",
-    max_consecutive_auto_reply=10,
-    is_termination_msg=lambda x: x.get("content", "").rstrip().endswith("TERMINATE"),
-    code_execution_config={
-        "work_dir": "coding",
-        "use_docker": False,
-    },
-)
-
-def main():
+def create_agents():
+    """Create the assistant, coder and user proxy agents."""
+    assistant = autogen.AssistantAgent(
+        name="Assistant",
+        llm_config=assistant_config,
+        system_message="You are a helpful AI assistant focused on problem-solving."
+    )
+
+    coder = autogen.AssistantAgent(
+        name="Coder",
+        llm_config=assistant_config,
+        system_message="You are an expert programmer who writes clean, efficient code."
+    )
+
+    user_proxy = autogen.UserProxyAgent(
+        name="User_Proxy",
+        human_input_mode="NEVER",
+        max_consecutive_auto_reply=10,
+        is_termination_msg=lambda x: x.get("content", "").rstrip().endswith("TERMINATE"),
+        code_execution_config={
+            "work_dir": "coding",
+            "use_docker": False,
+        },
+    )
+    return assistant, coder, user_proxy
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='AutoGen multi-agent example')
+    parser.add_argument('--cache-mode', choices=MODES, default='off',
+                        help='off (default), cache (reuse completions), record (log the conversation) '
+                             'or replay (re-run a logged conversation offline). Caching returns the same '
+                             'answer every time, although the agents sample at temperature 0.7')
+    parser.add_argument('--cache-path', default='data/completion_cache.sqlite',
+                        help='SQLite file holding cached completions')
+    parser.add_argument('--cache-max-mb', type=int, default=256,
+                        help='Maximum size of the completion cache')
+    parser.add_argument('--recording', default='data/conversation.jsonl',
+                        help='Conversation log written by record mode and read by replay mode')
+    parser.add_argument('--exec-workers', type=int, default=4,
+                        help='Pre-warmed code execution workers (0 uses AutoGen\'s built-in execution)')
+    parser.add_argument('--exec-timeout', type=float, default=60,
+                        help='Wall-clock seconds allowed per code block')
+    parser.add_argument('--exec-memory-mb', type=int, default=2048,
+                        help='Memory limit per execution worker')
+    parser.add_argument('--exec-parallel', action='store_true',
+                        help='Run code blocks of one reply in parallel when they share no file or string literal')
+    parser.add_argument('--context-budget', type=int, default=6000,
+                        help='Maximum prompt tokens per LLM call (0 disables compaction)')
+    parser.add_argument('--max-output-tokens', type=int, default=400,
+                        help='Code outputs longer than this are shortened in older turns')
+    return parser.parse_args()
+
+def main(args):
     """
     Main function to demonstrate multi-agent collaboration.
     """
+    if args.cache_mode == 'replay' and not config_list[0]['api_key']:
+        # Replay never calls the API, but the OpenAI client still requires a key to be constructed
+        config_list[0]['api_key'] = 'offline-replay'
+
+    assistant, coder, user_proxy = create_agents()
+
+    # assistant and coder share one completion cache
+    cache = None
+    if args.cache_mode in ('cache', 'record'):
+        cache = CompletionCache(args.cache_path, max_bytes=args.cache_max_mb * 1024 * 1024)
+    # Long histories are compacted before each call (and before the cache key is computed)
+    compactor = None
+    if args.context_budget > 0:
+        from conversation_compactor import ConversationCompactor
+        compactor = ConversationCompactor(budget=args.context_budget, max_output_tokens=args.max_output_tokens)
+    completions = CachedCompletions(args.cache_mode, cache, args.recording, compactor)
+    completions.attach(assistant, coder)
+
+    # Code blocks run on warm worker processes instead of a fresh interpreter each
+    # (replay serves the recorded execution results, so no workers are needed)
+    pool = execution = None
+    if args.exec_workers > 0 and args.cache_mode != 'replay':
+        pool = ExecutionPool(
+            work_dir="coding",
+            size=args.exec_workers,
+            timeout=args.exec_timeout,
+            cpu_seconds=int(args.exec_timeout),
+            memory_mb=args.exec_memory_mb,
+            parallel=args.exec_parallel
+        )
+        execution = PooledCodeExecution(pool)
+        execution.attach(user_proxy)
+        completions.attach_execution(user_proxy, execution.generate_reply)
+    else:
+        completions.attach_execution(user_proxy)
+
     # Example task: Create a simple data analysis script
     task = """
     Please help me with the following task:
@@ -70,22 +138,32 @@ def main():
     """
 
     # Start the conversation
-    user_proxy.initiate_chat(
-        assistant,
-        message=task
-    )
+    try:
+        user_proxy.initiate_chat(
+            assistant,
+            message=task
+        )
+    finally:
+        if pool is not None:
+            pool.shutdown()
 
     # The conversation will automatically continue between agents
     # Each agent will contribute based on their expertise
     # The conversation ends when a termination message is detected
     # or max_consecutive_auto_reply is reached
 
+    cprint(f"\nCompletions: {completions.stats()}", "cyan")
+    if execution is not None:
+        cprint(f"Code execution: {execution.blocks_run} blocks in {execution.seconds:.2f}s", "cyan")
+
 if __name__ == "__main__":
+    args = parse_arguments()
+
     # Create coding directory if it doesn't exist
     os.makedirs("coding", exist_ok=True)
 
     print("\nStarting AutoGen Multi-Agent Example...")
     print("----------------------------------------")
-    main()
+    main(args)
     print("----------------------------------------")
     print("Example completed. Check the 'coding' directory for output files.")
@@ -0,0 +1,67 @@
+"""
+Tests for the completion cache and conversation record/replay, using a stub
+agent instead of a model.
+
+Run with:
+    python -m pytest test_completion_cache.py
+"""
+
+from completion_cache import CachedCompletions, CompletionCache
+
+
+class StubAgent:
+    """The attributes of a ConversableAgent the completion layer reads, with a counting LLM."""
+
+    def __init__(self, name: str = "Coder", temperature: float = 0.0):
+        self.name = name
+        self.llm_config = {"config_list": [{"model": "gpt-4"}], "temperature": temperature}
+        self._oai_system_message = [{"role": "system", "content": "You write code."}]
+        self.calls = 0
+
+    def generate_oai_reply(self, messages=None, sender=None, config=None):
+        self.calls += 1
+        return True, f"reply {self.calls} to {messages[-1]['content']}"
+
+
+def ask(completions: CachedCompletions, agent: StubAgent, content: str):
+    return completions._reply(agent, [{"role": "user", "content": content}])[1]
+
+
+def test_cache_mode_reuses_identical_requests(tmp_path):
+    cache = CompletionCache(str(tmp_path / "cache.sqlite"))
+    completions = CachedCompletions("cache", cache)
+    agent = StubAgent()
+
+    first = ask(completions, agent, "plot it")
+    second = ask(completions, agent, "plot it")
+    other = ask(completions, StubAgent(temperature=0.5), "plot it")
+
+    assert first == second == "reply 1 to plot it"
+    assert other == "reply 1 to plot it" and agent.calls == 1
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_cache_evicts_least_recently_used_entries_by_size(tmp_path):
+    cache = CompletionCache(str(tmp_path / "cache.sqlite"), max_bytes=50)
+    cache.put("a", "gpt-4", "x" * 20)
+    cache.put("b", "gpt-4", "y" * 20)
+    cache.get("a")
+    cache.put("c", "gpt-4", "z" * 20)
+
+    assert cache.get("a") == "x" * 20
+    assert cache.get("b") is None
+    assert cache.size() <= 50
+
+
+def test_replay_returns_the_recorded_conversation_without_calling_the_model(tmp_path):
+    recording = str(tmp_path / "conversation.jsonl")
+    recorder = CachedCompletions("record", CompletionCache(str(tmp_path / "cache.sqlite")), recording)
+    recorded = [ask(recorder, StubAgent(), prompt) for prompt in ("plan", "code")]
+
+    agent = StubAgent()
+    replayer = CachedCompletions("replay", recording_path=recording)
+    replayed = [ask(replayer, agent, "plan"), ask(replayer, agent, "code, changed")]
+
+    assert replayed == recorded
+    assert agent.calls == 0
+    assert replayer.stats()["replay_divergences"] == 1
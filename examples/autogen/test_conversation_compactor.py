@@ -0,0 +1,78 @@
+"""
+Tests for conversation compaction, with tokens estimated from text length.
+
+Run with:
+    python -m pytest test_conversation_compactor.py
+"""
+
+import pytest
+
+import conversation_compactor
+from conversation_compactor import ConversationCompactor, count_message_tokens
+
+
+@pytest.fixture(autouse=True)
+def estimated_tokens(monkeypatch):
+    """Count tokens as len(text) // 4 so budgets do not depend on tiktoken."""
+    monkeypatch.setattr(conversation_compactor, "get_encoding", lambda: None)
+
+
+def message(role: str, words: int, label: str = "") -> dict:
+    return {"role": role, "content": f"{label} " + "word " * words}
+
+
+def test_history_within_budget_is_unchanged():
+    messages = [message("user", 10, "task"), message("assistant", 10)]
+
+    compacted = ConversationCompactor(budget=1000, verbose=False).compact("Coder", messages)
+
+    assert compacted == messages
+
+
+def test_trimmed_history_fits_the_budget_including_the_omission_note():
+    messages = [message("user", 20, "task")] + [message("assistant", 50, f"turn {i}") for i in range(12)]
+    compactor = ConversationCompactor(budget=400, keep_recent=2, verbose=False)
+
+    for budget in range(200, 420, 7):
+        compactor.budget = budget
+        compacted = compactor.compact("Coder", messages)
+
+        assert count_message_tokens(compacted) <= budget
+        assert compacted[0] == messages[0] and compacted[-2:] == messages[-2:]
+        assert "earlier messages omitted" in compacted[1]["content"]
+
+
+def test_system_messages_count_toward_the_budget():
+    messages = [message("user", 20, "task")] + [message("assistant", 50) for _ in range(6)]
+    system = [message("system", 100)]
+    compactor = ConversationCompactor(budget=300, keep_recent=1, verbose=False)
+
+    compacted = compactor.compact("Coder", messages, system)
+
+    assert count_message_tokens(system + compacted) <= 300
+    assert compactor.turns[-1].dropped_messages > 0
+
+
+def test_old_execution_outputs_are_shortened_and_recent_ones_kept():
+    long_output = "exitcode: 0 (execution succeeded)\nCode output: " + "line\n" * 400
+    messages = [message("user", 5, "task"), {"role": "user", "content": long_output},
+                message("assistant", 5), {"role": "user", "content": long_output}]
+    compactor = ConversationCompactor(budget=10_000, max_output_tokens=40, keep_recent=1, verbose=False)
+
+    compacted = compactor.compact("Coder", messages)
+
+    assert "tokens of output truncated" in compacted[1]["content"]
+    assert compacted[3]["content"] == long_output
+    assert compactor.turns[-1].truncated_outputs == 1
+
+
+def test_superseded_code_versions_are_replaced_with_a_note():
+    first = "```python\n# filename: plot.py\nprint(1)\n```"
+    second = "```python\n# filename: plot.py\nprint(2)\n```"
+    messages = [message("user", 5, "task"), {"role": "assistant", "content": first},
+                message("user", 5), {"role": "assistant", "content": second}]
+
+    compacted = ConversationCompactor(budget=10_000, keep_recent=1, verbose=False).compact("Coder", messages)
+
+    assert "plot.py superseded by a later version below" in compacted[1]["content"]
+    assert compacted[3]["content"] == second
@@ -0,0 +1,72 @@
+"""
+Tests for the pre-warmed code execution pool. Workers are real subprocesses
+started without preloaded modules.
+
+Run with:
+    python -m pytest test_execution_pool.py
+"""
+
+import os
+
+import pytest
+
+from execution_pool import ExecutionPool
+
+
+@pytest.fixture
+def work_dir(tmp_path):
+    return tmp_path / "coding"
+
+
+@pytest.fixture
+def pool(work_dir):
+    pool = ExecutionPool(work_dir=str(work_dir), size=1, timeout=10, memory_mb=0, preload=(), on_output=None)
+    yield pool
+    pool.shutdown()
+
+
+def run(pool: ExecutionPool, *codes: str):
+    return [(result.exitcode, result.output) for result in pool.execute_blocks([("python", code) for code in codes])]
+
+
+def test_block_imports_a_module_saved_by_an_earlier_block(pool):
+    assert run(pool, "# filename: helper.py\nVALUE = 1\n", "import helper\nprint(helper.VALUE)") == [
+        (0, ""), (0, "1\n")
+    ]
+
+    # The module is imported afresh, so the next block sees the new version
+    assert run(pool, "# filename: helper.py\nVALUE = 2\n", "import helper\nprint(helper.VALUE)")[1] == (0, "2\n")
+
+
+def test_files_created_and_deleted_by_blocks_are_mirrored_to_work_dir(pool, work_dir):
+    run(pool, "open('data.csv', 'w').write('a,b\\n')")
+    assert (work_dir / "data.csv").read_text() == "a,b\n"
+
+    run(pool, "import os\nos.remove('data.csv')")
+    assert not (work_dir / "data.csv").exists()
+
+
+def test_unchanged_files_are_not_copied_again(pool, work_dir):
+    (work_dir / "input.txt").write_text("hello")
+    run(pool, "print(open('input.txt').read())")
+    scratch_copy = work_dir / ".scratch" / "worker-0" / "input.txt"
+    inode = os.stat(scratch_copy).st_ino
+
+    assert run(pool, "print(open('input.txt').read())") == [(0, "hello\n")]
+    assert os.stat(scratch_copy).st_ino == inode
+
+
+def test_failed_block_stops_the_reply(pool):
+    results = run(pool, "raise ValueError('boom')", "print('not reached')")
+
+    assert len(results) == 1
+    assert results[0][0] == 1 and "ValueError: boom" in results[0][1]
+
+
+def test_block_over_the_time_limit_is_killed(work_dir):
+    pool = ExecutionPool(work_dir=str(work_dir), size=1, timeout=1, memory_mb=0, preload=(), on_output=None)
+    try:
+        assert run(pool, "import time\ntime.sleep(30)") == [(124, "Timeout")]
+        assert run(pool, "print('fresh worker')") == [(0, "fresh worker\n")]
+    finally:
+        pool.shutdown()
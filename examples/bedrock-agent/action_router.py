@@ -0,0 +1,263 @@
+"""
+Action routing for the Bedrock agent Lambda.
+Builds a dispatch table from the OpenAPI ``api_schema`` in agent_definition.json
+once per container, and compiles each request body schema into a validator
+function so a request costs one dict lookup plus the validation itself.
+"""
+
+import re
+import json
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+Validator = Callable[[Any, str], None]
+Handler = Callable[[Dict[Any, Any], Dict[Any, Any]], Dict[Any, Any]]
+
+_TYPES = {
+    "object": dict,
+    "array": list,
+    "string": str,
+    "integer": int,
+    "number": (int, float),
+    "boolean": bool
+}
+
+
+_DATE = re.compile(r"\d{4}-\d{2}-\d{2}\Z")
+
+
+def _check_date(value: str) -> None:
+    # Regex plus fromisoformat is several times cheaper than strptime per call
+    if not _DATE.match(value):
+        raise ValueError(value)
+    date.fromisoformat(value)
+
+
+def _check_date_time(value: str) -> None:
+    datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+_FORMATS = {
+    "date": (_check_date, "YYYY-MM-DD"),
+    "date-time": (_check_date_time, "an ISO 8601 timestamp")
+}
+
+
+class SchemaCompiler:
+    """Compiles the JSON Schema subset used by agent_definition.json into plain functions.
+
+    Supported keywords: ``$ref`` (to ``#/components/schemas``), ``type``,
+    ``required``, ``properties``, ``items``, ``minItems``, ``maxItems``,
+    ``enum``, ``minLength``, ``maxLength``, ``nullable`` and the ``date`` /
+    ``date-time`` formats. ``x-validate-items: false`` on an array leaves its
+    items to the handler, so one bad item does not reject the whole request.
+    Other keywords are ignored.
+    """
+
+    def __init__(self, components: Dict[str, dict]):
+        self.components = components
+        self._compiled: Dict[str, Validator] = {}
+
+    def compile_ref(self, name: str) -> Validator:
+        if name not in self._compiled:
+            # Placeholder first so self-referencing schemas terminate
+            self._compiled[name] = lambda value, path: self._compiled[name](value, path)
+            self._compiled[name] = self.compile(self.components[name])
+        return self._compiled[name]
+
+    def nullable(self, schema: dict) -> bool:
+        """True if ``schema`` accepts null (``nullable: true`` or a ``null`` type)."""
+        if "$ref" in schema:
+            schema = self.components.get(schema["$ref"].rsplit("/", 1)[-1], {})
+        expected = schema.get("type")
+        return bool(schema.get("nullable")) or expected == "null" or (
+            isinstance(expected, list) and "null" in expected
+        )
+
+    def compile(self, schema: dict) -> Validator:
+        if "$ref" in schema:
+            return self.compile_ref(schema["$ref"].rsplit("/", 1)[-1])
+
+        checks = []
+
+        expected = schema.get("type")
+        if expected in _TYPES:
+            python_type = _TYPES[expected]
+
+            def check_type(value, path, python_type=python_type, expected=expected):
+                # bool is an int subclass; don't let True pass as a number
+                if not isinstance(value, python_type) or (isinstance(value, bool) and expected != "boolean"):
+                    raise ValueError(f"{path}: expected {expected}")
+            checks.append(check_type)
+
+        if "enum" in schema:
+            allowed = frozenset(schema["enum"])
+            listed = schema["enum"]
+
+            def check_enum(value, path):
+                if value not in allowed:
+                    raise ValueError(f"{path}: must be one of {listed}")
+            checks.append(check_enum)
+
+        if schema.get("format") in _FORMATS:
+            parse, description = _FORMATS[schema["format"]]
+
+            def check_format(value, path):
+                try:
+                    parse(value)
+                except (TypeError, ValueError):
+                    raise ValueError(f"{path}: expected {description}")
+            checks.append(check_format)
+
+        if "minLength" in schema or "maxLength" in schema:
+            low, high = schema.get("minLength", 0), schema.get("maxLength")
+
+            def check_length(value, path):
+                # Without a "type" keyword nothing else guarantees a string here
+                if not isinstance(value, str):
+                    raise ValueError(f"{path}: expected string")
+                if len(value) < low or (high is not None and len(value) > high):
+                    raise ValueError(f"{path}: length out of range")
+            checks.append(check_length)
+
+        if expected == "object":
+            property_schemas = schema.get("properties", {})
+            required = tuple(
+                (name, self.nullable(property_schemas.get(name, {}))) for name in schema.get("required", ())
+            )
+            properties = tuple(
+                (name, self.compile(sub_schema)) for name, sub_schema in property_schemas.items()
+            )
+
+            def check_object(value, path):
+                for name, nullable in required:
+                    if name not in value:
+                        raise ValueError(f"{path}.{name}: required")
+                    if value[name] is None and not nullable:
+                        raise ValueError(f"{path}.{name}: must not be null")
+                for name, validate in properties:
+                    # None means "not provided" for optional fields, as in the handlers
+                    if value.get(name) is not None:
+                        validate(value[name], f"{path}.{name}")
+            checks.append(check_object)
+
+        if expected == "array":
+            low, high = schema.get("minItems", 0), schema.get("maxItems")
+            validate_item = None
+            if "items" in schema and schema.get("x-validate-items", True):
+                validate_item = self.compile(schema["items"])
+
+            def check_array(value, path):
+                if len(value) < low or (high is not None and len(value) > high):
+                    raise ValueError(f"{path}: expected between {low} and {high or 'any'} items")
+                if validate_item is not None:
+                    for index, item in enumerate(value):
+                        validate_item(item, f"{path}[{index}]")
+            checks.append(check_array)
+
+        if len(checks) == 1:
+            return checks[0]
+
+        def validate(value, path):
+            for check in checks:
+                check(value, path)
+        return validate
+
+
+class Route:
+    """Handler and compiled body validator for one operation."""
+
+    __slots__ = ("operation_id", "handler", "validate_body")
+
+    def __init__(self, operation_id: str, handler: Optional[Handler], validate_body: Optional[Validator]):
+        self.operation_id = operation_id
+        self.handler = handler
+        self.validate_body = validate_body
+
+
+class ActionRouter:
+    """O(1) dispatch of agent action events on (action group, operationId, path)."""
+
+    def __init__(self, routes: Dict[Tuple[str, str, str], Route]):
+        self.routes = routes
+
+    @classmethod
+    def from_definition(
+        cls,
+        definition_path: str,
+        action_group: str,
+        handlers: Dict[str, Handler]
+    ) -> "ActionRouter":
+        """
+        Build the router from an agent definition file.
+
+        Args:
+            definition_path: Path to agent_definition.json
+            action_group: Action group name the operations belong to
+            handlers: operationId -> handler taking the request body and the event
+
+        Returns:
+            ActionRouter with one route per operation in ``api_schema``
+        """
+        with open(definition_path) as f:
+            api_schema = json.load(f)["api_schema"]
+        return cls.from_api_schema(api_schema, action_group, handlers)
+
+    @classmethod
+    def from_api_schema(cls, api_schema: dict, action_group: str, handlers: Dict[str, Handler]) -> "ActionRouter":
+        compiler = SchemaCompiler(api_schema.get("components", {}).get("schemas", {}))
+        routes = {}
+        for path, methods in api_schema.get("paths", {}).items():
+            for operation in methods.values():
+                operation_id = operation.get("operationId")
+                if not operation_id:
+                    continue
+                body = operation.get("requestBody", {})
+                schema = body.get("content", {}).get("application/json", {}).get("schema")
+                validate_body = compiler.compile(schema) if schema else None
+                if validate_body is not None and body.get("required"):
+                    validate_body = _required(validate_body)
+                routes[(action_group, operation_id, path)] = Route(
+                    operation_id, handlers.get(operation_id), validate_body
+                )
+        return cls(routes)
+
+    def dispatch(self, event: Dict[Any, Any]) -> Dict[Any, Any]:
+        """
+        Route an action event to its handler after validating the request body.
+
+        Returns:
+            The handler's response, or a 400/501 response for unknown
+            operations, invalid bodies and operations without a handler
+        """
+        action_group = event.get('actionGroup', '')
+        action = event.get('action', '')
+        route = self.routes.get((action_group, action, event.get('apiPath', '')))
+        if route is None:
+            return _error(400, f'Unsupported action: {action_group}/{action}')
+        if route.handler is None:
+            return _error(501, f'Action not implemented: {action_group}/{action}')
+
+        request_body = event.get('requestBody')
+        if route.validate_body is not None:
+            try:
+                route.validate_body(request_body, 'requestBody')
+            except ValueError as e:
+                return _error(400, str(e))
+
+        return route.handler(request_body or {}, event)
+
+
+def _required(validate: Validator) -> Validator:
+    def validate_required(value, path):
+        if value is None:
+            raise ValueError(f"{path}: required")
+        validate(value, path)
+    return validate_required
+
+
+def _error(status_code: int, message: str) -> Dict[Any, Any]:
+    return {
+        'statusCode': status_code,
+        'body': json.dumps({'error': message})
+    }
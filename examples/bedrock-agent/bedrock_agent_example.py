@@ -1,19 +1,152 @@
 import os
 import json
+import time
+import uuid
+import random
+import threading
 import boto3
-from typing import Dict, Any, Optional
+from botocore.config import Config
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Dict, Any, Iterable, Iterator, List, Optional
 from dotenv import load_dotenv
 from pydantic import BaseModel
 
 # Load environment variables
 load_dotenv()
 
+class AgentStream:
+    """
+    Incremental view of an ``invoke_agent`` completion event stream.
+
+    Iterating yields decoded text chunks as they arrive. The event source is
+    consumed once and every chunk is buffered, so each iterator (including
+    ``read`` after a partial iteration, or two interleaved iterators) sees
+    the full sequence of chunks in order.
+    Timing is measured from just before the request was sent, so
+    ``time_to_first_token`` covers the whole wait for the first chunk.
+    """
+
+    def __init__(self, response: Dict[str, Any], started: float):
+        self.session_id = response.get("sessionId")
+        self.response_metadata = response.get("ResponseMetadata")
+        self.started = started
+        self.time_to_first_token: Optional[float] = None
+        self.total_time: Optional[float] = None
+        self.traces: List[dict] = []
+        self._events = iter(response.get("completion") or [])
+        self._chunks: List[str] = []
+        self._finished = False
+
+    def __iter__(self) -> Iterator[str]:
+        position = 0
+        while position < len(self._chunks) or self._read_event():
+            if position < len(self._chunks):
+                yield self._chunks[position]
+                position += 1
+
+    def _read_event(self) -> bool:
+        """Consume one event from the source; False once it is exhausted."""
+        if self._finished:
+            return False
+        event = next(self._events, None)
+        if event is None:
+            self._finished = True
+            self.total_time = time.perf_counter() - self.started
+            return False
+        if "chunk" in event:
+            if self.time_to_first_token is None:
+                self.time_to_first_token = time.perf_counter() - self.started
+            self._chunks.append(event["chunk"].get("bytes", b"").decode("utf-8"))
+        elif "trace" in event:
+            self.traces.append(event["trace"])
+        return True
+
+    @property
+    def text(self) -> str:
+        """Text received so far (the full completion once iteration finishes)."""
+        return "".join(self._chunks)
+
+    def read(self) -> str:
+        """Consume the rest of the stream and return the full completion."""
+        for _ in self:
+            pass
+        return self.text
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD limit on in-flight requests.
+
+    Each success raises the limit by ``1 / limit`` (about one slot per round
+    of requests); each throttling error halves it. Callers block in
+    ``acquire`` while the limit is reached.
+    """
+
+    def __init__(self, initial: int = 4, minimum: int = 1, maximum: int = 32):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = float(min(max(initial, minimum), maximum))
+        self.in_flight = 0
+        self.throttles = 0
+        self._condition = threading.Condition()
+
+    def acquire(self) -> None:
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+
+    def release(self, throttled: bool = False) -> None:
+        with self._condition:
+            self.in_flight -= 1
+            if throttled:
+                self.throttles += 1
+                self.limit = max(self.minimum, self.limit / 2)
+            else:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
+
+@dataclass
+class InvocationResult:
+    """Outcome of one prompt sent through ``invoke_many``."""
+    index: int
+    prompt: str
+    response: Optional[Dict[str, Any]]
+    error: Optional[Exception]
+    service_ms: float  # time spent in agent calls, summed over attempts
+    queue_ms: float  # time spent waiting for a thread, the concurrency limit or a backoff
+    attempts: int
+
+
+def _is_throttling(error: Exception) -> bool:
+    """True for service throttling errors, raised on the request or mid-stream."""
+    response = getattr(error, "response", None)
+    if not isinstance(response, dict):
+        return False
+    error_info = response.get("Error")
+    code = error_info.get("Code") if isinstance(error_info, dict) else None
+    return str(code or "").lower() in ("throttlingexception", "toomanyrequestsexception", "servicequotaexceededexception")
+
+
+def _backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff before retrying a throttled request."""
+    return random.uniform(0, min(20.0, 0.5 * 2 ** attempt))
+
+
 class BedrockAgentClient:
     def __init__(
         self,
         agent_id: str,
         agent_alias: str = "DRAFT",
-        region: Optional[str] = None
+        region: Optional[str] = None,
+        client: Optional[Any] = None,
+        max_pool_connections: int = 50,
+        max_attempts: int = 1,
+        retry_mode: str = "standard",
+        connect_timeout: float = 5,
+        read_timeout: float = 120
     ):
         """
         Initialize the Bedrock Agent client.
@@ -22,56 +155,227 @@ class BedrockAgentClient:
             agent_id: The ID of the Bedrock agent
             agent_alias: The alias of the agent (default: "DRAFT")
             region: AWS region (optional, defaults to environment variable)
+            client: Pre-built bedrock-agent-runtime client (or a stub for tests)
+            max_pool_connections: HTTP connections kept open for concurrent calls
+            max_attempts: Total botocore attempts per request. Throttling is
+                retried with backoff by ``invoke`` and ``invoke_many``, so the
+                default of 1 keeps botocore from retrying the same errors again
+            retry_mode: botocore retry mode ("standard" or "adaptive")
+            connect_timeout: Seconds to wait for a connection
+            read_timeout: Seconds to wait between bytes of a streamed response
         """
         self.agent_id = agent_id
         self.agent_alias = agent_alias
         self.region = region or os.getenv("AWS_REGION", "us-west-2")
+        self._sessions: Dict[str, str] = {}
+        self._sessions_lock = threading.Lock()
 
-        # Initialize Bedrock client
-        self.bedrock_agent = boto3.client(
+        # Initialize Bedrock client; one client (and connection pool) is shared by all calls
+        self.bedrock_agent = client or boto3.client(
             "bedrock-agent-runtime",
-            region_name=self.region
+            region_name=self.region,
+            config=Config(
+                max_pool_connections=max_pool_connections,
+                retries={"max_attempts": max_attempts, "mode": retry_mode},
+                connect_timeout=connect_timeout,
+                read_timeout=read_timeout,
+                tcp_keepalive=True
+            )
         )
 
-    def invoke(self, prompt: str) -> Dict[Any, Any]:
+    def invoke(
+        self,
+        prompt: str,
+        conversation_id: Optional[str] = None,
+        end_session: bool = False,
+        max_throttle_retries: int = 3
+    ) -> Dict[Any, Any]:
         """
         Invoke the Bedrock agent with a prompt.
 
         Args:
             prompt: The natural language prompt for the agent
+            conversation_id: Conversation whose agent session is reused (new session if None)
+            end_session: Ask the agent to end the session after this turn
+            max_throttle_retries: Retries after throttling errors, with jittered backoff
 
         Returns:
             Dict containing the agent's response
         """
+        attempts = 0
+        while True:
+            attempts += 1
+            try:
+                return self._invoke_and_read(prompt, conversation_id, end_session)
+
+            except Exception as e:
+                if _is_throttling(e) and attempts <= max_throttle_retries:
+                    time.sleep(_backoff_delay(attempts))
+                    continue
+                print(f"Error invoking agent: {str(e)}")
+                raise
+
+    def invoke_many(
+        self,
+        prompts: Iterable[str],
+        max_concurrency: int = 16,
+        initial_concurrency: int = 4,
+        max_throttle_retries: int = 6,
+        conversation_ids: Optional[List[Optional[str]]] = None
+    ) -> Iterator[InvocationResult]:
+        """
+        Send many prompts concurrently and yield results as they complete.
+
+        Requests share this client's connection pool and run on a bounded
+        thread pool. An AdaptiveConcurrencyLimiter keeps the number of
+        in-flight requests below a limit that grows while calls succeed and
+        halves on throttling; throttled prompts are retried after a jittered
+        exponential backoff. Closing the generator early cancels the prompts
+        that have not started yet.
+
+        Args:
+            prompts: Prompts to send
+            max_concurrency: Upper bound on in-flight requests (and pool threads)
+            initial_concurrency: Starting in-flight limit
+            max_throttle_retries: Retries per prompt after throttling errors
+            conversation_ids: Optional conversation per prompt, for session reuse
+
+        Yields:
+            InvocationResult per prompt, in completion order; failures carry ``error``
+        """
+        prompts = list(prompts)
+        conversation_ids = conversation_ids or [None] * len(prompts)
+        limiter = AdaptiveConcurrencyLimiter(initial_concurrency, maximum=max_concurrency)
+
+        stopped = threading.Event()
+
+        def run(index: int, submitted: float) -> Optional[InvocationResult]:
+            attempts, service = 0, 0.0
+            response, error = None, None
+            while not stopped.is_set():
+                attempts += 1
+                limiter.acquire()
+                if stopped.is_set():
+                    limiter.release()
+                    break
+                call_started = time.perf_counter()
+                try:
+                    response = self._invoke_and_read(prompts[index], conversation_ids[index])
+                except Exception as e:
+                    service += time.perf_counter() - call_started
+                    throttled = _is_throttling(e)
+                    limiter.release(throttled=throttled)
+                    if throttled and attempts <= max_throttle_retries:
+                        stopped.wait(_backoff_delay(attempts))
+                        continue
+                    error = e
+                else:
+                    service += time.perf_counter() - call_started
+                    limiter.release()
+
+                total = time.perf_counter() - submitted
+                return InvocationResult(index, prompts[index], response, error,
+                                        _milliseconds(service), _milliseconds(total - service), attempts)
+            return None  # the caller stopped iterating
+
+        executor = ThreadPoolExecutor(max_workers=max_concurrency)
         try:
-            response = self.bedrock_agent.invoke_agent(
-                agentId=self.agent_id,
-                agentAliasId=self.agent_alias,
-                sessionId=self._generate_session_id(),
-                inputText=prompt
-            )
+            futures = [executor.submit(run, index, time.perf_counter()) for index in range(len(prompts))]
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            # On GeneratorExit, drop queued prompts and wake any backoff; requests
+            # already sent finish in the background and their results are discarded
+            stopped.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _invoke_and_read(
+        self,
+        prompt: str,
+        conversation_id: Optional[str] = None,
+        end_session: bool = False
+    ) -> Dict[str, Any]:
+        stream = self.invoke_stream(prompt, conversation_id, end_session)
+        completion = stream.read()
+
+        return {
+            "completion": completion,
+            "session_id": stream.session_id,
+            "response_metadata": stream.response_metadata,
+            "time_to_first_token_ms": _milliseconds(stream.time_to_first_token),
+            "total_ms": _milliseconds(stream.total_time)
+        }
+
+    def invoke_stream(
+        self,
+        prompt: str,
+        conversation_id: Optional[str] = None,
+        end_session: bool = False,
+        enable_trace: bool = False
+    ) -> AgentStream:
+        """
+        Invoke the agent and return its completion as an incremental stream.
 
-            return {
-                "completion": response.get("completion"),
-                "session_id": response.get("sessionId"),
-                "response_metadata": response.get("ResponseMetadata")
-            }
+        Args:
+            prompt: The natural language prompt for the agent
+            conversation_id: Conversation whose agent session is reused (new session if None)
+            end_session: Ask the agent to end the session after this turn
+            enable_trace: Request trace events (collected on ``AgentStream.traces``)
 
-        except Exception as e:
-            print(f"Error invoking agent: {str(e)}")
-            raise
+        Returns:
+            AgentStream yielding text chunks as they arrive
+        """
+        session_id = self.session_id(conversation_id) if conversation_id else self._generate_session_id()
+
+        started = time.perf_counter()
+        response = self.bedrock_agent.invoke_agent(
+            agentId=self.agent_id,
+            agentAliasId=self.agent_alias,
+            sessionId=session_id,
+            inputText=prompt,
+            endSession=end_session,
+            enableTrace=enable_trace
+        )
+        if end_session and conversation_id:
+            self.reset_session(conversation_id)
+        return AgentStream(response, started)
+
+    def session_id(self, conversation_id: str) -> str:
+        """Return the agent session ID for a conversation, creating it on first use."""
+        with self._sessions_lock:
+            if conversation_id not in self._sessions:
+                self._sessions[conversation_id] = self._generate_session_id()
+            return self._sessions[conversation_id]
+
+    def reset_session(self, conversation_id: str) -> None:
+        """Forget a conversation's session so its next turn starts a new one."""
+        with self._sessions_lock:
+            self._sessions.pop(conversation_id, None)
 
     def _generate_session_id(self) -> str:
         """Generate a unique session ID for the conversation."""
-        import uuid
         return str(uuid.uuid4())
 
+def _milliseconds(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds * 1000, 1) if seconds is not None else None
+
 class TaskRequest(BaseModel):
     """Model for task requests to the agent."""
     task_description: str
     priority: Optional[str] = "medium"
     deadline: Optional[str] = None
 
+def build_prompt(task: TaskRequest) -> str:
+    """Construct the task-creation prompt for a request."""
+    return f"""
+    Please help me create a new task with the following details:
+    - Description: {task.task_description}
+    - Priority: {task.priority}
+    - Deadline: {task.deadline}
+
+    Please create the task and return the task ID and status.
+    """
+
 def main():
     """Example usage of the Bedrock Agent."""
     # Initialize the agent client
@@ -88,22 +392,32 @@ def main():
     )
 
     # Construct the prompt
-    prompt = f"""
-    Please help me create a new task with the following details:
-    - Description: {task.task_description}
-    - Priority: {task.priority}
-    - Deadline: {task.deadline}
-
-    Please create the task and return the task ID and status.
-    """
+    prompt = build_prompt(task)
 
     try:
-        # Invoke the agent
-        response = agent.invoke(prompt)
-
-        # Print the response
+        # Stream the agent's reply; later turns with the same conversation_id reuse its session
+        stream = agent.invoke_stream(prompt, conversation_id="task-demo")
         print("\nAgent Response:")
-        print(json.dumps(response, indent=2))
+        for chunk in stream:
+            print(chunk, end="", flush=True)
+        print()
+
+        print(json.dumps({
+            "session_id": stream.session_id,
+            "time_to_first_token_ms": _milliseconds(stream.time_to_first_token),
+            "total_ms": _milliseconds(stream.total_time)
+        }, indent=2))
+
+        # Bulk import: many prompts in flight at once, printed as each completes
+        bulk_tasks = [
+            TaskRequest(task_description=f"Write integration tests for service {i}", priority="medium")
+            for i in range(1, 6)
+        ]
+        print("\nBulk import:")
+        for result in agent.invoke_many([build_prompt(t) for t in bulk_tasks], max_concurrency=8):
+            status = "ok" if result.error is None else f"failed: {result.error}"
+            print(f"  task {result.index}: {status} in {result.service_ms} ms "
+                  f"after {result.queue_ms} ms queued ({result.attempts} attempt(s))")
 
     except Exception as e:
         print(f"Error in main execution: {str(e)}")
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of per-invocation routing cost in the Lambda.
+Compares ActionRouter (dict dispatch plus compiled schema validation) with an
+if-chain over the same operations, and reports the one-time router build cost.
+
+Usage:
+    python benchmark_router.py --operations 1 12 48 --iterations 100000
+"""
+
+import json
+import time
+import argparse
+from datetime import datetime
+
+from action_router import ActionRouter
+
+ACTION_GROUP = 'TaskManagement'
+
+TASK_SCHEMA = {
+    "type": "object",
+    "required": ["description"],
+    "properties": {
+        "description": {"type": "string"},
+        "priority": {"type": "string", "enum": ["low", "medium", "high"]},
+        "deadline": {"type": "string", "format": "date"}
+    }
+}
+
+BODY = {"description": "Implement user authentication", "priority": "high", "deadline": "2024-03-01"}
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='ActionRouter vs if-chain dispatch benchmark')
+    parser.add_argument('--operations', type=int, nargs='+', default=[1, 12, 48],
+                        help='Number of operations in the API schema')
+    parser.add_argument('--iterations', type=int, default=100_000, help='Invocations per measurement')
+    return parser.parse_args()
+
+
+def handler(request_body, event):
+    return {'statusCode': 200, 'body': ''}
+
+
+def make_api_schema(count: int) -> dict:
+    paths = {
+        f"/resource{i}": {
+            "post": {
+                "operationId": f"operation{i}",
+                "requestBody": {
+                    "required": True,
+                    "content": {"application/json": {"schema": {"$ref": "#/components/schemas/Task"}}}
+                }
+            }
+        }
+        for i in range(count)
+    }
+    return {"paths": paths, "components": {"schemas": {"Task": TASK_SCHEMA}}}
+
+
+def make_if_chain(count: int):
+    """Equivalent hand-written dispatcher: one comparison per operation, then manual checks."""
+    lines = ["def dispatch(event):",
+             "    action_group = event.get('actionGroup', '')",
+             "    action = event.get('action', '')",
+             "    api_path = event.get('apiPath', '')"]
+    for i in range(count):
+        lines += [f"    if action_group == {ACTION_GROUP!r} and action == 'operation{i}' and api_path == '/resource{i}':",
+                  "        body = event.get('requestBody') or {}",
+                  "        validate(body)",
+                  "        return handler(body, event)",]
+    lines.append("    return None")
+
+    def validate(body):
+        if not body.get('description'):
+            raise ValueError("Task description is required")
+        if body.get('priority', 'medium') not in ('low', 'medium', 'high'):
+            raise ValueError("Invalid priority value")
+        if body.get('deadline'):
+            datetime.strptime(body['deadline'], '%Y-%m-%d')
+
+    namespace = {'handler': handler, 'validate': validate}
+    exec("\n".join(lines), namespace)
+    return namespace['dispatch']
+
+
+def per_call_us(dispatch, event: dict, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        dispatch(event)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    args = parse_arguments()
+
+    print(f"{'operations':>10} {'build ms':>9} {'router us':>10} {'if-chain us':>12}")
+    for count in args.operations:
+        api_schema = make_api_schema(count)
+        handlers = {f"operation{i}": handler for i in range(count)}
+
+        start = time.perf_counter()
+        router = ActionRouter.from_api_schema(json.loads(json.dumps(api_schema)), ACTION_GROUP, handlers)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        # Worst case for the if-chain: the last operation
+        event = {
+            "actionGroup": ACTION_GROUP,
+            "action": f"operation{count - 1}",
+            "apiPath": f"/resource{count - 1}",
+            "requestBody": BODY
+        }
+        router_us = per_call_us(router.dispatch, event, args.iterations)
+        chain_us = per_call_us(make_if_chain(count), event, args.iterations)
+        print(f"{count:>10} {build_ms:>9.3f} {router_us:>10.2f} {chain_us:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,53 @@
+import hashlib
 import json
-import boto3
 import os
+import random
+import threading
+import time
 import uuid
+from collections import OrderedDict
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 
-# Initialize DynamoDB client
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table(os.environ.get('TASKS_TABLE_NAME', 'Tasks'))
+from action_router import ActionRouter
+
+ACTION_GROUP = 'TaskManagement'
+AGENT_DEFINITION_PATH = os.environ.get(
+    'AGENT_DEFINITION_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'agent_definition.json')
+)
+
+# DynamoDB allows at most 25 put requests per BatchWriteItem call and 100 keys per BatchGetItem call
+BATCH_WRITE_LIMIT = 25
+BATCH_GET_LIMIT = 100
+MAX_UNPROCESSED_RETRIES = 5
+
+# Task IDs are derived from idempotency keys, so a retried request maps to the same item
+TASK_ID_NAMESPACE = uuid.UUID('6f1c2a4e-2b8d-4c55-9d0e-8a7f3b1e5c92')
+IDEMPOTENCY_FIELDS = ('description', 'priority', 'deadline')
+IDEMPOTENCY_CACHE_SIZE = 1024
+MISSING_KEY_ERROR = 'idempotencyKey is required when the request has no sessionId'
+
+# The DynamoDB table is created on first use and reused by warm invocations
+_table = None
+
+# Recently completed creates in this container: idempotency key -> (request hash, response body)
+_recent_creates: 'OrderedDict[str, Tuple[str, Dict[str, Any]]]' = OrderedDict()
+_recent_creates_lock = threading.Lock()
+
+def get_table():
+    """Return the tasks table, creating the boto3 resource on first call."""
+    global _table
+    if _table is None:
+        started = time.perf_counter()
+        import boto3
+        dynamodb = boto3.resource('dynamodb')
+        _table = dynamodb.Table(os.environ.get('TASKS_TABLE_NAME', 'Tasks'))
+        print(json.dumps({
+            'event': 'dynamodb_init',
+            'duration_ms': round((time.perf_counter() - started) * 1000, 1)
+        }))
+    return _table
 
 def lambda_handler(event: Dict[Any, Any], context: Any) -> Dict[Any, Any]:
     """
@@ -21,21 +61,8 @@ def lambda_handler(event: Dict[Any, Any], context: Any) -> Dict[Any, Any]:
         Dict containing the response
     """
     try:
-        # Extract action information from the event
-        action_group = event.get('actionGroup', '')
-        action = event.get('action', '')
-        api_path = event.get('apiPath', '')
-
-        # Process create task request
-        if action_group == 'TaskManagement' and action == 'createTask' and api_path == '/tasks':
-            return create_task(event.get('requestBody', {}))
-
-        return {
-            'statusCode': 400,
-            'body': json.dumps({
-                'error': f'Unsupported action: {action_group}/{action}'
-            })
-        }
+        # Route on (actionGroup, action, apiPath); the body is validated against the operation's schema
+        return router.dispatch(event)
 
     except Exception as e:
         return {
@@ -45,42 +72,283 @@ def lambda_handler(event: Dict[Any, Any], context: Any) -> Dict[Any, Any]:
             })
         }
 
-def create_task(request_body: Dict[Any, Any]) -> Dict[Any, Any]:
+def create_task(request_body: Dict[Any, Any], event: Optional[Dict[Any, Any]] = None) -> Dict[Any, Any]:
     """
-    Create a new task in DynamoDB.
+    Create a new task in DynamoDB, at most once per idempotency key.
+
+    The key is the request's ``idempotencyKey`` or, if absent, a hash of the
+    task fields and the agent session. Without a session the request must
+    carry an ``idempotencyKey``, since a hash alone would make identical
+    tasks from unrelated callers collide. The task ID is derived from the key
+    and written with a conditional put, so a retried or concurrent duplicate
+    request returns the original task instead of creating another one.
 
     Args:
         request_body: The request body containing task details
+        event: The Lambda event (used for the agent ``sessionId``)
 
     Returns:
         Dict containing the created task information
     """
-    # Generate unique task ID
-    task_id = str(uuid.uuid4())
-    current_time = datetime.utcnow().isoformat()
+    request_hash = hash_request(request_body)
+    key = idempotency_key(request_body, (event or {}).get('sessionId'), request_hash)
+    if key is None:
+        return {
+            'statusCode': 400,
+            'body': json.dumps({'error': MISSING_KEY_ERROR})
+        }
+
+    # Retries landing on a warm container are answered without touching DynamoDB
+    with _recent_creates_lock:
+        recent = _recent_creates.get(key)
+        if recent is not None:
+            _recent_creates.move_to_end(key)
+    if recent is not None:
+        return _idempotent_response(recent[0], request_hash, recent[1])
 
     # Prepare task item
-    task_item = {
-        'task_id': task_id,
-        'description': request_body.get('description'),
-        'priority': request_body.get('priority', 'medium'),
-        'deadline': request_body.get('deadline'),
+    task_item = build_task_item(request_body, key, request_hash)
+
+    # Save to DynamoDB unless a request with the same key already did
+    table = get_table()
+    try:
+        table.put_item(Item=task_item, ConditionExpression='attribute_not_exists(task_id)')
+    except table.meta.client.exceptions.ConditionalCheckFailedException:
+        task_item = table.get_item(Key={'task_id': task_item['task_id']}, ConsistentRead=True)['Item']
+
+    body = {
+        'task_id': task_item['task_id'],
         'status': 'created',
-        'created_at': current_time
+        'created_at': task_item['created_at']
     }
+    stored_hash = task_item.get('request_hash', request_hash)
+    with _recent_creates_lock:
+        _recent_creates[key] = (stored_hash, body)
+        _recent_creates.move_to_end(key)
+        while len(_recent_creates) > IDEMPOTENCY_CACHE_SIZE:
+            _recent_creates.popitem(last=False)
 
-    # Save to DynamoDB
-    table.put_item(Item=task_item)
+    return _idempotent_response(stored_hash, request_hash, body)
 
+def _idempotent_response(stored_hash: str, request_hash: str, body: Dict[str, Any]) -> Dict[Any, Any]:
+    if stored_hash != request_hash:
+        return {
+            'statusCode': 409,
+            'body': json.dumps({
+                'error': 'idempotencyKey was already used for a different task'
+            })
+        }
     return {
         'statusCode': 200,
+        'body': json.dumps(body)
+    }
+
+def create_tasks(request_body: Dict[Any, Any], event: Optional[Dict[Any, Any]] = None) -> Dict[Any, Any]:
+    """
+    Create many tasks with batched DynamoDB writes.
+
+    Each task is validated first. Task IDs are derived from idempotency keys
+    (per task, or the session and position in the batch), and BatchWriteItem
+    takes no condition, so existing IDs are looked up with BatchGetItem
+    before writing. A task that already exists is reported as created if it
+    has the same fields, or as a conflict if its key was used for a
+    different task; neither is written again. Within the batch, a task
+    whose key was already used by an earlier task is reported as a
+    duplicate of it if the fields match, or as a conflict otherwise. The
+    remaining tasks are written in groups of 25 and unprocessed items are
+    retried with backoff. The response reports the outcome of every task in
+    input order. Without a session, tasks lacking an ``idempotencyKey`` are
+    reported as invalid.
+
+    A concurrent request creating the same task between the lookup and the
+    write can still be overwritten by identical fields; use ``createTask``
+    where that matters, since its conditional put closes the gap.
+
+    Args:
+        request_body: The request body with a ``tasks`` list of task details
+        event: The Lambda event (used for the agent ``sessionId``)
+
+    Returns:
+        Dict with per-task results (200 if every task was created, 207 otherwise)
+    """
+    tasks = request_body.get('tasks')
+    if not isinstance(tasks, list) or not tasks:
+        return {
+            'statusCode': 400,
+            'body': json.dumps({'error': 'tasks must be a non-empty list'})
+        }
+
+    session_id = (event or {}).get('sessionId')
+    results: List[Dict[str, Any]] = []
+    items = {}
+    first_results = {}
+    duplicates = []
+    for index, task in enumerate(tasks):
+        if not isinstance(task, dict):
+            results.append({'index': index, 'status': 'invalid', 'error': 'Each task must be an object'})
+            continue
+        try:
+            validate_request(task)
+        except ValueError as e:
+            results.append({'index': index, 'status': 'invalid', 'error': str(e)})
+            continue
+        request_hash = hash_request(task)
+        key = idempotency_key(task, f"{session_id}:{index}" if session_id else None, request_hash)
+        if key is None:
+            results.append({'index': index, 'status': 'invalid', 'error': MISSING_KEY_ERROR})
+            continue
+        item = build_task_item(task, key, request_hash)
+        task_id = item['task_id']
+        if task_id in items:
+            first = first_results[task_id]
+            if items[task_id]['request_hash'] == request_hash:
+                result = {'index': index, 'task_id': task_id, 'status': 'duplicate', 'duplicate_of': first['index']}
+                duplicates.append((result, first))
+            else:
+                result = {'index': index, 'status': 'conflict',
+                          'error': f"idempotencyKey was already used for task {first['index']} in this batch"}
+            results.append(result)
+            continue
+        items[task_id] = item
+        first_results[task_id] = {'index': index, 'task_id': task_id, 'status': 'created'}
+        results.append(first_results[task_id])
+
+    existing, unchecked = batch_get_items(list(items))
+    for task_id, result in first_results.items():
+        if task_id in existing and existing[task_id].get('request_hash') != items[task_id]['request_hash']:
+            result['status'] = 'conflict'
+            result['error'] = 'idempotencyKey was already used for a different task'
+        elif task_id in unchecked:
+            result['status'] = 'failed'
+            result['error'] = 'Lookup not processed after retries'
+
+    failed = batch_put_items([
+        item for task_id, item in items.items() if task_id not in existing and task_id not in unchecked
+    ])
+    for task_id in failed:
+        first_results[task_id]['status'] = 'failed'
+        first_results[task_id]['error'] = 'Write not processed after retries'
+
+    # A duplicate shares the outcome of the task it repeats
+    for result, first in duplicates:
+        if first['status'] != 'created':
+            result['status'] = first['status']
+            result['error'] = first['error']
+
+    created = sum(1 for result in results if result['status'] == 'created')
+    duplicate = sum(1 for result in results if result['status'] == 'duplicate')
+    return {
+        'statusCode': 200 if created + duplicate == len(results) else 207,
         'body': json.dumps({
-            'task_id': task_id,
-            'status': 'created',
-            'created_at': current_time
+            'created': created,
+            'duplicates': duplicate,
+            'failed': len(results) - created - duplicate,
+            'results': results
         })
     }
 
+def batch_get_items(task_ids: List[str]) -> Tuple[Dict[str, Dict[str, Any]], set]:
+    """
+    Read the ``request_hash`` of existing tasks with BatchGetItem, retrying unprocessed keys.
+
+    Args:
+        task_ids: Task IDs to look up
+
+    Returns:
+        The items found, keyed by task ID, and the set of task IDs that could not be looked up
+    """
+    table = get_table()
+    client = table.meta.client
+    found: Dict[str, Dict[str, Any]] = {}
+    unchecked = set()
+
+    for start in range(0, len(task_ids), BATCH_GET_LIMIT):
+        keys = [{'task_id': task_id} for task_id in task_ids[start:start + BATCH_GET_LIMIT]]
+        for attempt in range(MAX_UNPROCESSED_RETRIES + 1):
+            try:
+                response = client.batch_get_item(RequestItems={table.name: {
+                    'Keys': keys,
+                    'ConsistentRead': True,
+                    'ProjectionExpression': 'task_id, request_hash'
+                }})
+                for item in response.get('Responses', {}).get(table.name, []):
+                    found[item['task_id']] = item
+                keys = response.get('UnprocessedKeys', {}).get(table.name, {}).get('Keys', [])
+            except client.exceptions.ProvisionedThroughputExceededException:
+                pass  # retry the whole group
+
+            if not keys or attempt == MAX_UNPROCESSED_RETRIES:
+                break
+            time.sleep(random.uniform(0, min(1.0, 0.05 * 2 ** attempt)))
+
+        unchecked.update(key['task_id'] for key in keys)
+
+    return found, unchecked
+
+def batch_put_items(items: List[Dict[str, Any]]) -> set:
+    """
+    Write items with BatchWriteItem, retrying unprocessed items.
+
+    Args:
+        items: Task items to put
+
+    Returns:
+        Set of task IDs that could not be written
+    """
+    table = get_table()
+    client = table.meta.client
+    failed = set()
+
+    for start in range(0, len(items), BATCH_WRITE_LIMIT):
+        requests = [{'PutRequest': {'Item': item}} for item in items[start:start + BATCH_WRITE_LIMIT]]
+        for attempt in range(MAX_UNPROCESSED_RETRIES + 1):
+            try:
+                response = client.batch_write_item(RequestItems={table.name: requests})
+                requests = response.get('UnprocessedItems', {}).get(table.name, [])
+            except client.exceptions.ProvisionedThroughputExceededException:
+                pass  # retry the whole group
+
+            if not requests or attempt == MAX_UNPROCESSED_RETRIES:
+                break
+            time.sleep(random.uniform(0, min(1.0, 0.05 * 2 ** attempt)))
+
+        failed.update(request['PutRequest']['Item']['task_id'] for request in requests)
+
+    return failed
+
+def build_task_item(request_body: Dict[Any, Any], key: str, request_hash: str) -> Dict[str, Any]:
+    """Build the DynamoDB item for a new task, with its ID derived from the idempotency key."""
+    return {
+        'task_id': str(uuid.uuid5(TASK_ID_NAMESPACE, key)),
+        'description': request_body.get('description'),
+        'priority': request_body.get('priority') or 'medium',
+        'deadline': request_body.get('deadline'),
+        'status': 'created',
+        'created_at': datetime.utcnow().isoformat(),
+        'idempotency_key': key,
+        'request_hash': request_hash
+    }
+
+def hash_request(request_body: Dict[Any, Any]) -> str:
+    """Stable hash of the task fields of a request."""
+    fields = {name: request_body.get(name) for name in IDEMPOTENCY_FIELDS}
+    fields['priority'] = fields['priority'] or 'medium'
+    return hashlib.sha256(json.dumps(fields, sort_keys=True).encode('utf-8')).hexdigest()
+
+def idempotency_key(request_body: Dict[Any, Any], scope: Optional[str], request_hash: str) -> Optional[str]:
+    """
+    The caller's ``idempotencyKey``, or the request hash within ``scope`` (e.g. the session).
+
+    Returns None when there is neither: an unscoped hash would be shared by
+    every caller, so the same task could only ever be created once.
+    """
+    explicit = request_body.get('idempotencyKey')
+    if explicit:
+        return f"key:{explicit}"
+    if not scope:
+        return None
+    return f"hash:{scope}:{request_hash}"
+
 def validate_request(request_body: Dict[Any, Any]) -> None:
     """
     Validate the request body for task creation.
@@ -94,7 +362,7 @@ def validate_request(request_body: Dict[Any, Any]) -> None:
     if not request_body.get('description'):
         raise ValueError("Task description is required")
 
-    priority = request_body.get('priority', 'medium')
+    priority = request_body.get('priority') or 'medium'
     if priority not in ['low', 'medium', 'high']:
         raise ValueError("Invalid priority value")
 
@@ -102,5 +370,15 @@ def validate_request(request_body: Dict[Any, Any]) -> None:
     if deadline:
         try:
             datetime.strptime(deadline, '%Y-%m-%d')
-        except ValueError:
+        except (TypeError, ValueError):
             raise ValueError("Invalid deadline format. Use YYYY-MM-DD")
+
+# Built once per container from the agent's API schema; maps operationId to handler
+router = ActionRouter.from_definition(
+    AGENT_DEFINITION_PATH,
+    ACTION_GROUP,
+    {
+        'createTask': create_task,
+        'createTasks': create_tasks
+    }
+)
@@ -0,0 +1,130 @@
+"""
+Tests for the Bedrock agent client against a stub bedrock-agent-runtime client.
+
+Run with:
+    python -m pytest test_bedrock_agent_example.py
+"""
+
+import threading
+import time
+
+import pytest
+
+import bedrock_agent_example
+from bedrock_agent_example import AgentStream, BedrockAgentClient
+
+
+class ThrottlingException(Exception):
+    def __init__(self):
+        super().__init__("Rate exceeded")
+        self.response = {"Error": {"Code": "ThrottlingException"}}
+
+
+def events(*texts, trace=None):
+    for text in texts:
+        yield {"chunk": {"bytes": text.encode("utf-8")}}
+    if trace is not None:
+        yield {"trace": trace}
+
+
+class StubAgentRuntime:
+    """Answers ``invoke_agent`` with a chunked echo; throttles the first calls for listed prompts."""
+
+    def __init__(self, throttle=None, delay: float = 0.0):
+        self.throttle = dict(throttle or {})
+        self.delay = delay
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def invoke_agent(self, **kwargs):
+        prompt = kwargs["inputText"]
+        with self.lock:
+            self.calls.append(kwargs)
+            if self.throttle.get(prompt):
+                self.throttle[prompt] -= 1
+                raise ThrottlingException()
+        time.sleep(self.delay)
+        return {
+            "sessionId": kwargs["sessionId"],
+            "completion": events("echo: ", prompt, trace={"orchestrationTrace": {"prompt": prompt}})
+        }
+
+
+@pytest.fixture
+def delays(monkeypatch):
+    """Upper bounds of the backoff delays drawn by ``invoke_many``; the delays themselves are zero."""
+    bounds = []
+    monkeypatch.setattr(bedrock_agent_example.random, "uniform", lambda low, high: bounds.append(high) or 0)
+    return bounds
+
+
+def test_stream_yields_chunks_in_order_and_collects_the_final_trace():
+    stream = AgentStream({"sessionId": "s", "completion": events("a", "b", "c", trace={"step": 1})}, 0.0)
+
+    assert list(stream) == ["a", "b", "c"]
+    assert stream.traces == [{"step": 1}]
+    assert stream.total_time is not None and stream.time_to_first_token is not None
+
+
+def test_interleaved_iterators_each_see_every_chunk():
+    stream = AgentStream({"completion": events("a", "b", "c")}, 0.0)
+    first, second = iter(stream), iter(stream)
+
+    assert [next(first), next(second), next(second), next(first)] == ["a", "a", "b", "b"]
+    assert list(first) == ["c"]
+    assert stream.read() == "abc"
+
+
+def test_invoke_stream_reuses_the_session_of_a_conversation():
+    runtime = StubAgentRuntime()
+    agent = BedrockAgentClient("agent", client=runtime)
+
+    first = agent.invoke_stream("hi", conversation_id="c1", enable_trace=True)
+    second = agent.invoke_stream("again", conversation_id="c1")
+
+    assert first.read() == "echo: hi"
+    assert first.traces == [{"orchestrationTrace": {"prompt": "hi"}}]
+    assert first.session_id == second.session_id
+    assert runtime.calls[0]["enableTrace"] is True
+
+
+def test_invoke_many_backs_off_and_retries_throttled_prompts(delays):
+    runtime = StubAgentRuntime(throttle={"p1": 2})
+    agent = BedrockAgentClient("agent", client=runtime)
+
+    results = {result.index: result for result in agent.invoke_many(["p0", "p1", "p2"], max_concurrency=2)}
+
+    assert [results[index].response["completion"] for index in range(3)] == ["echo: p0", "echo: p1", "echo: p2"]
+    assert results[1].attempts == 3 and results[0].attempts == 1
+    assert delays == [1.0, 2.0]  # exponential backoff bounds after the first and second throttle
+
+
+def test_invoke_many_reports_throttling_after_the_retry_budget(delays):
+    runtime = StubAgentRuntime(throttle={"p0": 5})
+    agent = BedrockAgentClient("agent", client=runtime)
+
+    [result] = agent.invoke_many(["p0"], max_throttle_retries=2)
+
+    assert isinstance(result.error, ThrottlingException)
+    assert result.attempts == 3
+
+
+def test_invoke_many_reports_queue_time_apart_from_service_time():
+    agent = BedrockAgentClient("agent", client=StubAgentRuntime(delay=0.05))
+
+    results = sorted(agent.invoke_many(["p0", "p1"], max_concurrency=1), key=lambda result: result.index)
+
+    assert all(result.service_ms >= 45 for result in results)
+    assert results[0].queue_ms < 45 <= results[1].queue_ms
+
+
+def test_closing_invoke_many_cancels_prompts_not_yet_sent():
+    runtime = StubAgentRuntime(delay=0.02)
+    agent = BedrockAgentClient("agent", client=runtime)
+
+    results = agent.invoke_many([f"p{index}" for index in range(10)], max_concurrency=1)
+    next(results)
+    results.close()
+    time.sleep(0.1)
+
+    assert len(runtime.calls) <= 2
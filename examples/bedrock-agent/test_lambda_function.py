@@ -0,0 +1,314 @@
+"""
+Tests for the task Lambda against an in-memory DynamoDB stand-in.
+
+Run with:
+    python -m pytest test_lambda_function.py
+"""
+
+import json
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+import lambda_function
+from action_router import SchemaCompiler
+
+SESSION_ID = 'session-1'
+
+
+class ConditionalCheckFailedException(Exception):
+    pass
+
+
+class ProvisionedThroughputExceededException(Exception):
+    pass
+
+
+class FakeClient:
+    """The subset of the low-level DynamoDB client the Lambda uses."""
+
+    def __init__(self, table: 'FakeTable'):
+        self.table = table
+        self.exceptions = SimpleNamespace(
+            ConditionalCheckFailedException=ConditionalCheckFailedException,
+            ProvisionedThroughputExceededException=ProvisionedThroughputExceededException
+        )
+        self.batch_sizes = []
+        self.get_sizes = []
+        # Number of requests to leave unprocessed on each successive batch_write_item call
+        self.unprocessed = []
+        # Number of keys to leave unprocessed on each successive batch_get_item call
+        self.unprocessed_keys = []
+
+    def batch_get_item(self, RequestItems):
+        request = RequestItems[self.table.name]
+        keys = request['Keys']
+        assert len(keys) <= lambda_function.BATCH_GET_LIMIT
+        self.get_sizes.append(len(keys))
+
+        leave = self.unprocessed_keys.pop(0) if self.unprocessed_keys else 0
+        processed, rest = keys[:len(keys) - leave], keys[len(keys) - leave:]
+        with self.table.lock:
+            found = [dict(self.table.items[key['task_id']]) for key in processed if key['task_id'] in self.table.items]
+        return {
+            'Responses': {self.table.name: found},
+            'UnprocessedKeys': {self.table.name: {'Keys': rest}} if rest else {}
+        }
+
+    def batch_write_item(self, RequestItems):
+        requests = RequestItems[self.table.name]
+        assert len(requests) <= lambda_function.BATCH_WRITE_LIMIT
+        self.batch_sizes.append(len(requests))
+
+        leave = self.unprocessed.pop(0) if self.unprocessed else 0
+        processed, rest = requests[:len(requests) - leave], requests[len(requests) - leave:]
+        with self.table.lock:
+            for request in processed:
+                item = request['PutRequest']['Item']
+                self.table.items[item['task_id']] = dict(item)
+        return {'UnprocessedItems': {self.table.name: rest} if rest else {}}
+
+
+class FakeTable:
+    """Thread-safe in-memory table keyed by ``task_id`` with atomic conditional puts."""
+
+    name = 'Tasks'
+
+    def __init__(self):
+        self.items = {}
+        self.lock = threading.Lock()
+        self.puts = 0
+        self.meta = SimpleNamespace(client=FakeClient(self))
+
+    def put_item(self, Item, ConditionExpression=None):
+        with self.lock:
+            self.puts += 1
+            if ConditionExpression == 'attribute_not_exists(task_id)' and Item['task_id'] in self.items:
+                raise ConditionalCheckFailedException()
+            self.items[Item['task_id']] = dict(Item)
+
+    def get_item(self, Key, ConsistentRead=False):
+        with self.lock:
+            item = self.items.get(Key['task_id'])
+        return {'Item': dict(item)} if item is not None else {}
+
+
+@pytest.fixture
+def table(monkeypatch):
+    table = FakeTable()
+    monkeypatch.setattr(lambda_function, '_table', table)
+    monkeypatch.setattr(lambda_function.time, 'sleep', lambda seconds: None)
+    lambda_function._recent_creates.clear()
+    return table
+
+
+def invoke(operation: str, body: dict, session_id: str = SESSION_ID) -> dict:
+    event = {
+        'actionGroup': lambda_function.ACTION_GROUP,
+        'action': operation,
+        'apiPath': '/tasks/batch' if operation == 'createTasks' else '/tasks',
+        'requestBody': body,
+        'sessionId': session_id
+    }
+    response = lambda_function.lambda_handler(event, None)
+    return {'statusCode': response['statusCode'], 'body': json.loads(response['body'])}
+
+
+def make_tasks(count: int) -> list:
+    return [{'description': f'Task {i}', 'priority': 'low'} for i in range(count)]
+
+
+def test_create_tasks_writes_in_groups_of_25(table):
+    response = invoke('createTasks', {'tasks': make_tasks(60)})
+
+    assert response['statusCode'] == 200
+    assert response['body']['created'] == 60
+    assert table.meta.client.batch_sizes == [25, 25, 10]
+    assert len(table.items) == 60
+
+
+def test_create_tasks_retries_unprocessed_items(table):
+    table.meta.client.unprocessed = [10, 3]
+
+    response = invoke('createTasks', {'tasks': make_tasks(25)})
+
+    assert response['statusCode'] == 200
+    assert table.meta.client.batch_sizes == [25, 10, 3]
+    assert len(table.items) == 25
+
+
+def test_create_tasks_reports_items_left_unprocessed(table):
+    table.meta.client.unprocessed = [2] * (lambda_function.MAX_UNPROCESSED_RETRIES + 1)
+
+    response = invoke('createTasks', {'tasks': make_tasks(5)})
+
+    assert response['statusCode'] == 207
+    statuses = [result['status'] for result in response['body']['results']]
+    assert statuses == ['created', 'created', 'created', 'failed', 'failed']
+    assert len(table.items) == 3
+
+
+def test_create_tasks_reports_each_task_in_order(table):
+    tasks = [
+        {'description': 'Valid'},
+        {'description': 'Bad priority', 'priority': 'urgent'},
+        {'priority': 'high'},
+        {'description': 'Bad deadline', 'deadline': '03/01/2024'},
+        {'description': 'Also valid', 'deadline': '2024-03-01'}
+    ]
+
+    response = invoke('createTasks', {'tasks': tasks})
+
+    assert response['statusCode'] == 207
+    results = response['body']['results']
+    assert [result['index'] for result in results] == [0, 1, 2, 3, 4]
+    assert [result['status'] for result in results] == ['created', 'invalid', 'invalid', 'invalid', 'created']
+    assert 'priority' in results[1]['error'].lower()
+    assert response['body']['created'] == 2
+    assert response['body']['failed'] == 3
+    assert {item['task_id'] for item in table.items.values()} == {results[0]['task_id'], results[4]['task_id']}
+
+
+def test_router_rejects_null_for_required_field(table):
+    response = invoke('createTask', {'description': None})
+
+    assert response['statusCode'] == 400
+    assert 'requestBody.description: must not be null' in response['body']['error']
+    assert table.items == {}
+
+
+def test_length_limits_without_type_reject_non_strings():
+    validate = SchemaCompiler({}).compile({'minLength': 1, 'maxLength': 3})
+
+    validate('abc', 'value')
+    for value in (5, None, ['a']):
+        with pytest.raises(ValueError, match='value: expected string'):
+            validate(value, 'value')
+
+
+def test_create_task_replay_returns_original_task(table):
+    body = {'description': 'Write report', 'priority': 'high', 'idempotencyKey': 'report-1'}
+
+    first = invoke('createTask', body)
+    lambda_function._recent_creates.clear()
+    second = invoke('createTask', body)
+
+    assert first['statusCode'] == second['statusCode'] == 200
+    assert second['body'] == first['body']
+    assert len(table.items) == 1
+
+
+def test_create_task_rejects_reused_key_with_different_body(table):
+    invoke('createTask', {'description': 'Write report', 'idempotencyKey': 'report-1'})
+    lambda_function._recent_creates.clear()
+
+    response = invoke('createTask', {'description': 'Review report', 'idempotencyKey': 'report-1'})
+
+    assert response['statusCode'] == 409
+    assert [item['description'] for item in table.items.values()] == ['Write report']
+
+
+def test_create_task_requires_key_without_session(table):
+    response = invoke('createTask', {'description': 'Write report'}, session_id=None)
+
+    assert response['statusCode'] == 400
+    assert 'idempotencyKey' in response['body']['error']
+    assert table.items == {}
+
+
+def test_concurrent_duplicates_create_one_task(table):
+    threads = 16
+    barrier = threading.Barrier(threads)
+    responses = []
+
+    def create():
+        barrier.wait()
+        responses.append(invoke('createTask', {'description': 'Write report', 'idempotencyKey': 'report-1'}))
+
+    workers = [threading.Thread(target=create) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert len(table.items) == 1
+    assert {response['statusCode'] for response in responses} == {200}
+    assert len({response['body']['task_id'] for response in responses}) == 1
+
+
+def test_create_tasks_retry_does_not_overwrite_existing_tasks(table):
+    first = invoke('createTasks', {'tasks': make_tasks(3)})
+    created_at = {task_id: item['created_at'] for task_id, item in table.items.items()}
+    table.meta.client.batch_sizes.clear()
+
+    second = invoke('createTasks', {'tasks': make_tasks(3)})
+
+    assert second['statusCode'] == 200
+    assert second['body']['results'] == first['body']['results']
+    assert table.meta.client.batch_sizes == []
+    assert {task_id: item['created_at'] for task_id, item in table.items.items()} == created_at
+
+
+def test_create_tasks_reports_conflicting_keys(table):
+    invoke('createTask', {'description': 'Write report', 'idempotencyKey': 'report-1'})
+
+    response = invoke('createTasks', {'tasks': [
+        {'description': 'Review report', 'idempotencyKey': 'report-1'},
+        {'description': 'New task'}
+    ]})
+
+    assert response['statusCode'] == 207
+    assert [result['status'] for result in response['body']['results']] == ['conflict', 'created']
+    assert sorted(item['description'] for item in table.items.values()) == ['New task', 'Write report']
+
+
+def test_create_tasks_looks_up_in_groups_of_100_and_retries_unprocessed_keys(table):
+    table.meta.client.unprocessed_keys = [0, 20]
+
+    response = invoke('createTasks', {'tasks': make_tasks(150)})
+
+    assert response['statusCode'] == 200
+    assert table.meta.client.get_sizes == [100, 50, 20]
+    assert len(table.items) == 150
+
+
+def test_create_tasks_reports_repeated_keys_within_a_batch(table):
+    response = invoke('createTasks', {'tasks': [
+        {'description': 'Write report', 'idempotencyKey': 'report-1'},
+        {'description': 'Write report', 'priority': 'medium', 'idempotencyKey': 'report-1'},
+        {'description': 'Review report', 'idempotencyKey': 'report-1'}
+    ]})
+
+    results = response['body']['results']
+    assert response['statusCode'] == 207
+    assert [result['status'] for result in results] == ['created', 'duplicate', 'conflict']
+    assert results[1]['task_id'] == results[0]['task_id'] and results[1]['duplicate_of'] == 0
+    assert (response['body']['created'], response['body']['duplicates'], response['body']['failed']) == (1, 1, 1)
+    assert [item['description'] for item in table.items.values()] == ['Write report']
+
+
+def test_create_tasks_duplicate_shares_the_outcome_of_its_original(table):
+    table.meta.client.unprocessed = [1] * (lambda_function.MAX_UNPROCESSED_RETRIES + 1)
+
+    response = invoke('createTasks', {'tasks': [
+        {'description': 'Write report', 'idempotencyKey': 'report-1'},
+        {'description': 'Write report', 'idempotencyKey': 'report-1'}
+    ]})
+
+    assert [result['status'] for result in response['body']['results']] == ['failed', 'failed']
+
+
+def test_create_tasks_rejects_non_object_tasks(table):
+    response = invoke('createTasks', {'tasks': ['Write report', {'description': 'Valid'}]})
+
+    results = response['body']['results']
+    assert [result['status'] for result in results] == ['invalid', 'created']
+    assert results[0]['error'] == 'Each task must be an object'
+
+
+def test_create_tasks_stores_null_priority_as_medium(table):
+    response = invoke('createTasks', {'tasks': [{'description': 'Write report', 'priority': None}]})
+
+    assert response['statusCode'] == 200
+    assert [item['priority'] for item in table.items.values()] == ['medium']
@@ -1,10 +1,19 @@
 #!/usr/bin/env python3
 """
 Example of using BondAI's built-in tools for web crawling.
+With --crawl, many URLs (or a seed plus link depth) are fetched concurrently
+and only pages whose content changed since the last crawl go to the agent.
+Pages are pre-extracted (links, compact main text) before the agent sees them;
+--html-file runs the same extraction on saved pages offline.
 """
 
 import os
+import time
+import asyncio
 import argparse
+import pathlib
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from termcolor import cprint
 from bondai.agents import Agent, AgentEventNames, ConversationalAgent
 from bondai.agents.group_chat import GroupConversation, UserProxy
@@ -15,35 +24,106 @@ from bondai.tools import AgentTool
 from bondai.memory import MemoryManager, InMemoryCoreMemoryDataSource
 from dotenv import find_dotenv, load_dotenv
 
+from crawler import Crawler, CrawlState, decode
+from page_extractor import ExtractedPage, extract_page
+
+USER_AGENT = "bondai-crawler/1.0"
+# Non-HTML responses that are handed to the agent as they are
+TEXT_CONTENT_TYPES = ("application/json", "application/xml", "application/rss+xml", "application/atom+xml")
+
 def parse_arguments():
     parser = argparse.ArgumentParser(description='BondAI web crawler')
-    parser.add_argument('url', help='URL to crawl')
-    return parser.parse_args()
+    parser.add_argument('url', nargs='*', help='URL(s) to crawl')
+    parser.add_argument('--crawl', action='store_true',
+                        help='Fetch URLs concurrently and only send changed pages to the agent '
+                             '(implied by --urls-file, --depth or several URLs)')
+    parser.add_argument('--urls-file', help='File with one URL per line')
+    parser.add_argument('--depth', type=int, default=0, help='Follow links this many levels from each URL')
+    parser.add_argument('--all-hosts', action='store_true', help='Also follow links to other hosts')
+    parser.add_argument('--max-pages', type=int, default=500, help='Maximum pages per crawl')
+    parser.add_argument('--concurrency', type=int, default=20, help='Fetches in flight across all hosts')
+    parser.add_argument('--per-host', type=int, default=2, help='Connections per host')
+    parser.add_argument('--agents', type=int, default=4, help='Agent conversations run in parallel')
+    parser.add_argument('--state', default='data/crawl_state.json',
+                        help='ETags, Last-Modified dates and content hashes from earlier crawls')
+    parser.add_argument('--save-interval', type=float, default=5.0,
+                        help='Seconds between state saves while pages are processed (0 saves after every page)')
+    parser.add_argument('--fetch-only', action='store_true',
+                        help='Crawl and record page state without running the agent')
+    parser.add_argument('--html-file', action='append', default=[],
+                        help='Saved HTML page to process offline (repeatable); a URL argument is used as its base URL')
+    parser.add_argument('--extract-only', action='store_true',
+                        help='Print the pre-extracted page and token savings without running the agent')
+    parser.add_argument('--no-extract', action='store_true',
+                        help='Let the agent fetch pages and extract links with its own tools')
+    args = parser.parse_args()
 
-def main():
-    # Parse command line arguments
-    args = parse_arguments()
+    if args.urls_file:
+        with open(args.urls_file) as f:
+            args.url += [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    args.crawl = args.crawl or bool(args.urls_file) or args.depth > 0 or len(args.url) > 1
+    if not args.url and not args.html_file:
+        parser.error('at least one URL (or --urls-file or --html-file) is required')
+    return args
 
-    # Configure OpenAI connection
-    dotenv_path = find_dotenv()
-    print(f"Loading environment variables from: {dotenv_path}")
-    load_dotenv()
+def build_task(url):
+    return f"""Visit {url} and extract the following information:
+## Main Content
+[Provide a concise summary of the main content]
 
-    openai_key = os.getenv("OPENAI_API_KEY")
-    DefaultOpenAIConnectionParams.configure_openai_connection(api_key=openai_key)
+## Links
+[List any extracted hyperlinks, or None if none were found]
+"""
 
-    task = f"""Visit {args.url} and extract the following information:
+def build_extracted_task(page):
+    title = f' ("{page.title}")' if page.title else ""
+    return f"""Summarize the page {page.url}{title} from its extracted text below. The page has already
+been fetched and its links extracted, so no tools are needed. Reply in this format, copying the
+Links section unchanged:
 ## Main Content
 [Provide a concise summary of the main content]
 
 ## Links
-[List any extracted hyperlinks, or None if none were found]
+{page.links_markdown()}
+
+Extracted text:
+---
+{page.text}
+---
 """
 
+def fetch_html(url):
+    request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return decode(response.read(), response.headers.get_content_charset())
+
+def text_page(page, max_chars=20000):
+    """
+    Wrap an already fetched non-HTML text response for the agent, so it is
+    summarized from the body instead of being fetched again.
+    """
+    if not (page.content_type.startswith("text/") or page.content_type in TEXT_CONTENT_TYPES):
+        return None
+    text = page.text if len(page.text) <= max_chars else page.text[:max_chars] + "\n[... text truncated ...]"
+    return ExtractedPage(url=page.url, title="", text=text)
+
+def report_extraction(page):
+    cprint(
+        f"[extract] {page.url}: {page.html_tokens} HTML tokens -> {page.text_tokens} "
+        f"({page.saved_ratio:.0%} saved), {len(page.links)} links, {page.seconds * 1000:.1f} ms",
+        "cyan"
+    )
+
+def create_conversation(tools, tool_calls):
+    """
+    Create the task execution agent, the user liaison and their group conversation.
+    Agents keep conversation state, so every page gets its own set. Selected
+    tool names are appended to ``tool_calls``.
+    """
     # Create the task execution agent with tools
     task_execution_agent = Agent(
         llm=OpenAILLM(OpenAIModelNames.GPT4_0613),
-        tools=[WebsiteQueryTool(), ExtractHyperlinksTool()],
+        tools=tools,
         max_tool_retries=5,
         memory_manager=MemoryManager(
             core_memory_datasource=InMemoryCoreMemoryDataSource(
@@ -56,6 +136,7 @@ def main():
     # Add tool selection event handler
     @task_execution_agent.on(AgentEventNames.TOOL_SELECTED)
     def tool_selected(agent, tool_message):
+        tool_calls.append(tool_message.tool_name)
         if tool_message.tool_arguments and "thought" in tool_message.tool_arguments:
             message = f"Using tool {tool_message.tool_name}: {tool_message.tool_arguments['thought']}"
         else:
@@ -82,16 +163,121 @@ def main():
 
     # Set up the group conversation with non-interactive user proxy
     user_proxy = UserProxy(parse_recipients=False, auto_exit=True)
-    group_conversation = GroupConversation(
+    return GroupConversation(
         conversation_members=[user_proxy, user_liaison_agent]
     )
 
-    # Run the task through the user liaison
-    print(f"\nExecuting web crawling task for URL: {args.url}\n")
-    group_conversation.send_message(
+def run_task(url, page=None):
+    """
+    Run the task through the user liaison. With a pre-extracted ``page`` the
+    agent gets its text and links and no website tools.
+    """
+    print(f"\nExecuting web crawling task for URL: {url}\n")
+    if page is None:
+        tools, task = [WebsiteQueryTool(), ExtractHyperlinksTool()], build_task(url)
+    else:
+        tools, task = [], build_extracted_task(page)
+
+    tool_calls = []
+    started = time.perf_counter()
+    create_conversation(tools, tool_calls).send_message(
         recipient_name="User Liaison",
         message=task
     )
+    cprint(f"[agent] {url}: {time.perf_counter() - started:.1f}s, {len(tool_calls)} tool calls", "cyan")
+
+def process_html(html, url, args):
+    page = extract_page(html, url)
+    report_extraction(page)
+    if args.extract_only:
+        print(f"\n# {page.title}\n\n{page.text}\n\n## Links\n{page.links_markdown()}\n")
+    else:
+        run_task(url, page)
+
+async def crawl(args):
+    """
+    Crawl the URLs and hand each changed page to an agent conversation as soon
+    as it is fetched, so fetching and agent work overlap.
+    """
+    state = CrawlState(args.state, save_interval=args.save_interval)
+    crawler = Crawler(
+        state,
+        concurrency=args.concurrency,
+        per_host=args.per_host,
+        max_pages=args.max_pages,
+        same_host=not args.all_hosts
+    )
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=args.agents)
+
+    async def process(page):
+        url = page.url
+        # The agent only fetches the page again itself with --no-extract
+        extracted = None if args.no_extract else (page.extracted or text_page(page))
+        try:
+            if page.extracted is not None and extracted is page.extracted:
+                extracted.measure(page.text)
+                report_extraction(extracted)
+            if not (args.fetch_only or args.extract_only):
+                await loop.run_in_executor(executor, run_task, url, extracted)
+            state.mark_processed(url)
+        except Exception as e:
+            # Left unprocessed, so the page is sent again on the next crawl
+            cprint(f"Agent failed on {url}: {e}", "red")
+
+    started = time.perf_counter()
+    tasks, pages = [], []
+    try:
+        async for page in crawler.crawl(args.url, args.depth):
+            if page.error:
+                cprint(f"[{page.status or '---'}] {page.url}: {page.error}", "red")
+            elif page.changed:
+                cprint(f"[{page.status}] {page.url} changed ({page.seconds * 1000:.0f} ms)", "green")
+                pages.append(page)
+                tasks.append(asyncio.create_task(process(page)))
+            else:
+                cprint(f"[{page.status}] {page.url} unchanged", "yellow")
+        await asyncio.gather(*tasks)
+    finally:
+        # On errors and Ctrl+C, drop agent runs not started yet without blocking the loop
+        executor.shutdown(wait=False, cancel_futures=True)
+        # Also on errors and Ctrl+C, so pages processed so far are not sent again
+        state.save()
+
+    cprint(f"\nCrawled {crawler.scheduled} URLs in {time.perf_counter() - started:.2f}s: {crawler.counts}", "cyan")
+    extracted = [page for page in pages if page.extracted is not None and page.extracted.html_tokens is not None]
+    if extracted and not args.no_extract:
+        html_tokens = sum(page.extracted.html_tokens for page in extracted)
+        text_tokens = sum(page.extracted.text_tokens for page in extracted)
+        cprint(
+            f"Pre-extraction: {html_tokens} HTML tokens -> {text_tokens} over {len(extracted)} changed pages "
+            f"({1 - text_tokens / max(html_tokens, 1):.0%} saved)",
+            "cyan"
+        )
+
+def main():
+    # Parse command line arguments
+    args = parse_arguments()
+
+    # Configure OpenAI connection
+    dotenv_path = find_dotenv()
+    print(f"Loading environment variables from: {dotenv_path}")
+    load_dotenv()
+
+    openai_key = os.getenv("OPENAI_API_KEY")
+    DefaultOpenAIConnectionParams.configure_openai_connection(api_key=openai_key)
+
+    if args.html_file:
+        # Offline: saved pages, resolved against the URL argument if there is one
+        for path in args.html_file:
+            base_url = args.url[0] if args.url else pathlib.Path(path).resolve().as_uri()
+            process_html(pathlib.Path(path).read_text(errors="replace"), base_url, args)
+    elif args.crawl:
+        asyncio.run(crawl(args))
+    elif args.no_extract:
+        run_task(args.url[0])
+    else:
+        process_html(fetch_html(args.url[0]), args.url[0], args)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,358 @@
+"""
+Concurrent crawler feeding the BondAI agent.
+Fetches pages over a pooled aiohttp session with per-host connection limits,
+honours robots.txt (including Crawl-delay), sends conditional requests using
+the ETag/Last-Modified of the previous crawl and reports which pages changed
+since their content was last processed. HTML pages are pre-extracted while
+they are fetched, and change detection uses the extracted content.
+"""
+
+import os
+import json
+import time
+import asyncio
+import hashlib
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, Iterable, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from urllib.robotparser import RobotFileParser
+
+import aiohttp
+
+from page_extractor import ExtractedPage, extract_page
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+TRACKING_PARAMS = ("utm_", "fbclid", "gclid")
+
+
+def normalize_url(url: str) -> Optional[str]:
+    """
+    Canonical form used for the visited set and crawl state, or None for
+    non-HTTP links. Lowercases scheme and host, drops default ports,
+    fragments and tracking parameters, and sorts the query.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parts.hostname:
+        return None
+
+    host = parts.hostname.lower()
+    try:
+        port = parts.port
+    except ValueError:
+        return None
+    netloc = host if port in (None, DEFAULT_PORTS[scheme]) else f"{host}:{port}"
+
+    query = sorted(
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not name.startswith(TRACKING_PARAMS)
+    )
+    return urlunsplit((scheme, netloc, parts.path or "/", urlencode(query), ""))
+
+
+@dataclass
+class Page:
+    """Outcome of fetching one URL."""
+    url: str
+    depth: int
+    final_url: str = ""
+    status: int = 0
+    content_type: str = ""
+    text: str = ""
+    content_hash: str = ""
+    changed: bool = False
+    links: List[str] = field(default_factory=list)
+    extracted: Optional[ExtractedPage] = None
+    error: str = ""
+    seconds: float = 0.0
+
+
+class CrawlState:
+    """
+    Per-URL validators and content hashes persisted between crawls as JSON.
+    ``processed_hash`` is set only once the agent has handled a page, so a
+    page whose processing failed is fetched in full and sent again next time.
+    The file is rewritten at most every ``save_interval`` seconds as pages
+    are processed, so an interrupted crawl loses little work.
+    """
+
+    def __init__(self, path: str = "data/crawl_state.json", save_interval: float = 5.0):
+        self.path = path
+        self.save_interval = save_interval
+        self.entries: Dict[str, dict] = {}
+        self._saved_at = time.monotonic()
+        if os.path.exists(path):
+            with open(path) as f:
+                self.entries = json.load(f)
+
+    def get(self, url: str) -> dict:
+        return self.entries.get(url, {})
+
+    def record(self, page: Page, etag: Optional[str], last_modified: Optional[str]) -> None:
+        entry = self.entries.setdefault(page.url, {})
+        entry.update(
+            etag=etag,
+            last_modified=last_modified,
+            content_hash=page.content_hash,
+            links=page.links,
+            fetched_at=time.time()
+        )
+
+    def mark_processed(self, url: str) -> None:
+        entry = self.entries.get(url)
+        if entry is not None:
+            entry["processed_hash"] = entry.get("content_hash")
+        if time.monotonic() - self._saved_at >= self.save_interval:
+            self.save()
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w") as f:
+            json.dump(self.entries, f)
+        os.replace(temporary, self.path)
+        self._saved_at = time.monotonic()
+
+
+class RobotsPolicy:
+    """robots.txt rules, fetched once per host and cached for the crawl."""
+
+    def __init__(self, user_agent: str):
+        self.user_agent = user_agent
+        self._parsers: Dict[str, RobotFileParser] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    async def parser(self, session: aiohttp.ClientSession, origin: str) -> RobotFileParser:
+        lock = self._locks.setdefault(origin, asyncio.Lock())
+        async with lock:
+            if origin not in self._parsers:
+                self._parsers[origin] = await self._fetch(session, origin)
+            return self._parsers[origin]
+
+    async def allowed(self, session: aiohttp.ClientSession, url: str) -> bool:
+        parser = await self.parser(session, origin_of(url))
+        return parser.can_fetch(self.user_agent, url)
+
+    def crawl_delay(self, origin: str) -> float:
+        parser = self._parsers.get(origin)
+        delay = parser.crawl_delay(self.user_agent) if parser is not None else None
+        return float(delay or 0)
+
+    async def _fetch(self, session: aiohttp.ClientSession, origin: str) -> RobotFileParser:
+        parser = RobotFileParser(f"{origin}/robots.txt")
+        try:
+            async with session.get(parser.url) as response:
+                if response.status in (401, 403):
+                    parser.disallow_all = True
+                elif response.status >= 400:
+                    parser.allow_all = True
+                else:
+                    parser.parse((await response.text(errors="replace")).splitlines())
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            parser.allow_all = True
+        return parser
+
+
+def decode(body: bytes, charset: Optional[str]) -> str:
+    try:
+        return body.decode(charset or "utf-8", errors="replace")
+    except LookupError:
+        return body.decode("utf-8", errors="replace")
+
+
+def origin_of(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+class Crawler:
+    """Breadth-first crawl from seed URLs with pooled, polite, conditional fetching."""
+
+    def __init__(
+        self,
+        state: CrawlState,
+        concurrency: int = 20,
+        per_host: int = 2,
+        max_pages: int = 500,
+        same_host: bool = True,
+        timeout: float = 30,
+        max_bytes: int = 5 * 1024 * 1024,
+        user_agent: str = "bondai-crawler/1.0"
+    ):
+        """
+        Initialize the crawler.
+
+        Args:
+            state: Validators and hashes from previous crawls (updated in place)
+            concurrency: Fetches in flight across all hosts
+            per_host: Connections per host
+            max_pages: Stop scheduling new URLs after this many (redirect
+                targets are not counted)
+            same_host: Only follow links to the host of the page they were found on
+                (after redirects)
+            timeout: Total seconds allowed per request
+            max_bytes: Response bodies are truncated to this size
+            user_agent: Sent with every request and matched against robots.txt
+        """
+        self.state = state
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.max_pages = max_pages
+        self.same_host = same_host
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.user_agent = user_agent
+        self.robots = RobotsPolicy(user_agent)
+        # URLs scheduled or reached through a redirect; never scheduled again
+        self.visited = set()
+        # URLs whose content has been requested, including redirect targets
+        self.fetched = set()
+        self.scheduled = 0
+        self.counts: Dict[str, int] = {
+            "fetched": 0, "not_modified": 0, "changed": 0, "unchanged": 0, "disallowed": 0, "errors": 0
+        }
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._next_fetch: Dict[str, float] = {}
+        self._host_locks: Dict[str, asyncio.Lock] = {}
+
+    async def crawl(self, seeds: Iterable[str], max_depth: int = 0) -> AsyncIterator[Page]:
+        """Yield every page as soon as it is fetched; links are followed up to ``max_depth``."""
+        frontier: asyncio.Queue = asyncio.Queue()
+        pages: asyncio.Queue = asyncio.Queue()
+        for seed in seeds:
+            self._schedule(frontier, seed, 0)
+
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.per_host, ttl_dns_cache=300)
+        async with aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers={"User-Agent": self.user_agent}
+        ) as session:
+            self._session = session
+            workers = [
+                asyncio.create_task(self._worker(frontier, pages, max_depth))
+                for _ in range(self.concurrency)
+            ]
+            finished = asyncio.create_task(frontier.join())
+            try:
+                while True:
+                    next_page = asyncio.create_task(pages.get())
+                    done, _ = await asyncio.wait({next_page, finished}, return_when=asyncio.FIRST_COMPLETED)
+                    if next_page in done:
+                        yield next_page.result()
+                        continue
+                    next_page.cancel()
+                    # Workers enqueue a page before marking its URL done, so none are lost here
+                    while not pages.empty():
+                        yield pages.get_nowait()
+                    break
+            finally:
+                finished.cancel()
+                for worker in workers:
+                    worker.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+                self._session = None
+
+    async def fetch(self, url: str, depth: int = 0) -> Page:
+        """Fetch one normalized URL, conditionally if its last version was processed."""
+        if not await self.robots.allowed(self._session, url):
+            self.counts["disallowed"] += 1
+            return Page(url, depth, error="disallowed by robots.txt")
+        await self._throttle(origin_of(url))
+        self.fetched.add(url)
+
+        entry = self.state.get(url)
+        headers = {}
+        if entry and entry.get("processed_hash") == entry.get("content_hash"):
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        started = time.perf_counter()
+        async with self._session.get(url, headers=headers) as response:
+            self.counts["fetched"] += 1
+            if response.status == 304:
+                self.counts["not_modified"] += 1
+                return Page(
+                    url, depth,
+                    final_url=str(response.url),
+                    status=304,
+                    content_hash=entry.get("content_hash", ""),
+                    links=entry.get("links", []),
+                    seconds=time.perf_counter() - started
+                )
+
+            body = await response.content.read(self.max_bytes)
+            page = Page(
+                url, depth,
+                final_url=str(response.url),
+                status=response.status,
+                content_type=response.content_type,
+                text=decode(body, response.charset),
+                content_hash=hashlib.sha256(body).hexdigest(),
+                seconds=time.perf_counter() - started
+            )
+            if response.status != 200:
+                self.counts["errors"] += 1
+                page.error = f"HTTP {response.status}"
+                return page
+
+            # Redirect targets count as visited (and fetched) too
+            final_url = normalize_url(str(response.url))
+            if final_url:
+                self.visited.add(final_url)
+                self.fetched.add(final_url)
+            if page.content_type in ("text/html", "application/xhtml+xml"):
+                # One parse gives the links to follow, the agent's input and the hash to compare;
+                # tokens are counted later, and only for pages that are reported
+                page.extracted = extract_page(page.text, str(response.url), measure=False)
+                page.links = [url for _, url in page.extracted.links]
+                page.content_hash = page.extracted.content_hash
+
+            page.changed = page.content_hash != entry.get("processed_hash")
+            self.counts["changed" if page.changed else "unchanged"] += 1
+            self.state.record(page, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+            return page
+
+    async def _worker(self, frontier: asyncio.Queue, pages: asyncio.Queue, max_depth: int) -> None:
+        while True:
+            url, depth = await frontier.get()
+            try:
+                if url in self.fetched:
+                    continue  # already fetched as the target of another URL's redirect
+                try:
+                    page = await self.fetch(url, depth)
+                except Exception as e:
+                    # One bad URL must not take a worker down with it
+                    self.counts["errors"] += 1
+                    page = Page(url, depth, error=f"{type(e).__name__}: {e}")
+                if depth < max_depth:
+                    # Links are relative to where any redirects ended, so that is the host to stay on
+                    host = urlsplit(page.final_url or url).hostname
+                    for link in page.links:
+                        self._schedule(frontier, link, depth + 1, host)
+                pages.put_nowait(page)
+            finally:
+                frontier.task_done()
+
+    def _schedule(self, frontier: asyncio.Queue, url: str, depth: int, host: Optional[str] = None) -> None:
+        url = normalize_url(url)
+        if url is None or url in self.visited or self.scheduled >= self.max_pages:
+            return
+        if host is not None and self.same_host and urlsplit(url).hostname != host:
+            return
+        self.visited.add(url)
+        self.scheduled += 1
+        frontier.put_nowait((url, depth))
+
+    async def _throttle(self, origin: str) -> None:
+        """Space requests to a host by its robots.txt Crawl-delay, if any."""
+        delay = self.robots.crawl_delay(origin)
+        if not delay:
+            return
+        async with self._host_locks.setdefault(origin, asyncio.Lock()):
+            wait = self._next_fetch.get(origin, 0) - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._next_fetch[origin] = time.monotonic() + delay
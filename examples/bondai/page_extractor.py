@@ -0,0 +1,284 @@
+"""
+Deterministic pre-extraction of fetched pages.
+One streaming html.parser pass collects the links, drops scripts, navigation,
+footers and other boilerplate, and turns the main content into compact text,
+so the agent only summarizes instead of fetching and parsing with tool calls.
+"""
+
+import re
+import time
+import hashlib
+from dataclasses import dataclass, field
+from functools import lru_cache
+from html.parser import HTMLParser
+from typing import List, Optional, Tuple
+from urllib.parse import urljoin
+
+# Never contain readable content
+SKIP_TAGS = {"script", "style", "noscript", "template", "svg", "canvas", "iframe", "object", "select"}
+# Site chrome rather than page content
+BOILERPLATE_TAGS = {"nav", "header", "footer", "aside", "form", "button", "dialog"}
+BOILERPLATE_ROLES = {"navigation", "banner", "contentinfo", "complementary", "search", "dialog"}
+# Matched against whole words of id and class tokens ("cookie-banner", "site_footer", not "shared")
+BOILERPLATE_HINT = re.compile(
+    r"(cookie|consent|breadcrumb|sidebar|navbar|menu|share|social|advert|promo|popup|modal|newsletter|footer)s?",
+    re.IGNORECASE
+)
+# Layout modifiers such as "no-sidebar" describe the page, not a boilerplate element
+MODIFIER_PREFIXES = ("no-", "has-", "with-")
+MAIN_TAGS = {"main", "article"}
+# Never treated as boilerplate, whatever their id or class
+CONTENT_TAGS = {"html", "body"} | MAIN_TAGS
+BLOCK_TAGS = {
+    "p", "div", "section", "li", "ul", "ol", "dl", "dt", "dd", "tr", "table", "blockquote", "pre",
+    "h1", "h2", "h3", "h4", "h5", "h6", "br", "hr", "figure", "figcaption", "main", "article", "body"
+}
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+# A <main>/<article> with less text than this is not trusted to hold the content
+MIN_MAIN_CHARS = 200
+# Token estimate used when tiktoken or its encoding file is unavailable
+CHARS_PER_TOKEN = 4
+
+
+@lru_cache(maxsize=None)
+def get_encoding():
+    """Load cl100k_base on first use; None when tiktoken is missing or its data cannot be fetched."""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return None
+
+
+def count_tokens(text: str) -> int:
+    encoding = get_encoding()
+    if encoding is None:
+        return len(text) // CHARS_PER_TOKEN
+    return len(encoding.encode(text))
+
+
+@dataclass
+class ExtractedPage:
+    """Compact form of a page, plus what extraction saved."""
+    url: str
+    title: str
+    text: str
+    links: List[Tuple[str, str]] = field(default_factory=list)
+    html_tokens: Optional[int] = None
+    text_tokens: Optional[int] = None
+    seconds: float = 0.0
+
+    @property
+    def content_hash(self) -> str:
+        """Hash of the extracted content, so changes to scripts or markup alone don't count."""
+        payload = "\n".join([self.title, self.text] + [url for _, url in self.links])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @property
+    def saved_ratio(self) -> float:
+        return 1 - self.text_tokens / self.html_tokens if self.html_tokens else 0.0
+
+    def measure(self, html: str) -> None:
+        """Count the tokens of the source ``html`` and of what the agent is sent instead."""
+        self.html_tokens = count_tokens(html)
+        self.text_tokens = count_tokens(self.text) + count_tokens(self.links_markdown())
+
+    def links_markdown(self, limit: int = 200) -> str:
+        if not self.links:
+            return "None"
+        lines = [f"- [{text or url}]({url})" for text, url in self.links[:limit]]
+        if len(self.links) > limit:
+            lines.append(f"- ({len(self.links) - limit} more links omitted)")
+        return "\n".join(lines)
+
+
+class ContentParser(HTMLParser):
+    """
+    Single pass over the HTML collecting title, links, <main>/<article> text,
+    all non-boilerplate text and, as a fallback, all visible text.
+
+    Boilerplate around a <main>/<article> does not hide it: a wrapper such as
+    ``<div id="main-menu-wrapper">`` only filters text outside the article.
+    """
+
+    def __init__(self, base_url: str):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.title = ""
+        self.links: List[Tuple[str, str]] = []
+        self.text: List[str] = []
+        self.main_text: List[str] = []
+        self.all_text: List[str] = []
+        self._stack: List[Tuple[str, bool, bool, bool]] = []  # (tag, skipped, boilerplate, main)
+        self._skip = 0
+        self._boilerplate = 0
+        # Boilerplate open inside the innermost <main>/<article>, and the counts saved for its ancestors
+        self._main_boilerplate = 0
+        self._saved_main_boilerplate: List[int] = []
+        self._main = 0
+        self._pre = 0
+        self._in_title = False
+        self._link: Optional[List[str]] = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "base" and attrs.get("href"):
+            self.base_url = urljoin(self.base_url, attrs["href"])
+        elif tag == "title":
+            self._in_title = True
+        elif tag == "a" and attrs.get("href"):
+            # Links are kept even inside navigation: they are what the crawler follows
+            self._finish_link()
+            self._link = [urljoin(self.base_url, attrs["href"]), ""]
+
+        if tag in VOID_TAGS:
+            if tag in ("br", "hr"):
+                self._emit("\n")
+            return
+
+        skipped = tag in SKIP_TAGS or self._is_hidden(attrs)
+        main = tag in MAIN_TAGS or attrs.get("role") == "main"
+        boilerplate = (
+            not skipped and not main and tag not in CONTENT_TAGS
+            and (tag in BOILERPLATE_TAGS or self._is_boilerplate(attrs))
+        )
+        self._stack.append((tag, skipped, boilerplate, main))
+        self._skip += skipped
+        self._boilerplate += boilerplate
+        self._main_boilerplate += boilerplate
+        if main:
+            self._main += 1
+            self._saved_main_boilerplate.append(self._main_boilerplate)
+            self._main_boilerplate = 0
+        if tag == "pre":
+            self._pre += 1
+
+        if tag in BLOCK_TAGS:
+            self._emit("\n")
+        if tag in ("h1", "h2", "h3", "h4", "h5", "h6"):
+            self._emit("#" * int(tag[1]) + " ")
+        elif tag == "li":
+            self._emit("- ")
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag == "title":
+            self._in_title = False
+        elif tag == "a":
+            self._finish_link()
+
+        # Unclosed children (<p>, <li>, ...) are closed along with their parent
+        if not any(open_tag == tag for open_tag, _, _, _ in self._stack):
+            return
+        while self._stack:
+            open_tag, skipped, boilerplate, main = self._stack.pop()
+            self._skip -= skipped
+            self._boilerplate -= boilerplate
+            self._main_boilerplate -= boilerplate
+            if main:
+                self._main -= 1
+                self._main_boilerplate = self._saved_main_boilerplate.pop()
+            if open_tag == "pre":
+                self._pre -= 1
+            if open_tag in BLOCK_TAGS:
+                self._emit("\n")
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+            return
+        if self._link is not None:
+            self._link[1] += data
+        if self._skip:
+            return
+        self._emit(data if self._pre else re.sub(r"\s+", " ", data))
+
+    def close(self):
+        super().close()
+        self._finish_link()
+
+    def _emit(self, data: str) -> None:
+        if self._skip:
+            return
+        self.all_text.append(data)
+        in_main = self._main and not self._main_boilerplate
+        if in_main:
+            self.main_text.append(data)
+        if in_main or not self._boilerplate:
+            self.text.append(data)
+
+    def _finish_link(self) -> None:
+        if self._link is not None:
+            url, text = self._link
+            self.links.append((re.sub(r"\s+", " ", text).strip(), url))
+            self._link = None
+
+    @staticmethod
+    def _is_hidden(attrs: dict) -> bool:
+        return "hidden" in attrs or attrs.get("aria-hidden") == "true"
+
+    @staticmethod
+    def _is_boilerplate(attrs: dict) -> bool:
+        if attrs.get("role") in BOILERPLATE_ROLES:
+            return True
+        tokens = f"{attrs.get('id') or ''} {attrs.get('class') or ''}".lower().split()
+        return any(
+            BOILERPLATE_HINT.fullmatch(word)
+            for token in tokens if not token.startswith(MODIFIER_PREFIXES)
+            for word in re.split(r"[-_]", token)
+        )
+
+
+def compact_text(chunks: List[str]) -> str:
+    """Join text chunks into trimmed lines without blanks or consecutive duplicates."""
+    lines = []
+    for line in "".join(chunks).splitlines():
+        line = line.rstrip() if line.startswith(" " * 4) else line.strip()
+        if line and (not lines or lines[-1] != line) and line not in ("-", "#"):
+            lines.append(line)
+    return "\n".join(lines)
+
+
+def extract_page(html: str, url: str, max_chars: int = 20000, measure: bool = True) -> ExtractedPage:
+    """
+    Extract title, unique links and compact main text from ``html``.
+
+    Text inside <main>/<article> is used when there is enough of it,
+    otherwise all non-boilerplate text of the page, and all visible text if
+    filtering left nothing. Text is cut at ``max_chars``. Token counts are
+    only filled in when ``measure`` is true (see ``ExtractedPage.measure``).
+    """
+    started = time.perf_counter()
+    parser = ContentParser(url)
+    parser.feed(html)
+    parser.close()
+
+    text = compact_text(parser.main_text)
+    if len(text) < MIN_MAIN_CHARS:
+        text = compact_text(parser.text) or text or compact_text(parser.all_text)
+    if len(text) > max_chars:
+        text = text[:max_chars] + "\n[... text truncated ...]"
+
+    links, seen = [], set()
+    for link_text, link_url in parser.links:
+        if link_url.startswith(("http://", "https://")) and link_url.split("#")[0] not in seen:
+            seen.add(link_url.split("#")[0])
+            links.append((link_text, link_url))
+
+    page = ExtractedPage(
+        url=url,
+        title=re.sub(r"\s+", " ", parser.title).strip(),
+        text=text,
+        links=links,
+        seconds=time.perf_counter() - started
+    )
+    if measure:
+        page.measure(html)
+    return page
@@ -0,0 +1,137 @@
+"""
+Tests for the crawl-mode fetcher against a local HTTP fixture site.
+
+Run with:
+    python -m pytest test_crawler.py
+"""
+
+import asyncio
+import functools
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from crawler import Crawler, CrawlState
+
+SITE = {
+    "robots.txt": "User-agent: *\nDisallow: /private/\n",
+    "index.html": (
+        '<html><body><a href="a.html">A</a> <a href="/b.html#top">B</a> '
+        '<a href="private/secret.html">Secret</a> <a href="https://other.example/">Elsewhere</a></body></html>'
+    ),
+    "a.html": '<html><body><p>Page A</p><a href="/">Home</a></body></html>',
+    "b.html": '<html><body><p>Page B</p><a href="c.html">C</a></body></html>',
+    "c.html": "<html><body><p>Page C</p></body></html>",
+    "private/secret.html": "<html><body><p>Secret</p></body></html>",
+}
+
+
+# Same-host redirects, by request path
+REDIRECTS = {"/old-c": "/c.html", "/old-index": "/"}
+
+
+class FixtureHandler(SimpleHTTPRequestHandler):
+    """Serves the fixture directory; ``/moved`` redirects to the ``localhost`` alias of the server."""
+
+    def do_GET(self):
+        location = REDIRECTS.get(self.path)
+        if self.path == "/moved":
+            location = f"http://localhost:{self.server.server_port}/b.html"
+        if location:
+            self.send_response(302)
+            self.send_header("Location", location)
+            self.end_headers()
+            return
+        super().do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def site(tmp_path):
+    root = tmp_path / "site"
+    for name, body in SITE.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(FixtureHandler, directory=str(root)))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def crawl(state: CrawlState, seeds, depth: int, **options):
+    """Run one crawl, marking every changed page processed as --fetch-only does."""
+    crawler = Crawler(state, **{"concurrency": 4, **options})
+
+    async def run():
+        pages = []
+        async for page in crawler.crawl(seeds, depth):
+            if not page.error and page.changed:
+                state.mark_processed(page.url)
+            pages.append(page)
+        return pages
+
+    pages = asyncio.run(run())
+    return crawler, {page.url: page for page in pages}
+
+
+def test_crawl_follows_same_host_links_and_honours_robots(site, tmp_path):
+    crawler, pages = crawl(CrawlState(str(tmp_path / "state.json")), [site + "/"], depth=2)
+
+    assert pages[f"{site}/private/secret.html"].error == "disallowed by robots.txt"
+    assert {url for url, page in pages.items() if not page.error} == {
+        f"{site}/", f"{site}/a.html", f"{site}/b.html", f"{site}/c.html"
+    }
+    assert not any("other.example" in url for url in crawler.visited)
+
+
+def test_second_crawl_gets_304_for_processed_pages(site, tmp_path):
+    path = str(tmp_path / "state.json")
+    state = CrawlState(path)
+    crawl(state, [site + "/"], depth=1)
+    state.save()
+
+    crawler, pages = crawl(CrawlState(path), [site + "/"], depth=1)
+
+    fetched = [page for page in pages.values() if not page.error]
+    assert fetched and all(page.status == 304 and not page.changed for page in fetched)
+    assert crawler.counts["not_modified"] == len(fetched)
+
+
+def test_links_after_redirect_stay_on_final_host(site, tmp_path):
+    port = site.rsplit(":", 1)[1]
+
+    _, pages = crawl(CrawlState(str(tmp_path / "state.json")), [site + "/moved"], depth=1)
+
+    assert pages[f"{site}/moved"].final_url == f"http://localhost:{port}/b.html"
+    assert pages[f"http://localhost:{port}/c.html"].status == 200
+
+
+def test_state_is_saved_as_pages_are_processed(site, tmp_path):
+    path = tmp_path / "state.json"
+
+    crawl(CrawlState(str(path), save_interval=0), [site + "/"], depth=0)
+
+    assert f"{site}/" in path.read_text()
+
+
+def test_redirect_targets_do_not_count_toward_max_pages(site, tmp_path):
+    crawler, pages = crawl(CrawlState(str(tmp_path / "state.json")), [site + "/old-index"], depth=1, max_pages=3)
+
+    assert set(pages) == {f"{site}/old-index", f"{site}/a.html", f"{site}/b.html"}
+    assert crawler.scheduled == 3
+
+
+def test_queued_url_already_fetched_through_a_redirect_is_skipped(site, tmp_path):
+    crawler, pages = crawl(
+        CrawlState(str(tmp_path / "state.json")), [site + "/old-c", site + "/c.html"], depth=0, concurrency=1
+    )
+
+    assert list(pages) == [f"{site}/old-c"]
+    assert crawler.counts["fetched"] == 1
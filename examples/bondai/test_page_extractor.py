@@ -0,0 +1,65 @@
+"""
+Tests for page pre-extraction.
+
+Run with:
+    python -m pytest test_page_extractor.py
+"""
+
+import page_extractor
+from page_extractor import extract_page
+
+ARTICLE = "Agent frameworks let a model call tools. " * 8
+
+
+def text_of(html: str) -> str:
+    return extract_page(html, "https://example.com/", measure=False).text
+
+
+def test_body_class_is_never_boilerplate():
+    assert "Hello world" in text_of('<html><body class="page no-sidebar"><p>Hello world</p></body></html>')
+
+
+def test_article_inside_boilerplate_wrapper_is_kept():
+    html = f'<body><div id="main-menu-wrapper"><ul><li>Home</li></ul><article><p>{ARTICLE}</p></article></div></body>'
+
+    text = text_of(html)
+
+    assert ARTICLE.strip() in text
+    assert "Home" not in text
+
+
+def test_short_article_inside_boilerplate_wrapper_is_kept():
+    html = '<body><div id="main-menu-wrapper"><article><p>Short news item.</p></article></div></body>'
+
+    assert "Short news item." in text_of(html)
+
+
+def test_hints_match_whole_words_of_class_tokens():
+    html = (
+        '<body><div class="shared-content"><p>Kept paragraph.</p></div>'
+        '<div class="cookie-banner"><p>We use cookies.</p></div>'
+        '<div id="site_footer"><p>Copyright.</p></div></body>'
+    )
+
+    text = text_of(html)
+
+    assert "Kept paragraph." in text
+    assert "cookies" not in text
+    assert "Copyright" not in text
+
+
+def test_falls_back_to_unfiltered_text_when_everything_is_boilerplate():
+    html = '<body><nav><p>Only navigation text.</p></nav><script>ignored()</script></body>'
+
+    text = text_of(html)
+
+    assert text == "Only navigation text."
+
+
+def test_tokens_are_estimated_without_tiktoken(monkeypatch):
+    monkeypatch.setattr(page_extractor, "get_encoding", lambda: None)
+
+    page = extract_page("<body><p>abcdefgh</p></body>", "https://example.com/")
+
+    assert page.html_tokens == len("<body><p>abcdefgh</p></body>") // 4
+    assert page.text_tokens == page_extractor.count_tokens("abcdefgh") + page_extractor.count_tokens("None")
@@ -0,0 +1,102 @@
+"""
+On-disk result cache for CrewAI tasks.
+A task's output is keyed by its description, its agent's role/goal/backstory
+and the hashes of its upstream outputs, so editing one task only re-runs that
+task and the tasks downstream of it.
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from typing import List, Optional
+
+from crewai import Task
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class TaskCache:
+    """Directory of JSON entries with least-recently-used, size-based eviction."""
+
+    def __init__(self, cache_dir: str = ".task_cache", max_bytes: int = 50 * 1024 * 1024):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding one JSON file per cached task output
+            max_bytes: Total size above which the least recently used entries are removed
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._evict_lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key_for(self, task: Task, upstream_outputs: List[str]) -> str:
+        """Build the cache key for a task given its dependencies' outputs, in dependency order."""
+        agent = task.agent
+        return _sha256(json.dumps({
+            "description": task.description,
+            "role": getattr(agent, "role", None),
+            "goal": getattr(agent, "goal", None),
+            "backstory": getattr(agent, "backstory", None),
+            "upstream": [_sha256(output) for output in upstream_outputs]
+        }, sort_keys=True))
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached output for ``key``, or None."""
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.misses += 1
+            return None
+
+        try:
+            os.utime(path)  # mark as recently used
+        except FileNotFoundError:
+            pass  # evicted since it was read
+        self.hits += 1
+        return entry["output"]
+
+    def put(self, key: str, output: str) -> None:
+        """Store ``output`` under ``key`` and evict old entries if over the size limit."""
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"output": output, "created_at": time.time()}, f)
+        os.replace(tmp_path, path)
+        self._evict()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _evict(self) -> None:
+        # Task threads of one run evict one at a time; other processes sharing
+        # the directory may still remove entries underneath us
+        with self._evict_lock:
+            entries = []
+            for name in os.listdir(self.cache_dir):
+                if not name.endswith(".json"):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(self.cache_dir, name))
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, name))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, name in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except FileNotFoundError:
+                    pass
+                total -= size
@@ -0,0 +1,188 @@
+"""
+Dependency-graph execution for CrewAI tasks.
+Tasks declare explicit dependencies; independent tasks run concurrently under a
+worker limit and each task receives only the outputs of its own dependencies.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from crewai import Task
+
+from task_cache import TaskCache
+
+
+@dataclass
+class TaskNode:
+    """A task plus the names of the tasks whose outputs it needs."""
+    name: str
+    task: Task
+    depends_on: List[str] = field(default_factory=list)
+
+
+@dataclass
+class TaskGraphResult:
+    """Outputs and timing of a task-graph run."""
+    outputs: Dict[str, str]
+    durations: Dict[str, float]
+    wall_time: float
+    critical_path: List[str]
+    cached: List[str] = field(default_factory=list)
+
+    @property
+    def sequential_time(self) -> float:
+        """Time the same tasks would take run one after another."""
+        return sum(self.durations.values())
+
+    @property
+    def time_saved(self) -> float:
+        return self.sequential_time - self.wall_time
+
+    @property
+    def critical_path_time(self) -> float:
+        return sum(self.durations[name] for name in self.critical_path)
+
+
+def execute_task(task: Task, context: Optional[str]) -> str:
+    """Run a CrewAI task with the given upstream context and return its output text."""
+    if hasattr(task, "execute_sync"):
+        output = task.execute_sync(agent=task.agent, context=context)
+    else:
+        output = task.execute(context=context)
+    return str(output)
+
+
+class TaskGraphExecutor:
+    """Runs TaskNodes in dependency order with bounded parallelism."""
+
+    def __init__(
+        self,
+        nodes: List[TaskNode],
+        max_workers: int = 4,
+        run_task: Callable[[Task, Optional[str]], str] = execute_task,
+        cache: Optional[TaskCache] = None
+    ):
+        """
+        Initialize the executor and validate the graph.
+
+        Args:
+            nodes: Tasks and their dependencies
+            max_workers: Maximum number of tasks running at once
+            run_task: Callable executing one task with its context
+            cache: Optional task cache; tasks whose inputs are unchanged replay from it
+
+        Raises:
+            ValueError: If a dependency is unknown or the graph has a cycle
+        """
+        self.nodes = {node.name: node for node in nodes}
+        self.max_workers = max_workers
+        self.run_task = run_task
+        self.cache = cache
+        self.order = self._topological_order()
+
+    def run(self) -> TaskGraphResult:
+        """
+        Execute every task, starting each as soon as its dependencies finish.
+
+        Returns:
+            TaskGraphResult with outputs, per-task durations and the critical path
+        """
+        remaining = {name: len(node.depends_on) for name, node in self.nodes.items()}
+        dependents = {name: [] for name in self.nodes}
+        for node in self.nodes.values():
+            for dependency in node.depends_on:
+                dependents[dependency].append(node.name)
+
+        outputs, durations, cached = {}, {}, []
+        start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            running = {}
+
+            def submit(name: str) -> None:
+                print(f"\nStarting task: {name}")
+                running[executor.submit(self._run_node, name, outputs)] = name
+
+            for name in self.order:
+                if remaining[name] == 0:
+                    submit(name)
+
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    outputs[name], durations[name], hit = future.result()
+                    if hit:
+                        cached.append(name)
+                    print(f"\nFinished task: {name} ({'cached' if hit else f'{durations[name]:.1f}s'})")
+                    for dependent in dependents[name]:
+                        remaining[dependent] -= 1
+                        if remaining[dependent] == 0:
+                            submit(dependent)
+
+        return TaskGraphResult(
+            outputs=outputs,
+            durations=durations,
+            wall_time=time.perf_counter() - start,
+            critical_path=self._critical_path(durations),
+            cached=cached
+        )
+
+    def _run_node(self, name: str, outputs: Dict[str, str]):
+        node = self.nodes[name]
+        context = "\n\n".join(
+            f"## Output of {dependency}\n{outputs[dependency]}" for dependency in node.depends_on
+        ) or None
+
+        task_start = time.perf_counter()
+        key = None
+        if self.cache is not None:
+            key = self.cache.key_for(node.task, [outputs[dependency] for dependency in node.depends_on])
+            output = self.cache.get(key)
+            if output is not None:
+                return output, time.perf_counter() - task_start, True
+
+        output = self.run_task(node.task, context)
+        if key is not None:
+            self.cache.put(key, output)
+        return output, time.perf_counter() - task_start, False
+
+    def _topological_order(self) -> List[str]:
+        for node in self.nodes.values():
+            for dependency in node.depends_on:
+                if dependency not in self.nodes:
+                    raise ValueError(f"Task '{node.name}' depends on unknown task '{dependency}'")
+
+        remaining = {name: len(node.depends_on) for name, node in self.nodes.items()}
+        ready = [name for name, count in remaining.items() if count == 0]
+        order = []
+        while ready:
+            name = ready.pop(0)
+            order.append(name)
+            for node in self.nodes.values():
+                if name in node.depends_on:
+                    remaining[node.name] -= 1
+                    if remaining[node.name] == 0:
+                        ready.append(node.name)
+
+        if len(order) != len(self.nodes):
+            raise ValueError("Task graph contains a dependency cycle")
+        return order
+
+    def _critical_path(self, durations: Dict[str, float]) -> List[str]:
+        """Longest chain of dependent tasks by measured duration."""
+        finish, previous = {}, {}
+        for name in self.order:
+            node = self.nodes[name]
+            best = max(node.depends_on, key=lambda dependency: finish[dependency], default=None)
+            finish[name] = durations[name] + (finish[best] if best else 0.0)
+            previous[name] = best
+
+        name = max(finish, key=finish.get)
+        path = []
+        while name:
+            path.append(name)
+            name = previous[name]
+        return list(reversed(path))
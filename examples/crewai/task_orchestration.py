@@ -5,6 +5,7 @@ This example shows how different agents collaborate on a research and documentat
 """
 
 import os
+import argparse
 from dotenv import find_dotenv, load_dotenv
 from termcolor import cprint
 from crewai import Agent, Task, Crew, Process
@@ -12,14 +13,28 @@ from langchain.tools import DuckDuckGoSearchRun
 from langchain.tools import WikipediaQueryRun
 from langchain.utilities import WikipediaAPIWrapper
 
+from task_graph import TaskNode, TaskGraphExecutor
+from task_cache import TaskCache
+from tool_layer import ToolExecutionLayer
+
 # Load environment variables
 dotenv_path = find_dotenv()
 print(f"Loading environment variables from: {dotenv_path}")
 load_dotenv()
 
-# Initialize tools
-search_tool = DuckDuckGoSearchRun()
-wikipedia = WikipediaQueryRun(api_wrapper=WikipediaAPIWrapper())
+# Initialize tools behind a shared layer that deduplicates, caches and rate-limits calls
+tool_layer = ToolExecutionLayer(
+    ttl=3600,
+    rate_limits={"duckduckgo": (1.0, 3), "wikipedia": (5.0, 10)}
+)
+search_tool = tool_layer.wrap(DuckDuckGoSearchRun(), backend="duckduckgo")
+wikipedia = tool_layer.wrap(WikipediaQueryRun(api_wrapper=WikipediaAPIWrapper()), backend="wikipedia")
+
+def print_tool_metrics():
+    """Print per-tool call counts and latency histograms."""
+    for name, metrics in tool_layer.metrics().items():
+        histogram = ", ".join(f"{bucket}: {count}" for bucket, count in metrics.pop("latency_histogram").items() if count)
+        cprint(f"{name}: {metrics} [{histogram}]", "cyan")
 
 def create_agents():
     """Create agents with specific roles and tools."""
@@ -125,14 +140,150 @@ def create_tasks(project_manager, researcher, writer, qa_specialist):
         quality_assurance
     ]
 
+def create_task_graph(project_manager, researcher, writer, qa_specialist):
+    """Create tasks with explicit dependencies so independent work can run in parallel."""
+
+    research_planning = TaskNode("research_planning", Task(
+        description="""Plan the research approach for understanding AI agent frameworks.
+        1. Define research objectives
+        2. Identify key areas to investigate
+        3. Create research timeline
+        4. Specify deliverables""",
+        agent=project_manager
+    ))
+
+    # Sub-topics are gathered independently of each other
+    landscape_gathering = TaskNode("landscape_gathering", Task(
+        description="""Gather information about the AI agent framework landscape:
+        1. Current market leaders
+        2. Use cases""",
+        agent=researcher
+    ), depends_on=["research_planning"])
+
+    technical_gathering = TaskNode("technical_gathering", Task(
+        description="""Gather technical information about AI agent frameworks:
+        1. Technical capabilities
+        2. Implementation approaches""",
+        agent=researcher
+    ), depends_on=["research_planning"])
+
+    analysis = TaskNode("analysis", Task(
+        description="""Analyze the gathered information:
+        1. Compare different frameworks
+        2. Identify strengths and weaknesses
+        3. Evaluate implementation complexity
+        4. Assess scalability""",
+        agent=researcher
+    ), depends_on=["landscape_gathering", "technical_gathering"])
+
+    documentation = TaskNode("documentation", Task(
+        description="""Create comprehensive documentation:
+        1. Framework overview
+        2. Technical specifications
+        3. Implementation guidelines
+        4. Best practices""",
+        agent=writer
+    ), depends_on=["analysis"])
+
+    # Independent QA passes over the same documentation
+    accuracy_review = TaskNode("accuracy_review", Task(
+        description="""Review the documentation for correctness:
+        1. Verify accuracy of information
+        2. Validate technical details""",
+        agent=qa_specialist
+    ), depends_on=["documentation", "analysis"])
+
+    clarity_review = TaskNode("clarity_review", Task(
+        description="""Review the documentation for readability:
+        1. Check completeness
+        2. Ensure clarity""",
+        agent=qa_specialist
+    ), depends_on=["documentation"])
+
+    return [
+        research_planning,
+        landscape_gathering,
+        technical_gathering,
+        analysis,
+        documentation,
+        accuracy_review,
+        clarity_review
+    ]
+
+def create_task_chain(tasks):
+    """Express the sequential tasks as a graph where each task depends on the previous one."""
+    names = [
+        "research_planning",
+        "information_gathering",
+        "analysis",
+        "documentation",
+        "quality_assurance"
+    ]
+    return [
+        TaskNode(name, task, depends_on=names[i - 1:i])
+        for i, (name, task) in enumerate(zip(names, tasks))
+    ]
+
+def run_task_graph(nodes, max_workers: int, cache=None) -> str:
+    """Run a task graph and report timing; returns the combined outputs of its final tasks."""
+    executor = TaskGraphExecutor(nodes, max_workers=max_workers, cache=cache)
+    result = executor.run()
+
+    cprint(f"\nWall time: {result.wall_time:.1f}s "
+           f"(sequential estimate {result.sequential_time:.1f}s, "
+           f"saved {result.time_saved:.1f}s)", "green")
+    cprint(f"Critical path ({result.critical_path_time:.1f}s): "
+           f"{' -> '.join(result.critical_path)}", "green")
+    if cache is not None:
+        cprint(f"Replayed from cache: {', '.join(result.cached) or 'none'}", "green")
+
+    upstream = {dependency for node in nodes for dependency in node.depends_on}
+    deliverables = [node.name for node in nodes if node.name == "documentation" or node.name not in upstream]
+    return "\n\n".join(f"# {name}\n\n{result.outputs[name]}" for name in deliverables)
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='CrewAI task orchestration example')
+    parser.add_argument('--mode', choices=['sequential', 'dag'], default='sequential',
+                        help='Run tasks as a sequential crew or as a parallel task graph')
+    parser.add_argument('--max-workers', type=int, default=3,
+                        help='Maximum concurrent tasks in dag mode')
+    parser.add_argument('--cache-dir', default=None,
+                        help='Cache task outputs on disk and replay unchanged tasks')
+    parser.add_argument('--cache-max-mb', type=int, default=50,
+                        help='Size limit for the task cache')
+    return parser.parse_args()
+
 def main():
     """
     Main function to demonstrate CrewAI task orchestration.
     """
+    args = parse_arguments()
+
     # Create agents
     print("\nCreating agents...")
     agents = create_agents()
 
+    cache = None
+    if args.cache_dir:
+        cache = TaskCache(args.cache_dir, max_bytes=args.cache_max_mb * 1024 * 1024)
+
+    if args.mode == 'dag' or cache is not None:
+        if args.mode == 'dag':
+            print("\nExecuting research project as a task graph...")
+            nodes = create_task_graph(*agents)
+            max_workers = args.max_workers
+        else:
+            # Sequential order, but run task by task so unchanged tasks replay from cache
+            print("\nExecuting research project sequentially with task cache...")
+            nodes = create_task_chain(create_tasks(*agents))
+            max_workers = 1
+        result = run_task_graph(nodes, max_workers, cache)
+        with open('research_output.md', 'w') as f:
+            f.write(result)
+        print_tool_metrics()
+        print("\nProject completed! Check research_output.md for results.")
+        return
+
     # Create tasks
     print("\nDefining tasks...")
     tasks = create_tasks(*agents)
@@ -154,6 +305,7 @@ def main():
     with open('research_output.md', 'w') as f:
         f.write(result)
 
+    print_tool_metrics()
     print("\nProject completed! Check research_output.md for results.")
 
 if __name__ == "__main__":
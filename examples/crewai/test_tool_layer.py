@@ -0,0 +1,91 @@
+"""
+Tests for the tool execution layer, using a local fake search backend.
+
+Run with:
+    python -m pytest test_tool_layer.py
+"""
+
+import threading
+import time
+
+from tool_layer import ToolExecutionLayer
+
+
+class FakeSearch:
+    """Search backend counting calls; optionally blocks until ``release`` is set."""
+
+    def __init__(self, block: bool = False):
+        self.queries = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+        if not block:
+            self.release.set()
+
+    def __call__(self, query: str) -> str:
+        self.queries.append(query)
+        self.started.set()
+        self.release.wait(5)
+        return f"results for {query}"
+
+
+def test_identical_calls_are_memoized_until_the_ttl_expires():
+    layer = ToolExecutionLayer(ttl=0.05)
+    search = FakeSearch()
+
+    assert layer.call("search", "web", search, "AI agents") == "results for AI agents"
+    assert layer.call("search", "web", search, "  ai   AGENTS ") == "results for AI agents"
+    time.sleep(0.06)
+    layer.call("search", "web", search, "AI agents")
+
+    assert search.queries == ["AI agents", "AI agents"]
+    assert layer.metrics()["search"]["cache_hits"] == 1
+
+
+def test_expired_results_are_purged_on_insert():
+    layer = ToolExecutionLayer(ttl=0.05)
+    search = FakeSearch()
+    for query in ("a", "b", "c"):
+        layer.call("search", "web", search, query)
+    time.sleep(0.06)
+
+    layer.call("search", "web", search, "d")
+
+    assert list(layer._results) == [("web", "d")]
+
+
+def test_rate_limit_spaces_calls_to_a_backend():
+    layer = ToolExecutionLayer(rate_limits={"web": (20.0, 1)})
+    search = FakeSearch()
+
+    started = time.monotonic()
+    for query in ("a", "b", "c"):
+        layer.call("search", "web", search, query)
+    elapsed = time.monotonic() - started
+
+    assert elapsed >= 0.09
+    assert layer.metrics()["search"]["throttled_seconds"] > 0
+
+
+def test_concurrent_identical_calls_share_one_execution():
+    layer = ToolExecutionLayer()
+    search = FakeSearch(block=True)
+    results = []
+
+    def call():
+        results.append(layer.call("search", "web", search, "AI agents"))
+
+    first = threading.Thread(target=call)
+    first.start()
+    search.started.wait(5)
+    others = [threading.Thread(target=call) for _ in range(4)]
+    for thread in others:
+        thread.start()
+    while layer.metrics()["search"]["merged"] < 4:
+        time.sleep(0.001)
+    search.release.set()
+    for thread in [first] + others:
+        thread.join()
+
+    assert search.queries == ["AI agents"]
+    assert results == ["results for AI agents"] * 5
+    assert layer.metrics()["search"]["merged"] == 4
@@ -0,0 +1,193 @@
+"""
+Shared execution layer for research tools.
+Merges concurrent identical calls, memoizes results with a TTL, applies a
+token-bucket rate limit per backend and records per-tool call counts and
+latency histograms.
+"""
+
+import time
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from langchain.tools import BaseTool
+
+LATENCY_BUCKETS_MS = [50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+
+class TokenBucket:
+    """Blocking token bucket: ``rate`` tokens per second, up to ``burst`` stored."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take one token, sleeping until one is available; returns seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class ToolStats:
+    """Call counters and a latency histogram for one tool."""
+
+    def __init__(self):
+        self.calls = 0
+        self.executed = 0
+        self.cache_hits = 0
+        self.merged = 0
+        self.errors = 0
+        self.throttled_seconds = 0.0
+        self.latency_buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def observe(self, seconds: float) -> None:
+        self.latency_buckets[bisect_left(LATENCY_BUCKETS_MS, seconds * 1000)] += 1
+
+    def as_dict(self) -> dict:
+        labels = [f"<={bound}ms" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+        return {
+            "calls": self.calls,
+            "executed": self.executed,
+            "cache_hits": self.cache_hits,
+            "merged": self.merged,
+            "errors": self.errors,
+            "throttled_seconds": round(self.throttled_seconds, 3),
+            "latency_histogram": dict(zip(labels, self.latency_buckets))
+        }
+
+
+class ToolExecutionLayer:
+    """Deduplicating, caching, rate-limited front for tool backends."""
+
+    def __init__(
+        self,
+        ttl: float = 3600.0,
+        rate_limits: Optional[Dict[str, Tuple[float, int]]] = None,
+        max_results: int = 1024
+    ):
+        """
+        Initialize the layer.
+
+        Args:
+            ttl: Seconds a successful result is reused for identical calls
+            rate_limits: Backend name -> (calls per second, burst size)
+            max_results: Memoized results kept; the least recently used are dropped first
+        """
+        self.ttl = ttl
+        self.max_results = max_results
+        self._buckets = {
+            backend: TokenBucket(rate, burst) for backend, (rate, burst) in (rate_limits or {}).items()
+        }
+        self._results: OrderedDict = OrderedDict()  # key -> (expires_at, result)
+        self._in_flight: Dict[tuple, Future] = {}
+        self._stats: Dict[str, ToolStats] = {}
+        self._lock = threading.Lock()
+
+    def call(self, tool_name: str, backend: str, fn: Callable[[str], Any], query: str) -> Any:
+        """
+        Run ``fn(query)`` through the layer.
+
+        Identical calls (same backend and normalized query) within the TTL are
+        served from memory; identical calls made while one is running wait for
+        that call instead of issuing their own.
+        """
+        key = (backend, " ".join(query.split()).lower())
+        with self._lock:
+            stats = self._stats.setdefault(tool_name, ToolStats())
+            stats.calls += 1
+
+            cached = self._results.get(key)
+            if cached is not None:
+                if cached[0] > time.monotonic():
+                    self._results.move_to_end(key)
+                    stats.cache_hits += 1
+                    return cached[1]
+                del self._results[key]
+
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._in_flight[key] = future
+            else:
+                stats.merged += 1
+
+        if not owner:
+            return future.result()
+
+        try:
+            bucket = self._buckets.get(backend)
+            if bucket is not None:
+                waited = bucket.acquire()
+                with self._lock:
+                    stats.throttled_seconds += waited
+
+            start = time.perf_counter()
+            result = fn(query)
+            elapsed = time.perf_counter() - start
+        except Exception as e:
+            with self._lock:
+                stats.errors += 1
+                del self._in_flight[key]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            stats.executed += 1
+            stats.observe(elapsed)
+            self._purge_expired()
+            self._results[key] = (time.monotonic() + self.ttl, result)
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+            del self._in_flight[key]
+        future.set_result(result)
+        return result
+
+    def _purge_expired(self) -> None:
+        """Drop expired results so they do not hold capacity until LRU eviction reaches them."""
+        now = time.monotonic()
+        for key in [key for key, (expires_at, _) in self._results.items() if expires_at <= now]:
+            del self._results[key]
+
+    def wrap(self, tool: BaseTool, backend: Optional[str] = None) -> BaseTool:
+        """Return a tool with the same name and schema whose calls go through this layer."""
+        return LayeredTool(
+            name=tool.name,
+            description=tool.description,
+            args_schema=tool.args_schema,
+            inner=tool,
+            layer=self,
+            backend=backend or tool.name
+        )
+
+    def metrics(self) -> Dict[str, dict]:
+        """Per-tool call counts and latency histograms."""
+        with self._lock:
+            return {name: stats.as_dict() for name, stats in self._stats.items()}
+
+
+class LayeredTool(BaseTool):
+    """LangChain tool delegating to another tool through a ToolExecutionLayer."""
+
+    inner: BaseTool
+    layer: Any
+    backend: str
+
+    def _run(self, query: str, **kwargs: Any) -> Any:
+        return self.layer.call(self.name, self.backend, self.inner.run, query)
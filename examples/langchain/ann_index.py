@@ -0,0 +1,221 @@
+"""
+In-process approximate nearest-neighbour index written against NumPy.
+Implements an inverted-file (IVF) index over a float32 matrix with cosine
+similarity, incremental inserts, memory-mapped persistence and an exact
+brute-force fallback for small collections.
+"""
+
+import os
+import json
+from typing import Tuple
+
+import numpy as np
+
+
+class IVFIndex:
+    """Inverted-file index using spherical k-means centroids.
+
+    Vectors are L2-normalized on insert, so inner product equals cosine
+    similarity. Collections smaller than ``exact_threshold`` are searched by
+    brute force; larger ones are clustered into ``~sqrt(n)`` lists and each
+    query scans the ``n_probe`` closest lists.
+    """
+
+    def __init__(
+        self,
+        dim: int,
+        n_probe: int = 8,
+        exact_threshold: int = 10_000,
+        kmeans_iterations: int = 10,
+        seed: int = 0
+    ):
+        """
+        Create an empty index.
+
+        Args:
+            dim: Embedding dimension
+            n_probe: Number of inverted lists scanned per query
+            exact_threshold: Collections below this size use exact search
+            kmeans_iterations: Lloyd iterations when (re)training centroids
+            seed: Seed for centroid initialization
+        """
+        self.dim = dim
+        self.n_probe = n_probe
+        self.exact_threshold = exact_threshold
+        self.kmeans_iterations = kmeans_iterations
+        self.seed = seed
+
+        self._vectors = np.empty((0, dim), dtype=np.float32)
+        self._size = 0
+        self._centroids = None
+        self._labels = np.empty(0, dtype=np.int32)
+        self._trained_size = 0
+        self._list_order = None
+        self._list_offsets = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """The stored (normalized) vectors, one row per id."""
+        return self._vectors[:self._size]
+
+    @property
+    def is_trained(self) -> bool:
+        return self._centroids is not None
+
+    def add(self, vectors: np.ndarray) -> np.ndarray:
+        """
+        Append vectors to the index.
+
+        Args:
+            vectors: ``(n, dim)`` array of embeddings
+
+        Returns:
+            Integer ids (row positions) assigned to the new vectors
+        """
+        vectors = _normalize(np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim))
+        start = self._size
+        self._reserve(start + len(vectors))
+        self._vectors[start:start + len(vectors)] = vectors
+        self._size += len(vectors)
+
+        if self._size >= self.exact_threshold and (
+            not self.is_trained or self._size >= 4 * self._trained_size
+        ):
+            self.train()
+        elif self.is_trained:
+            self._labels = np.concatenate([self._labels, self._assign(vectors)])
+            self._list_order = None
+
+        return np.arange(start, self._size)
+
+    def train(self) -> None:
+        """(Re)compute centroids with spherical k-means and reassign every vector."""
+        data = self.vectors
+        n_lists = max(1, int(np.sqrt(self._size)))
+        rng = np.random.default_rng(self.seed)
+        sample_size = min(self._size, 64 * n_lists)
+        sample = data[rng.choice(self._size, size=sample_size, replace=False)]
+
+        centroids = sample[rng.choice(sample_size, size=n_lists, replace=False)].copy()
+        for _ in range(self.kmeans_iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            empty = ~sums.any(axis=1)
+            sums[empty] = centroids[empty]
+            centroids = _normalize(sums)
+
+        self._centroids = centroids
+        self._labels = self._assign(data)
+        self._trained_size = self._size
+        self._list_order = None
+
+    def search(self, query: np.ndarray, k: int = 4, exact: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the ``k`` most similar vectors to ``query``.
+
+        Args:
+            query: ``(dim,)`` query embedding
+            k: Number of results
+            exact: Force brute-force search
+
+        Returns:
+            Tuple of (ids, cosine scores), best first
+        """
+        query = _normalize(np.asarray(query, dtype=np.float32).reshape(1, self.dim))[0]
+        if self._size == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        if exact or not self.is_trained:
+            candidates = None
+            scores = self.vectors @ query
+        else:
+            candidates = self._probe(query)
+            scores = self._vectors[candidates] @ query
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        ids = top if candidates is None else candidates[top]
+        return ids, scores[top]
+
+    def save(self, path: str) -> None:
+        """Write the index to ``path`` as ``.npy`` files that can be memory-mapped on load."""
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, "vectors.npy"), self.vectors)
+        np.save(os.path.join(path, "labels.npy"), self._labels)
+        if self.is_trained:
+            np.save(os.path.join(path, "centroids.npy"), self._centroids)
+        with open(os.path.join(path, "index.json"), "w") as f:
+            json.dump({
+                "dim": self.dim,
+                "n_probe": self.n_probe,
+                "exact_threshold": self.exact_threshold,
+                "trained_size": self._trained_size
+            }, f)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "IVFIndex":
+        """
+        Load an index saved with ``save``.
+
+        With ``mmap=True`` vectors are memory-mapped read-only, so startup does
+        not read the matrix; the first insert copies it into memory.
+        """
+        with open(os.path.join(path, "index.json")) as f:
+            meta = json.load(f)
+
+        index = cls(meta["dim"], n_probe=meta["n_probe"], exact_threshold=meta["exact_threshold"])
+        mmap_mode = "r" if mmap else None
+        index._vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode=mmap_mode)
+        index._size = len(index._vectors)
+        index._labels = np.load(os.path.join(path, "labels.npy"))
+        index._trained_size = meta["trained_size"]
+        centroids_path = os.path.join(path, "centroids.npy")
+        if os.path.exists(centroids_path):
+            index._centroids = np.load(centroids_path)
+        return index
+
+    @staticmethod
+    def exists(path: str) -> bool:
+        return os.path.exists(os.path.join(path, "index.json"))
+
+    def _assign(self, vectors: np.ndarray, batch_size: int = 65_536) -> np.ndarray:
+        """Label each vector with its nearest centroid, in batches to bound memory."""
+        labels = np.empty(len(vectors), dtype=np.int32)
+        for start in range(0, len(vectors), batch_size):
+            batch = vectors[start:start + batch_size]
+            labels[start:start + batch_size] = np.argmax(batch @ self._centroids.T, axis=1)
+        return labels
+
+    def _probe(self, query: np.ndarray) -> np.ndarray:
+        """Return candidate ids from the ``n_probe`` lists nearest to ``query``."""
+        if self._list_order is None:
+            self._list_order = np.argsort(self._labels, kind="stable")
+            counts = np.bincount(self._labels, minlength=len(self._centroids))
+            self._list_offsets = np.concatenate([[0], np.cumsum(counts)])
+
+        n_probe = min(self.n_probe, len(self._centroids))
+        lists = np.argpartition(-(self._centroids @ query), n_probe - 1)[:n_probe]
+        return np.concatenate([
+            self._list_order[self._list_offsets[i]:self._list_offsets[i + 1]] for i in lists
+        ])
+
+    def _reserve(self, size: int) -> None:
+        """Grow the backing matrix geometrically so inserts are amortized O(1)."""
+        if size <= len(self._vectors) and self._vectors.flags.writeable:
+            return
+        capacity = max(size, 2 * len(self._vectors), 1024)
+        grown = np.empty((capacity, self.dim), dtype=np.float32)
+        grown[:self._size] = self._vectors[:self._size]
+        self._vectors = grown
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
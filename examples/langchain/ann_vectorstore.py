@@ -0,0 +1,190 @@
+"""
+LangChain VectorStore backed by the in-process NumPy IVF index.
+Drop-in alternative to Chroma for DocumentManager.
+"""
+
+import os
+import json
+import uuid
+import threading
+from typing import Any, Iterable, List, Optional, Tuple
+
+import numpy as np
+from langchain.embeddings.base import Embeddings
+from langchain.schema import Document
+from langchain.vectorstores.base import VectorStore
+
+from ann_index import IVFIndex
+
+
+class NumpyANNVectorStore(VectorStore):
+    """Vector store keeping embeddings in an IVFIndex and documents in a JSONL file.
+
+    Layout of ``persist_directory``:
+        index/           - IVFIndex files (memory-mapped on load)
+        documents.jsonl  - one ``{"id", "text", "metadata"}`` record per index row
+    """
+
+    def __init__(
+        self,
+        embedding_function: Embeddings,
+        persist_directory: Optional[str] = None,
+        n_probe: int = 8,
+        exact_threshold: int = 10_000
+    ):
+        """
+        Initialize the vector store, loading a persisted index if present.
+
+        Args:
+            embedding_function: Embeddings used for documents and queries
+            persist_directory: Directory for persistence, or None for in-memory only
+            n_probe: Inverted lists scanned per query
+            exact_threshold: Collections below this size use exact search
+        """
+        self._embedding = embedding_function
+        self.persist_directory = persist_directory
+        self.n_probe = n_probe
+        self.exact_threshold = exact_threshold
+
+        self._index = None
+        self._records = []
+        self._row_by_id = {}
+        self._unsaved = []
+        self._lock = threading.Lock()
+
+        if persist_directory:
+            self._load()
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any
+    ) -> List[str]:
+        """Embed and index texts; existing ids are skipped."""
+        texts = list(texts)
+        metadatas = metadatas or [{} for _ in texts]
+        ids = ids or [str(uuid.uuid4()) for _ in texts]
+
+        with self._lock:
+            keep = [i for i, id_ in enumerate(ids) if id_ not in self._row_by_id]
+        if not keep:
+            return ids
+
+        vectors = self._embedding.embed_documents([texts[i] for i in keep])
+        vectors = np.asarray(vectors, dtype=np.float32)
+
+        with self._lock:
+            # A concurrent add_texts may have indexed some of these ids while we were embedding
+            fresh, seen = [], set()
+            for position, i in enumerate(keep):
+                if ids[i] not in self._row_by_id and ids[i] not in seen:
+                    fresh.append(position)
+                    seen.add(ids[i])
+            if not fresh:
+                return ids
+            keep, vectors = [keep[position] for position in fresh], vectors[fresh]
+
+            if self._index is None:
+                self._index = IVFIndex(
+                    vectors.shape[1],
+                    n_probe=self.n_probe,
+                    exact_threshold=self.exact_threshold
+                )
+            rows = self._index.add(vectors)
+            for row, i in zip(rows, keep):
+                record = {"id": ids[i], "text": texts[i], "metadata": metadatas[i]}
+                self._records.append(record)
+                self._row_by_id[ids[i]] = int(row)
+                self._unsaved.append(record)
+
+        return ids
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return self.similarity_search_by_vector(self._embedding.embed_query(query), k=k)
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self._search(embedding, k)]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs: Any) -> List[Tuple[Document, float]]:
+        return self._search(self._embedding.embed_query(query), k)
+
+    def _select_relevance_score_fn(self):
+        return lambda score: score
+
+    def get(self, ids: Optional[List[str]] = None, include: Optional[List[str]] = None) -> dict:
+        """Chroma-compatible lookup used for content-hash deduplication."""
+        with self._lock:
+            if ids is None:
+                found = [record["id"] for record in self._records]
+            else:
+                found = [id_ for id_ in ids if id_ in self._row_by_id]
+        return {"ids": found}
+
+    def persist(self) -> None:
+        """
+        Append new document records and rewrite the index files.
+
+        Saving rewrites the whole matrix, so callers persist once per ingest
+        rather than once per batch.
+        """
+        with self._lock:
+            if not self.persist_directory or not self._unsaved:
+                return
+            os.makedirs(self.persist_directory, exist_ok=True)
+            with open(os.path.join(self.persist_directory, "documents.jsonl"), "a") as f:
+                for record in self._unsaved:
+                    f.write(json.dumps(record) + "\n")
+            self._unsaved = []
+            self._index.save(os.path.join(self.persist_directory, "index"))
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: Optional[List[dict]] = None,
+        **kwargs: Any
+    ) -> "NumpyANNVectorStore":
+        ids = kwargs.pop("ids", None)
+        store = cls(embedding_function=embedding, **kwargs)
+        store.add_texts(texts, metadatas=metadatas, ids=ids)
+        return store
+
+    def _search(self, embedding: List[float], k: int) -> List[Tuple[Document, float]]:
+        with self._lock:
+            if self._index is None:
+                return []
+            rows, scores = self._index.search(np.asarray(embedding, dtype=np.float32), k=k)
+            records = [self._records[row] for row in rows]
+        return [
+            (Document(page_content=record["text"], metadata=record["metadata"]), float(score))
+            for record, score in zip(records, scores)
+        ]
+
+    def _load(self) -> None:
+        index_path = os.path.join(self.persist_directory, "index")
+        documents_path = os.path.join(self.persist_directory, "documents.jsonl")
+        if not IVFIndex.exists(index_path) or not os.path.exists(documents_path):
+            return
+
+        self._index = IVFIndex.load(index_path)
+        self._index.n_probe = self.n_probe
+        with open(documents_path) as f:
+            lines = f.readlines()
+
+        if len(lines) > len(self._index):
+            # Records appended after the last index save; drop them so rows stay aligned
+            lines = lines[:len(self._index)]
+            with open(documents_path, "w") as f:
+                f.writelines(lines)
+
+        for row, line in enumerate(lines):
+            record = json.loads(line)
+            self._records.append(record)
+            self._row_by_id[record["id"]] = row
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Async batch runner for the LangChain agent executor.
+Replays many independent queries concurrently with a concurrency limit,
+per-query timeouts and per-query memory, and reports throughput and latency.
+
+Usage:
+    python async_runner.py queries.txt --concurrency 16 --timeout 60
+"""
+
+import time
+import asyncio
+import argparse
+from contextlib import nullcontext
+from dataclasses import dataclass
+from typing import Callable, ContextManager, List, Optional
+
+import numpy as np
+from langchain.agents import AgentExecutor
+
+
+@dataclass
+class QueryResult:
+    """Outcome of one query in a batch."""
+    index: int
+    query: str
+    output: Optional[str] = None
+    error: Optional[str] = None
+    latency: float = 0.0
+
+
+async def run_queries(
+    executor_factory: Callable[[], AgentExecutor],
+    queries: List[str],
+    concurrency: int = 8,
+    timeout: float = 60.0,
+    turn_context: Optional[Callable[[], ContextManager]] = None
+) -> List[QueryResult]:
+    """
+    Run queries concurrently, each on its own executor.
+
+    A fresh executor (and therefore fresh memory) is built per query, so
+    queries cannot see each other's conversation state.
+
+    Args:
+        executor_factory: Builds a new AgentExecutor for a single query
+        queries: Queries to run
+        concurrency: Maximum number of queries in flight
+        timeout: Per-query timeout in seconds
+        turn_context: Optional per-query context, e.g. ``DocumentManager.turn``
+
+    Returns:
+        One QueryResult per query, in input order
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    turn_context = turn_context or nullcontext
+
+    async def run_one(index: int, query: str) -> QueryResult:
+        result = QueryResult(index=index, query=query)
+        async with semaphore:
+            executor = executor_factory()
+            start = time.perf_counter()
+            try:
+                with turn_context():
+                    response = await asyncio.wait_for(executor.ainvoke({"input": query}), timeout)
+                result.output = response["output"]
+            except asyncio.TimeoutError:
+                result.error = f"Timed out after {timeout:.0f}s"
+            except Exception as e:
+                result.error = str(e)
+            result.latency = time.perf_counter() - start
+        return result
+
+    return await asyncio.gather(*(run_one(i, query) for i, query in enumerate(queries)))
+
+
+def print_report(results: List[QueryResult], elapsed: float) -> None:
+    """Print throughput, latency percentiles and error counts for a batch."""
+    latencies = np.array([result.latency for result in results]) * 1000
+    errors = sum(1 for result in results if result.error)
+
+    print(f"\nQueries: {len(results)} ({errors} failed) in {elapsed:.1f}s")
+    print(f"Throughput: {len(results) / elapsed:.2f} queries/sec")
+    if len(latencies):
+        p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+        print(f"Latency ms: p50={p50:.0f} p90={p90:.0f} p99={p99:.0f} max={latencies.max():.0f}")
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Concurrent LangChain agent query runner')
+    parser.add_argument('queries_file', help='Text file with one query per line')
+    parser.add_argument('--concurrency', type=int, default=8, help='Maximum queries in flight')
+    parser.add_argument('--timeout', type=float, default=60.0, help='Per-query timeout in seconds')
+    return parser.parse_args()
+
+
+async def main():
+    """Replay a file of queries against the vector memory agent."""
+    from langchain_openai import ChatOpenAI
+    from vector_memory_agent import DocumentManager, CustomTools, setup_memory_systems, create_agent
+
+    args = parse_arguments()
+    with open(args.queries_file) as f:
+        queries = [line.strip() for line in f if line.strip()]
+
+    doc_manager = DocumentManager()
+    llm = ChatOpenAI(model="gpt-4", temperature=0.7)
+    tools = CustomTools(doc_manager).get_tools()
+
+    def executor_factory() -> AgentExecutor:
+        # Per-query conversation memory; the shared vector store is only read
+        memory = setup_memory_systems(doc_manager)
+        return create_agent(llm, tools, memory, verbose=False, memory_name="conversation_memory")
+
+    start = time.perf_counter()
+    results = await run_queries(
+        executor_factory,
+        queries,
+        concurrency=args.concurrency,
+        timeout=args.timeout,
+        turn_context=doc_manager.turn
+    )
+    elapsed = time.perf_counter() - start
+
+    for result in results:
+        if result.error:
+            print(f"[{result.index}] {result.query!r} failed: {result.error}")
+
+    print_report(results, elapsed)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark the NumPy IVF index against brute-force search.
+Reports build time, recall@k and p50/p99 query latency on synthetic embeddings.
+
+Usage:
+    python benchmark_ann.py --sizes 10000 100000 1000000 --dim 256 --k 10
+"""
+
+import time
+import argparse
+
+import numpy as np
+
+from ann_index import IVFIndex
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='IVF index recall/latency benchmark')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000],
+                        help='Collection sizes to benchmark')
+    parser.add_argument('--dim', type=int, default=256, help='Embedding dimension')
+    parser.add_argument('--queries', type=int, default=200, help='Number of queries per size')
+    parser.add_argument('--k', type=int, default=10, help='Neighbours per query')
+    parser.add_argument('--n-probe', type=int, nargs='+', default=[4, 8, 16],
+                        help='Inverted lists scanned per query')
+    parser.add_argument('--clusters', type=int, default=1000,
+                        help='Topic clusters in the synthetic data')
+    parser.add_argument('--seed', type=int, default=0)
+    return parser.parse_args()
+
+
+def synthetic_embeddings(n: int, dim: int, clusters: int, rng: np.random.Generator) -> np.ndarray:
+    """Clustered Gaussian vectors, a rough stand-in for topical text embeddings."""
+    centers = rng.standard_normal((clusters, dim), dtype=np.float32)
+    data = np.empty((n, dim), dtype=np.float32)
+    for start in range(0, n, 100_000):
+        end = min(n, start + 100_000)
+        labels = rng.integers(0, clusters, end - start)
+        data[start:end] = centers[labels] + 0.6 * rng.standard_normal((end - start, dim), dtype=np.float32)
+    return data
+
+
+def timed_queries(index: IVFIndex, queries: np.ndarray, k: int, exact: bool):
+    """Run each query, returning result ids and per-query latency in milliseconds."""
+    results, latencies = [], []
+    for query in queries:
+        start = time.perf_counter()
+        ids, _ = index.search(query, k=k, exact=exact)
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append(ids)
+    return results, np.array(latencies)
+
+
+def recall_at_k(approx, exact, k: int) -> float:
+    return float(np.mean([len(set(a) & set(e)) / k for a, e in zip(approx, exact)]))
+
+
+def main():
+    args = parse_arguments()
+    rng = np.random.default_rng(args.seed)
+
+    print(f"{'size':>9} {'mode':>12} {'recall@k':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for size in args.sizes:
+        data = synthetic_embeddings(size, args.dim, args.clusters, rng)
+        queries = data[rng.integers(0, size, args.queries)]
+        queries = queries + 0.1 * rng.standard_normal(queries.shape, dtype=np.float32)
+
+        start = time.perf_counter()
+        index = IVFIndex(args.dim, exact_threshold=0)
+        index.add(data)
+        build_seconds = time.perf_counter() - start
+        del data
+
+        exact_ids, exact_latency = timed_queries(index, queries, args.k, exact=True)
+        print(f"{size:>9} {'exact':>12} {1.0:>9.3f} "
+              f"{np.percentile(exact_latency, 50):>8.2f} {np.percentile(exact_latency, 99):>8.2f}")
+
+        for n_probe in args.n_probe:
+            index.n_probe = n_probe
+            ann_ids, ann_latency = timed_queries(index, queries, args.k, exact=False)
+            print(f"{size:>9} {f'ivf/{n_probe}':>12} {recall_at_k(ann_ids, exact_ids, args.k):>9.3f} "
+                  f"{np.percentile(ann_latency, 50):>8.2f} {np.percentile(ann_latency, 99):>8.2f}")
+
+        print(f"{size:>9} {'build':>12} {build_seconds:>9.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Token-bounded conversation memory with an incrementally maintained summary.
+Keeps the most recent turns verbatim and folds older turns into a rolling
+summary, so prompt size stays flat instead of growing with every turn.
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain.memory.chat_memory import BaseChatMemory
+from langchain.memory.summary import SummarizerMixin
+from langchain.schema import BaseMessage, SystemMessage, get_buffer_string
+
+
+class BoundedSummaryMemory(BaseChatMemory, SummarizerMixin):
+    """Conversation memory with a token budget.
+
+    The last ``max_turns`` turns are kept verbatim as long as they fit within
+    ``max_token_limit`` together with the summary. Turns that fall out of the
+    window are summarized into ``summary`` using only the existing summary
+    and the newly evicted messages, so no turn is ever summarized twice.
+
+    Token counts use ``token_counter`` when given (e.g. a local tiktoken
+    encoder), otherwise the LLM's ``get_num_tokens``. Only the last
+    ``max_turn_stats`` per-turn counts are kept in ``turn_token_counts``;
+    ``turns`` counts every turn saved.
+    """
+
+    memory_key: str = "chat_history"
+    max_turns: int = 4
+    max_token_limit: int = 2000
+    token_counter: Optional[Callable[[str], int]] = None
+    summary: str = ""
+    max_turn_stats: int = 100
+    turns: int = 0
+    turn_token_counts: List[Dict[str, int]] = []
+
+    @property
+    def memory_variables(self) -> List[str]:
+        return [self.memory_key]
+
+    def count_tokens(self, text: str) -> int:
+        """Count tokens with the configured tokenizer."""
+        if self.token_counter is not None:
+            return self.token_counter(text)
+        return self.llm.get_num_tokens(text)
+
+    def load_memory_variables(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        """Return the summary (as a system message) followed by the recent turns."""
+        messages: List[BaseMessage] = []
+        if self.summary:
+            messages.append(SystemMessage(content=self.summary))
+        messages.extend(self.chat_memory.messages)
+
+        if self.return_messages:
+            return {self.memory_key: messages}
+        return {
+            self.memory_key: get_buffer_string(
+                messages, human_prefix=self.human_prefix, ai_prefix=self.ai_prefix
+            )
+        }
+
+    def save_context(self, inputs: Dict[str, Any], outputs: Dict[str, str]) -> None:
+        """Store the turn, evict old turns into the summary and record token counts."""
+        super().save_context(inputs, outputs)
+        new_messages = self.chat_memory.messages[-2:]
+        summarized = self._prune()
+
+        self.turns += 1
+        self.turn_token_counts.append({
+            "turn": self.turns,
+            "input_tokens": self.count_tokens(new_messages[0].content),
+            "output_tokens": self.count_tokens(new_messages[-1].content),
+            "summarized_messages": summarized,
+            "memory_tokens": self._memory_tokens()
+        })
+        del self.turn_token_counts[:-self.max_turn_stats]
+
+    def clear(self) -> None:
+        super().clear()
+        self.summary = ""
+        self.turns = 0
+        self.turn_token_counts = []
+
+    def _prune(self) -> int:
+        """Move turns beyond the window or budget into the summary; returns messages summarized."""
+        messages = self.chat_memory.messages
+        evict = max(0, len(messages) - 2 * self.max_turns)
+
+        # Drop further whole turns while over budget, always keeping the latest turn
+        while evict < len(messages) - 2 and self._tokens(messages[evict:]) > self.max_token_limit:
+            evict += 2
+
+        if not evict:
+            return 0
+
+        pruned = messages[:evict]
+        self.chat_memory.messages = messages[evict:]
+        self.summary = self.predict_new_summary(pruned, self.summary)
+        return len(pruned)
+
+    def _tokens(self, messages: List[BaseMessage]) -> int:
+        return self.count_tokens(self.summary) + sum(
+            self.count_tokens(message.content) for message in messages
+        )
+
+    def _memory_tokens(self) -> int:
+        return self._tokens(self.chat_memory.messages)
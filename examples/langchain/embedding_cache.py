@@ -0,0 +1,270 @@
+"""
+Persistent, content-addressed embedding cache for LangChain embedding models.
+Vectors are stored in a float32 memory-mapped file and looked up by a hash of
+(model, text), so identical strings are only embedded once across runs.
+"""
+
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+
+import numpy as np
+from langchain.embeddings.base import Embeddings
+
+
+class EmbeddingCache:
+    """Fixed-capacity float32 vector store with LRU eviction.
+
+    Layout of ``cache_dir``:
+        vectors.f32  - memory-mapped ``(rows, dim)`` float32 matrix, grown in
+                       doubling steps up to ``capacity`` rows
+        index.log    - append-only journal of ``<key> <slot>`` assignments
+    """
+
+    # Rows allocated when the vector file is created
+    INITIAL_ROWS = 1024
+
+    def __init__(self, cache_dir: str, capacity: int = 100_000):
+        """
+        Open (or create) an embedding cache.
+
+        Args:
+            cache_dir: Directory holding the vector file and index journal
+            capacity: Maximum number of cached vectors before LRU eviction
+        """
+        self.cache_dir = cache_dir
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self._slots = OrderedDict()  # key -> slot, least recently used first
+        self._vectors = None
+        self._dim = None
+        self._rows = 0
+        self._journal_lines = 0
+        self._closed = False
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._vectors_path = os.path.join(cache_dir, "vectors.f32")
+        self._index_path = os.path.join(cache_dir, "index.log")
+        self._load()
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def get(self, key: str) -> Optional[List[float]]:
+        """Return the cached vector for ``key`` or None, updating counters."""
+        with self._lock:
+            self._check_open()
+            slot = self._slots.get(key)
+            if slot is None:
+                self.misses += 1
+                return None
+            self._slots.move_to_end(key)
+            self.hits += 1
+            return self._vectors[slot].tolist()
+
+    def put(self, key: str, vector: List[float]) -> None:
+        """Store ``vector`` under ``key``, evicting the least recently used entry if full."""
+        with self._lock:
+            self._check_open()
+            if key in self._slots:
+                self._slots.move_to_end(key)
+                return
+            if self._vectors is None:
+                self._open_vectors(len(vector))
+            if len(vector) != self._dim:
+                raise ValueError(
+                    f"Embedding dimension {len(vector)} does not match cache dimension {self._dim}"
+                )
+
+            if len(self._slots) < self.capacity:
+                slot = len(self._slots)
+            else:
+                _, slot = self._slots.popitem(last=False)
+                self.evictions += 1
+
+            if slot >= self._rows:
+                self._grow(slot + 1)
+            self._vectors[slot] = np.asarray(vector, dtype=np.float32)
+            self._slots[key] = slot
+            self._append_journal(key, slot)
+
+    def flush(self) -> None:
+        """
+        Flush vectors to disk and compact the journal if it has grown large.
+
+        Writes go through a shared mapping, so they survive a crash of this
+        process without a flush; call this after writes and on close.
+        """
+        with self._lock:
+            if self._vectors is not None:
+                self._vectors.flush()
+            if self._journal_lines > 2 * max(len(self._slots), 1):
+                self._rewrite_journal()
+
+    def close(self) -> None:
+        """Flush and release the memory map; the cache cannot be used afterwards."""
+        self.flush()
+        with self._lock:
+            self._vectors = None
+            self._closed = True
+
+    def stats(self) -> dict:
+        """Return hit/miss counters for reporting."""
+        return {
+            "entries": len(self._slots),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hit_rate, 4)
+        }
+
+    def _check_open(self) -> None:
+        if self._closed:
+            raise RuntimeError(f"Embedding cache {self.cache_dir} is closed")
+
+    def _open_vectors(self, dim: int) -> None:
+        """Create or open the memory-mapped vector matrix at its current size."""
+        self._dim = dim
+        row_bytes = dim * np.dtype(np.float32).itemsize
+        if os.path.exists(self._vectors_path):
+            rows = os.path.getsize(self._vectors_path) // row_bytes
+        else:
+            rows = 0
+        self._map_rows(max(rows, min(self.INITIAL_ROWS, self.capacity)))
+
+    def _grow(self, needed: int) -> None:
+        """Extend the vector file to at least ``needed`` rows, doubling each time."""
+        rows = self._rows
+        while rows < needed:
+            rows *= 2
+        self._vectors.flush()
+        self._map_rows(min(rows, self.capacity))
+
+    def _map_rows(self, rows: int) -> None:
+        size = rows * self._dim * np.dtype(np.float32).itemsize
+        with open(self._vectors_path, "ab") as f:
+            if f.tell() < size:
+                f.truncate(size)
+        self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(rows, self._dim))
+        self._rows = rows
+
+    def _load(self) -> None:
+        """Rebuild the slot index from the journal; later lines win."""
+        if not os.path.exists(self._index_path):
+            return
+
+        with open(self._index_path) as f:
+            header = f.readline().split()
+            entries = [line.split() for line in f]
+
+        if len(header) != 2 or int(header[1]) != self.capacity:
+            # Capacity changed; start over rather than misread the matrix
+            self._reset_files()
+            return
+
+        owner = {}
+        for key, slot in entries:
+            slot = int(slot)
+            previous = owner.get(slot)
+            if previous is not None and self._slots.get(previous) == slot:
+                del self._slots[previous]
+            self._slots.pop(key, None)
+            self._slots[key] = slot
+            owner[slot] = key
+
+        self._journal_lines = len(entries)
+        self._open_vectors(int(header[0]))
+
+    def _append_journal(self, key: str, slot: int) -> None:
+        if self._journal_lines == 0 and not os.path.exists(self._index_path):
+            with open(self._index_path, "w") as f:
+                f.write(f"{self._dim} {self.capacity}\n")
+        with open(self._index_path, "a") as f:
+            f.write(f"{key} {slot}\n")
+        self._journal_lines += 1
+
+    def _rewrite_journal(self) -> None:
+        tmp_path = self._index_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write(f"{self._dim} {self.capacity}\n")
+            for key, slot in self._slots.items():
+                f.write(f"{key} {slot}\n")
+        os.replace(tmp_path, self._index_path)
+        self._journal_lines = len(self._slots)
+
+    def _reset_files(self) -> None:
+        for path in (self._index_path, self._vectors_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that consults an EmbeddingCache before calling the model.
+
+    Works with any LangChain embeddings object, so it can be exercised offline
+    with a deterministic fake such as ``DeterministicFakeEmbedding``.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        cache: EmbeddingCache,
+        model_name: Optional[str] = None
+    ):
+        """
+        Wrap an embeddings model with a persistent cache.
+
+        Args:
+            embeddings: The underlying embeddings model
+            cache: Cache used for both document and query embeddings
+            model_name: Cache namespace; defaults to the model's ``model`` attribute
+        """
+        self.embeddings = embeddings
+        self.cache = cache
+        self.model_name = model_name or getattr(embeddings, "model", None) or type(embeddings).__name__
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed documents, sending only uncached (and unique) texts to the model."""
+        keys = [self._key(text) for text in texts]
+        results = [self.cache.get(key) for key in keys]
+
+        missing = {}
+        for i, vector in enumerate(results):
+            if vector is None:
+                missing.setdefault(keys[i], []).append(i)
+
+        if missing:
+            first_index = [positions[0] for positions in missing.values()]
+            vectors = self.embeddings.embed_documents([texts[i] for i in first_index])
+            for (key, positions), vector in zip(missing.items(), vectors):
+                self.cache.put(key, vector)
+                for i in positions:
+                    results[i] = vector
+            # One flush per batch written; single query embeddings are flushed with the next batch or on close
+            self.cache.flush()
+
+        return results
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a query string, serving repeats from the cache."""
+        key = self._key(text)
+        vector = self.cache.get(key)
+        if vector is None:
+            vector = self.embeddings.embed_query(text)
+            self.cache.put(key, vector)
+        return vector
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode("utf-8")).hexdigest()
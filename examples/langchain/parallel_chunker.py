@@ -0,0 +1,147 @@
+"""
+Parallel, resumable document chunking.
+Fans RecursiveCharacterTextSplitter out across a process pool by document,
+streams chunks back in input order and checkpoints finished documents to a
+local manifest so an interrupted ingest can resume where it stopped.
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from langchain.schema import Document
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+_splitter = None
+
+
+def _init_worker(chunk_size: int, chunk_overlap: int) -> None:
+    """Build the splitter once per worker process."""
+    global _splitter
+    _splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+
+
+def _split_document(document: Document) -> Tuple[List[Document], float]:
+    start = time.perf_counter()
+    chunks = _splitter.split_documents([document])
+    return chunks, time.perf_counter() - start
+
+
+def document_key(document: Document) -> str:
+    """Stable identifier for a document: hash of its source and content."""
+    source = str(document.metadata.get("source", ""))
+    return hashlib.sha256(f"{source}\0{document.page_content}".encode("utf-8")).hexdigest()
+
+
+class ParallelChunker:
+    """Splits documents in a process pool with a checkpoint manifest.
+
+    A document is written to the manifest only after the key of every one of
+    its chunks has been passed to ``acknowledge`` (i.e. the chunk was stored or
+    skipped as a duplicate), so a crash never marks unstored work as done.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        max_workers: Optional[int] = None,
+        manifest_path: Optional[str] = "data/ingest_manifest.jsonl"
+    ):
+        """
+        Initialize the chunker.
+
+        Args:
+            chunk_size: Splitter chunk size in characters
+            chunk_overlap: Splitter overlap in characters
+            max_workers: Worker processes (defaults to the CPU count)
+            manifest_path: JSONL checkpoint file, or None to disable resuming
+        """
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.manifest_path = manifest_path
+        self.timings = []
+        self.skipped_documents = 0
+
+        self._completed = self._load_manifest()
+        self._outstanding: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def iter_chunks(self, documents: Iterable[Document]) -> Iterator[Document]:
+        """
+        Yield chunks for each document, in input order.
+
+        Documents already recorded in the manifest (or repeated within this
+        run) are skipped. At most
+        ``4 * max_workers`` documents are buffered ahead of the consumer.
+        Each chunk carries its document's key in ``metadata["doc_key"]``.
+        """
+        window = deque()
+        submitted = set()
+        with ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=_init_worker,
+            initargs=(self.chunk_size, self.chunk_overlap)
+        ) as executor:
+            for document in documents:
+                key = document_key(document)
+                if key in self._completed or key in submitted:
+                    self.skipped_documents += 1
+                    continue
+                submitted.add(key)
+
+                window.append((key, executor.submit(_split_document, document)))
+                if len(window) >= 4 * self.max_workers:
+                    yield from self._emit(*window.popleft())
+
+            while window:
+                yield from self._emit(*window.popleft())
+
+    def acknowledge(self, doc_keys: Iterable[str]) -> None:
+        """Mark one chunk per key as durably handled; completes documents with no chunks left."""
+        with self._lock:
+            for key in doc_keys:
+                state = self._outstanding.get(key)
+                if state is None:
+                    continue
+                state["remaining"] -= 1
+                if state["remaining"] == 0:
+                    del self._outstanding[key]
+                    self._record(key, state)
+
+    def _emit(self, key: str, future) -> Iterator[Document]:
+        chunks, seconds = future.result()
+        state = {"chunks": len(chunks), "seconds": round(seconds, 6), "remaining": len(chunks)}
+        self.timings.append({"doc_key": key, "chunks": len(chunks), "seconds": seconds})
+
+        with self._lock:
+            if chunks:
+                self._outstanding[key] = state
+            else:
+                self._record(key, state)
+
+        for chunk in chunks:
+            chunk.metadata["doc_key"] = key
+        yield from chunks
+
+    def _record(self, key: str, state: dict) -> None:
+        self._completed.add(key)
+        if not self.manifest_path:
+            return
+        with open(self.manifest_path, "a") as f:
+            f.write(json.dumps({"doc_key": key, "chunks": state["chunks"], "seconds": state["seconds"]}) + "\n")
+
+    def _load_manifest(self) -> set:
+        if not self.manifest_path:
+            return set()
+        os.makedirs(os.path.dirname(self.manifest_path) or ".", exist_ok=True)
+        if not os.path.exists(self.manifest_path):
+            return set()
+        with open(self.manifest_path) as f:
+            return {json.loads(line)["doc_key"] for line in f if line.strip()}
@@ -0,0 +1,106 @@
+"""
+Query-result caching for vector store retrieval.
+Shares top-k results between the SearchDocuments tool and the retriever memory
+and drops cached results whenever the underlying store is written to.
+"""
+
+import re
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, List, Optional
+
+from langchain.schema import Document
+from langchain.vectorstores.base import VectorStoreRetriever
+
+
+def normalize_query(query: str) -> str:
+    """Collapse case, whitespace and trailing punctuation so near-identical queries share a key."""
+    return re.sub(r"\s+", " ", query).strip().rstrip("?!.").strip().lower()
+
+
+class QueryResultCache:
+    """TTL + LRU cache of normalized query -> top-k documents.
+
+    A cached entry fetched with ``k`` results also answers requests for any
+    smaller ``k``. Writers call ``invalidate()``; results computed before an
+    invalidation are discarded instead of being cached.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float = 300.0):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached queries
+            ttl: Seconds before a cached result expires
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.generation = 0
+
+        self._entries = OrderedDict()  # key -> (expires_at, k, documents)
+        self._lock = threading.Lock()
+
+    def get(self, query: str, k: int) -> Optional[List[Document]]:
+        """Return cached documents for ``query`` if at least ``k`` were stored and not expired."""
+        key = normalize_query(query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, stored_k, documents = entry
+                if expires_at < time.monotonic():
+                    del self._entries[key]
+                elif stored_k >= k:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return documents[:k]
+            self.misses += 1
+            return None
+
+    def put(self, query: str, k: int, documents: List[Document], generation: int) -> None:
+        """Cache documents fetched at ``generation``; stale results are ignored."""
+        key = normalize_query(query)
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, k, documents)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self) -> None:
+        """Drop every cached result; called after writes to the vector store."""
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Return hit/miss counters for reporting."""
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class CachedVectorStoreRetriever(VectorStoreRetriever):
+    """Retriever that routes searches through a DocumentManager's query cache.
+
+    Writes made through the retriever (e.g. VectorStoreRetrieverMemory saving
+    conversation turns) invalidate the cache.
+    """
+
+    document_manager: Any
+
+    def _get_relevant_documents(self, query: str, *, run_manager: Any) -> List[Document]:
+        return self.document_manager.search_documents(query, k=self.search_kwargs.get("k", 4))
+
+    async def _aget_relevant_documents(self, query: str, *, run_manager: Any) -> List[Document]:
+        return self._get_relevant_documents(query, run_manager=run_manager)
+
+    def add_documents(self, documents: List[Document], **kwargs: Any) -> List[str]:
+        ids = super().add_documents(documents, **kwargs)
+        self.document_manager.query_cache.invalidate()
+        return ids
+
+    async def aadd_documents(self, documents: List[Document], **kwargs: Any) -> List[str]:
+        return self.add_documents(documents, **kwargs)
@@ -0,0 +1,56 @@
+"""
+Tests for the token-bounded summary memory, using a fake LLM and a word counter.
+
+Run with:
+    python -m pytest test_bounded_memory.py
+"""
+
+from langchain.llms.fake import FakeListLLM
+
+from bounded_memory import BoundedSummaryMemory
+
+
+def make_memory(**kwargs) -> BoundedSummaryMemory:
+    return BoundedSummaryMemory(
+        llm=FakeListLLM(responses=["summary so far"] * 100),
+        return_messages=True,
+        token_counter=lambda text: len(text.split()),
+        **kwargs
+    )
+
+
+def save_turns(memory: BoundedSummaryMemory, count: int) -> None:
+    for turn in range(count):
+        memory.save_context({"input": f"question {turn}"}, {"output": f"answer number {turn}"})
+
+
+def test_keeps_last_turns_and_summarizes_the_rest():
+    memory = make_memory(max_turns=2)
+
+    save_turns(memory, 5)
+
+    assert [message.content for message in memory.chat_memory.messages] == [
+        "question 3", "answer number 3", "question 4", "answer number 4"
+    ]
+    assert memory.summary == "summary so far"
+    assert memory.turn_token_counts[-1]["summarized_messages"] == 2
+
+
+def test_token_budget_evicts_turns_beyond_the_window():
+    memory = make_memory(max_turns=10, max_token_limit=8)
+
+    save_turns(memory, 4)
+
+    assert len(memory.chat_memory.messages) == 2
+    assert memory.turn_token_counts[-1]["memory_tokens"] <= 8
+
+
+def test_turn_statistics_are_bounded():
+    memory = make_memory(max_turns=2, max_turn_stats=3)
+
+    save_turns(memory, 10)
+
+    assert memory.turns == 10
+    assert [counts["turn"] for counts in memory.turn_token_counts] == [8, 9, 10]
+    assert memory.turn_token_counts[-1]["input_tokens"] == 2
+    assert memory.turn_token_counts[-1]["output_tokens"] == 3
@@ -0,0 +1,96 @@
+"""
+Tests for the persistent embedding cache, using a counting fake embeddings model.
+
+Run with:
+    python -m pytest test_embedding_cache.py
+"""
+
+import pytest
+
+from embedding_cache import CachedEmbeddings, EmbeddingCache
+
+DIM = 4
+
+
+def vector(seed: float) -> list:
+    return [seed + i for i in range(DIM)]
+
+
+class CountingEmbeddings:
+    """Deterministic embeddings recording every text sent to the model."""
+
+    model = "fake-model"
+
+    def __init__(self):
+        self.calls = []
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        return [vector(len(text)) for text in texts]
+
+    def embed_query(self, text):
+        self.calls.append([text])
+        return vector(len(text))
+
+
+def test_hits_and_misses_are_counted(tmp_path):
+    cache = EmbeddingCache(str(tmp_path))
+
+    assert cache.get("a") is None
+    cache.put("a", vector(1))
+
+    assert cache.get("a") == vector(1)
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_vectors_survive_reopening_and_file_growth(tmp_path, monkeypatch):
+    monkeypatch.setattr(EmbeddingCache, "INITIAL_ROWS", 2)
+    cache = EmbeddingCache(str(tmp_path), capacity=10)
+    for i in range(7):
+        cache.put(f"k{i}", vector(i))
+    cache.close()
+
+    reopened = EmbeddingCache(str(tmp_path), capacity=10)
+
+    assert reopened._rows == 8
+    assert [reopened.get(f"k{i}") for i in range(7)] == [vector(i) for i in range(7)]
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), capacity=2)
+    cache.put("a", vector(1))
+    cache.put("b", vector(2))
+    cache.get("a")
+
+    cache.put("c", vector(3))
+
+    assert cache.get("b") is None
+    assert cache.get("a") == vector(1)
+    assert cache.get("c") == vector(3)
+    assert cache.evictions == 1
+
+
+def test_closed_cache_raises(tmp_path):
+    cache = EmbeddingCache(str(tmp_path))
+    cache.put("a", vector(1))
+    cache.close()
+
+    with pytest.raises(RuntimeError, match="closed"):
+        cache.get("a")
+    with pytest.raises(RuntimeError, match="closed"):
+        cache.put("b", vector(2))
+
+
+def test_cached_embeddings_send_each_text_once(tmp_path):
+    model = CountingEmbeddings()
+    embeddings = CachedEmbeddings(model, EmbeddingCache(str(tmp_path)))
+
+    first = embeddings.embed_documents(["x", "yy", "x"])
+    second = embeddings.embed_documents(["yy", "zzz"])
+    query = embeddings.embed_query("x")
+
+    assert model.calls == [["x", "yy"], ["zzz"]]
+    assert first == [vector(1), vector(2), vector(1)]
+    assert second == [vector(2), vector(3)]
+    assert query == vector(1)
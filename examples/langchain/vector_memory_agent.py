@@ -5,7 +5,15 @@ Demonstrates integration with vector databases, memory management, and tool usag
 """
 
 import os
-from typing import List, Dict
+import math
+import time
+import hashlib
+import contextvars
+from contextlib import contextmanager
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass
+from typing import List, Dict, Callable, Iterable, Iterator, Optional
 from dotenv import find_dotenv, load_dotenv
 from termcolor import cprint
 
@@ -18,27 +26,79 @@ from langchain.tools import BaseTool
 from langchain.schema import Document
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 
+from ann_vectorstore import NumpyANNVectorStore
+from bounded_memory import BoundedSummaryMemory
+from embedding_cache import EmbeddingCache, CachedEmbeddings
+from parallel_chunker import ParallelChunker
+from retrieval_cache import QueryResultCache, CachedVectorStoreRetriever, normalize_query
+
 # Load environment variables
 dotenv_path = find_dotenv()
 print(f"Loading environment variables from: {dotenv_path}")
 load_dotenv()
 
+@dataclass
+class IngestStats:
+    """Counters reported by a streaming ingestion run."""
+    chunks_seen: int = 0
+    chunks_added: int = 0
+    chunks_skipped: int = 0
+    embedding_calls: int = 0
+    batch_size: int = 64
+    elapsed: float = 0.0
+
+    @property
+    def chunks_per_sec(self) -> float:
+        """Chunks processed per second, including skipped duplicates."""
+        return self.chunks_seen / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def embedding_calls_saved(self) -> int:
+        """Batch embedding requests avoided compared with embedding every chunk seen."""
+        return max(0, math.ceil(self.chunks_seen / self.batch_size) - self.embedding_calls)
+
 class DocumentManager:
     """Manages document storage and retrieval using vector database."""
 
-    def __init__(self, persist_directory: str = "data/vectorstore"):
-        """Initialize document manager with vector store."""
+    def __init__(
+        self,
+        persist_directory: str = "data/vectorstore",
+        embedding_cache_dir: Optional[str] = "data/embedding_cache",
+        backend: str = "chroma"
+    ):
+        """
+        Initialize document manager with vector store.
+
+        Args:
+            persist_directory: Directory for the vector store
+            embedding_cache_dir: Directory for the on-disk embedding cache,
+                or None to call the embedding model directly
+            backend: "chroma" or "numpy-ann" for the in-process IVF index
+        """
         self.embeddings = OpenAIEmbeddings()
+        if embedding_cache_dir:
+            self.embeddings = CachedEmbeddings(
+                self.embeddings,
+                EmbeddingCache(embedding_cache_dir)
+            )
         self.persist_directory = persist_directory
 
         # Create persistence directory if it doesn't exist
         os.makedirs(persist_directory, exist_ok=True)
 
         # Initialize vector store
-        self.vectorstore = Chroma(
-            persist_directory=persist_directory,
-            embedding_function=self.embeddings
-        )
+        if backend == "chroma":
+            self.vectorstore = Chroma(
+                persist_directory=persist_directory,
+                embedding_function=self.embeddings
+            )
+        elif backend == "numpy-ann":
+            self.vectorstore = NumpyANNVectorStore(
+                embedding_function=self.embeddings,
+                persist_directory=persist_directory
+            )
+        else:
+            raise ValueError(f"Unknown vector store backend: {backend}")
 
         # Initialize text splitter for document chunking
         self.text_splitter = RecursiveCharacterTextSplitter(
@@ -46,6 +106,10 @@ class DocumentManager:
             chunk_overlap=200
         )
 
+        # Query results shared between the search tool and retriever memory
+        self.query_cache = QueryResultCache()
+        self._turn_embeddings = contextvars.ContextVar("turn_embeddings", default=None)
+
     def add_documents(self, documents: List[Document]) -> None:
         """Add documents to vector store."""
         # Split documents into chunks
@@ -53,11 +117,189 @@ class DocumentManager:
 
         # Add to vector store
         self.vectorstore.add_documents(texts)
+        self._after_write()
         print(f"Added {len(texts)} document chunks to vector store")
 
+    def ingest_documents(
+        self,
+        documents: Iterable[Document],
+        batch_size: int = 64,
+        max_in_flight: int = 4,
+        chunker: Optional[ParallelChunker] = None,
+        dedupe_window: int = 100_000
+    ) -> IngestStats:
+        """
+        Stream documents into the vector store in deduplicated batches.
+
+        Documents are chunked one at a time, each chunk is keyed by the hash of
+        its content, and chunks that are already stored are skipped. New chunks
+        are embedded and written in batches of ``batch_size`` with at most
+        ``max_in_flight`` batches outstanding.
+
+        With a ``ParallelChunker`` the splitting runs in a process pool and
+        each document is checkpointed once all of its chunks are stored, so
+        rerunning an interrupted ingest skips finished documents.
+
+        Args:
+            documents: Iterable of documents; consumed lazily
+            batch_size: Number of chunks per embedding request
+            max_in_flight: Maximum number of concurrent batch writes
+            chunker: Optional parallel, resumable chunker
+            dedupe_window: Recent chunk hashes remembered to skip repeats
+                without a store lookup; older repeats are still caught by
+                the store check
+
+        Returns:
+            IngestStats with chunk counts, embedding calls and throughput
+        """
+        stats = IngestStats(batch_size=batch_size)
+        start = time.perf_counter()
+        pending = {}
+
+        # Chunks written to a store that only saves on persist() are acknowledged afterwards
+        deferred = Counter()
+        durable = not isinstance(self.vectorstore, NumpyANNVectorStore)
+
+        def acknowledge(chunks: List[Document]) -> None:
+            if chunker is None:
+                return
+            keys = [chunk.metadata["doc_key"] for chunk in chunks]
+            if durable:
+                chunker.acknowledge(keys)
+            else:
+                deferred.update(keys)
+
+        def collect(futures) -> None:
+            for future in futures:
+                future.result()
+                acknowledge(pending.pop(future))
+
+        chunks = chunker.iter_chunks(documents) if chunker else self._iter_chunks(documents)
+        with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+            for batch in self._new_chunk_batches(chunks, batch_size, stats, acknowledge, dedupe_window):
+                if len(pending) >= max_in_flight:
+                    collect(wait(pending, return_when=FIRST_COMPLETED).done)
+
+                ids = [doc.metadata["chunk_hash"] for doc in batch]
+                pending[executor.submit(self.vectorstore.add_documents, batch, ids=ids)] = batch
+                stats.embedding_calls += 1
+                stats.chunks_added += len(batch)
+
+            collect(wait(pending).done)
+
+        if stats.chunks_added:
+            self._after_write()
+        if chunker is not None:
+            chunker.acknowledge(deferred.elements())
+
+        stats.elapsed = time.perf_counter() - start
+        print(
+            f"Ingested {stats.chunks_added} new chunks, skipped {stats.chunks_skipped} "
+            f"duplicates ({stats.chunks_per_sec:.1f} chunks/sec, "
+            f"{stats.embedding_calls} embedding calls, {stats.embedding_calls_saved} calls saved)"
+        )
+        return stats
+
+    def _iter_chunks(self, documents: Iterable[Document]) -> Iterator[Document]:
+        """Split documents one at a time instead of materializing every chunk."""
+        for document in documents:
+            yield from self.text_splitter.split_documents([document])
+
+    def _new_chunk_batches(
+        self,
+        chunks: Iterable[Document],
+        batch_size: int,
+        stats: IngestStats,
+        on_skipped: Callable[[List[Document]], None],
+        dedupe_window: int
+    ) -> Iterator[List[Document]]:
+        """Yield batches of chunks whose content hash is not yet in the store."""
+        seen = OrderedDict()  # recent chunk hashes, least recent first
+        candidates = []
+
+        def flush() -> List[Document]:
+            stored = self._stored_ids([doc.metadata["chunk_hash"] for doc in candidates])
+            fresh = [doc for doc in candidates if doc.metadata["chunk_hash"] not in stored]
+            on_skipped([doc for doc in candidates if doc.metadata["chunk_hash"] in stored])
+            stats.chunks_skipped += len(candidates) - len(fresh)
+            candidates.clear()
+            return fresh
+
+        batch = []
+        for chunk in chunks:
+            stats.chunks_seen += 1
+            chunk_hash = hashlib.sha256(chunk.page_content.encode("utf-8")).hexdigest()
+            if chunk_hash in seen:
+                seen.move_to_end(chunk_hash)
+                stats.chunks_skipped += 1
+                on_skipped([chunk])
+                continue
+            seen[chunk_hash] = None
+            if len(seen) > dedupe_window:
+                seen.popitem(last=False)
+
+            chunk.metadata["chunk_hash"] = chunk_hash
+            candidates.append(chunk)
+            if len(candidates) >= batch_size:
+                batch.extend(flush())
+                while len(batch) >= batch_size:
+                    yield batch[:batch_size]
+                    batch = batch[batch_size:]
+
+        if candidates:
+            batch.extend(flush())
+        while batch:
+            yield batch[:batch_size]
+            batch = batch[batch_size:]
+
+    def _stored_ids(self, ids: List[str]) -> set:
+        """Return the subset of chunk ids already present in the vector store."""
+        if not ids:
+            return set()
+        return set(self.vectorstore.get(ids=ids, include=[])["ids"])
+
+    def _after_write(self) -> None:
+        """Persist the store if it needs an explicit save and drop cached query results."""
+        if isinstance(self.vectorstore, NumpyANNVectorStore):
+            self.vectorstore.persist()
+        self.query_cache.invalidate()
+
     def search_documents(self, query: str, k: int = 4) -> List[Document]:
-        """Search for relevant documents."""
-        return self.vectorstore.similarity_search(query, k=k)
+        """Search for relevant documents, serving repeated queries from the cache."""
+        documents = self.query_cache.get(query, k)
+        if documents is not None:
+            return documents
+
+        generation = self.query_cache.generation
+        documents = self.vectorstore.similarity_search_by_vector(self._embed_query(query), k=k)
+        self.query_cache.put(query, k, documents, generation)
+        return documents
+
+    @contextmanager
+    def turn(self):
+        """
+        Scope a single agent turn.
+
+        Within the turn each distinct (normalized) query is embedded at most
+        once, so the retriever memory and the SearchDocuments tool share one
+        embedding even when a larger ``k`` forces a fresh search.
+        """
+        token = self._turn_embeddings.set({})
+        try:
+            yield self
+        finally:
+            self._turn_embeddings.reset(token)
+
+    def _embed_query(self, query: str) -> List[float]:
+        """Embed a query, reusing the current turn's embedding if there is one."""
+        turn_embeddings = self._turn_embeddings.get()
+        if turn_embeddings is None:
+            return self.embeddings.embed_query(query)
+
+        key = normalize_query(query)
+        if key not in turn_embeddings:
+            turn_embeddings[key] = self.embeddings.embed_query(query)
+        return turn_embeddings[key]
 
 class CustomTools:
     """Collection of custom tools for the agent."""
@@ -76,26 +318,55 @@ class CustomTools:
             )
         ]
 
-def setup_memory_systems(vectorstore: Chroma) -> Dict:
-    """Configure different memory systems."""
+def setup_memory_systems(
+    document_manager: DocumentManager,
+    llm: Optional[ChatOpenAI] = None,
+    max_turns: int = 4,
+    max_token_limit: int = 2000
+) -> Dict:
+    """
+    Configure different memory systems.
+
+    Args:
+        document_manager: Document manager backing the retriever memory
+        llm: If given, conversation memory is bounded and older turns are
+            summarized with this model; otherwise the full history is kept
+        max_turns: Recent turns kept verbatim in bounded mode
+        max_token_limit: Token budget for summary plus recent turns
+    """
+    if llm is not None:
+        conversation_memory = BoundedSummaryMemory(
+            llm=llm,
+            memory_key="chat_history",
+            return_messages=True,
+            max_turns=max_turns,
+            max_token_limit=max_token_limit
+        )
+    else:
+        conversation_memory = ConversationBufferMemory(
+            memory_key="chat_history",
+            return_messages=True
+        )
+
     return {
         "vector_memory": VectorStoreRetrieverMemory(
-            retriever=vectorstore.as_retriever(),
+            retriever=CachedVectorStoreRetriever(
+                vectorstore=document_manager.vectorstore,
+                document_manager=document_manager
+            ),
             input_key="input"
         ),
-        "conversation_memory": ConversationBufferMemory(
-            memory_key="chat_history",
-            return_messages=True
-        )
+        "conversation_memory": conversation_memory
     }
 
 def create_agent(
     llm: ChatOpenAI,
     tools: List[BaseTool],
     memory: Dict,
-    verbose: bool = True
+    verbose: bool = True,
+    memory_name: str = "vector_memory"
 ) -> AgentExecutor:
-    """Create an agent with tools and memory."""
+    """Create an agent with tools and the memory system named ``memory_name``."""
     # Create the agent
     agent = create_structured_chat_agent(
         llm=llm,
@@ -107,14 +378,14 @@ def create_agent(
     return AgentExecutor.from_agent_and_tools(
         agent=agent,
         tools=tools,
-        memory=memory["vector_memory"],
+        memory=memory[memory_name],
         verbose=verbose
     )
 
 def main():
     """Main function demonstrating vector store and memory capabilities."""
     # Initialize document manager
-    doc_manager = DocumentManager()
+    doc_manager = DocumentManager(backend=os.getenv("VECTORSTORE_BACKEND", "chroma"))
 
     # Create sample documents
     sample_docs = [
@@ -130,7 +401,7 @@ def main():
 
     # Add documents to vector store
     print("\nAdding sample documents to vector store...")
-    doc_manager.add_documents(sample_docs)
+    doc_manager.ingest_documents(sample_docs)
 
     # Initialize LLM
     llm = ChatOpenAI(
@@ -142,7 +413,7 @@ def main():
     tools = CustomTools(doc_manager).get_tools()
 
     # Set up memory systems
-    memory = setup_memory_systems(doc_manager.vectorstore)
+    memory = setup_memory_systems(doc_manager, llm=llm)
 
     # Create agent
     print("\nCreating agent with vector store and memory...")
@@ -160,11 +431,21 @@ def main():
     for query in queries:
         print(f"\nQuery: {query}")
         try:
-            response = agent_executor.invoke({"input": query})
+            with doc_manager.turn():
+                response = agent_executor.invoke({"input": query})
             print(f"Response: {response['output']}")
         except Exception as e:
             print(f"Error processing query: {str(e)}")
 
+    if isinstance(doc_manager.embeddings, CachedEmbeddings):
+        print(f"\nEmbedding cache: {doc_manager.embeddings.cache.stats()}")
+        doc_manager.embeddings.cache.close()
+    print(f"Query cache: {doc_manager.query_cache.stats()}")
+
+    # Conversation turns saved by the retriever memory are persisted here
+    if isinstance(doc_manager.vectorstore, NumpyANNVectorStore):
+        doc_manager.vectorstore.persist()
+
     print("\nExample completed! Check the 'data' directory for vector store data.")
 
 if __name__ == "__main__":
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark for NumpyMemoryStore against Semantic Kernel's VolatileMemoryStore.
+Measures bulk upsert time, nearest-match query latency and, for the NumPy
+store, persist and reload time.
+
+Usage:
+    python benchmark_memory_store.py --records 10000 100000 1000000 --queries 50
+"""
+
+import time
+import shutil
+import asyncio
+import argparse
+import tempfile
+import statistics
+
+import numpy as np
+from semantic_kernel.memory import VolatileMemoryStore
+from semantic_kernel.memory.memory_record import MemoryRecord
+
+from numpy_memory_store import NumpyMemoryStore
+
+COLLECTION = "benchmark"
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='VolatileMemoryStore vs NumpyMemoryStore benchmark')
+    parser.add_argument('--records', type=int, nargs='+', default=[10_000, 100_000, 1_000_000],
+                        help='Collection sizes to benchmark')
+    parser.add_argument('--dim', type=int, default=384, help='Embedding dimension')
+    parser.add_argument('--queries', type=int, default=50, help='Queries per measurement')
+    parser.add_argument('--limit', type=int, default=5, help='Matches per query')
+    parser.add_argument('--batch-size', type=int, default=10_000, help='Records per upsert batch')
+    parser.add_argument('--skip-volatile-above', type=int, default=100_000,
+                        help='Skip VolatileMemoryStore for collections larger than this')
+    return parser.parse_args()
+
+
+def make_records(vectors: np.ndarray) -> list:
+    return [
+        MemoryRecord(
+            is_reference=False,
+            external_source_name=None,
+            id=f"doc-{i}",
+            description=None,
+            text=f"document {i}",
+            additional_metadata=None,
+            embedding=vector
+        )
+        for i, vector in enumerate(vectors)
+    ]
+
+
+async def run_store(store, records: list, queries: np.ndarray, args) -> dict:
+    await store.create_collection_async(COLLECTION)
+
+    start = time.perf_counter()
+    for i in range(0, len(records), args.batch_size):
+        await store.upsert_batch_async(COLLECTION, records[i:i + args.batch_size])
+    upsert_seconds = time.perf_counter() - start
+
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        await store.get_nearest_matches_async(COLLECTION, query, args.limit, with_embeddings=False)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    return {
+        "upsert_s": upsert_seconds,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": float(np.percentile(latencies, 95))
+    }
+
+
+async def run_reload(persist_directory: str, queries: np.ndarray, args) -> dict:
+    start = time.perf_counter()
+    store = NumpyMemoryStore(persist_directory)
+    await store.get_nearest_matches_async(COLLECTION, queries[0], args.limit, with_embeddings=False)
+    return {"reload_first_query_ms": (time.perf_counter() - start) * 1000}
+
+
+async def main():
+    args = parse_arguments()
+    rng = np.random.default_rng(0)
+    queries = rng.standard_normal((args.queries, args.dim)).astype(np.float32)
+
+    print(f"{'records':>9} {'store':>9} {'upsert s':>9} {'p50 ms':>9} {'p95 ms':>9}")
+    for count in args.records:
+        vectors = rng.standard_normal((count, args.dim)).astype(np.float32)
+        records = make_records(vectors)
+
+        stores = {"numpy": NumpyMemoryStore}
+        if count <= args.skip_volatile_above:
+            stores["volatile"] = VolatileMemoryStore
+
+        persist_directory = tempfile.mkdtemp(prefix="memory_store_")
+        try:
+            for name, factory in stores.items():
+                store = factory(persist_directory) if name == "numpy" else factory()
+                result = await run_store(store, records, queries, args)
+                print(f"{count:>9} {name:>9} {result['upsert_s']:>9.2f} "
+                      f"{result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f}")
+
+                if name == "numpy":
+                    start = time.perf_counter()
+                    store.persist()
+                    persist_ms = (time.perf_counter() - start) * 1000
+                    reload = await run_reload(persist_directory, queries, args)
+                    print(f"{count:>9} {'':>9} persist {persist_ms:.1f} ms, "
+                          f"reload + first query {reload['reload_first_query_ms']:.1f} ms")
+        finally:
+            shutil.rmtree(persist_directory)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
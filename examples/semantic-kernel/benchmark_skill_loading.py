@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Startup-time benchmark for semantic skill loading.
+Compares eager import_semantic_skill_from_directory for every skill against
+lazy loading through the shared prompt registry, with 2 and 200 skills.
+
+Usage:
+    python benchmark_skill_loading.py --skills 2 200 --constructions 50
+"""
+
+import os
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+
+import semantic_kernel as sk
+
+from prompt_registry import LazySkills, PromptTemplateRegistry
+
+FUNCTION_NAME = "run"
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Eager vs lazy skill loading benchmark')
+    parser.add_argument('--skills', type=int, nargs='+', default=[2, 200],
+                        help='Number of skills on disk')
+    parser.add_argument('--constructions', type=int, default=50,
+                        help='Kernels constructed per measurement (one per simulated request)')
+    parser.add_argument('--used', type=int, default=2,
+                        help='Skills actually invoked per request')
+    return parser.parse_args()
+
+
+def create_skills(root: str, count: int) -> list:
+    """Write ``count`` skills modelled on prompts/summarize; returns their names."""
+    source = os.path.join(os.path.dirname(os.path.abspath(__file__)), "prompts", "summarize")
+    names = []
+    for i in range(count):
+        name = f"skill_{i:03d}"
+        shutil.copytree(source, os.path.join(root, name, FUNCTION_NAME))
+        names.append(name)
+    return names
+
+
+def eager_startup(skills_dir: str, names: list, used: int) -> None:
+    kernel = sk.Kernel()
+    skills = {name: kernel.import_semantic_skill_from_directory(skills_dir, name) for name in names}
+    for name in names[:used]:
+        skills[name][FUNCTION_NAME]
+
+
+def lazy_startup(skills_dir: str, names: list, used: int, registry: PromptTemplateRegistry) -> None:
+    kernel = sk.Kernel()
+    skills = LazySkills(kernel, skills_dir, registry)
+    for name in names[:used]:
+        skills.function(name, FUNCTION_NAME)
+
+
+def measure(fn, constructions: int) -> list:
+    timings = []
+    for _ in range(constructions):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    args = parse_arguments()
+
+    print(f"{'skills':>7} {'mode':>6} {'first ms':>9} {'median ms':>10} {'mean ms':>9}")
+    for count in args.skills:
+        skills_dir = tempfile.mkdtemp(prefix="skills_")
+        try:
+            names = create_skills(skills_dir, count)
+            registry = PromptTemplateRegistry()
+
+            results = {
+                "eager": measure(lambda: eager_startup(skills_dir, names, args.used), args.constructions),
+                "lazy": measure(lambda: lazy_startup(skills_dir, names, args.used, registry), args.constructions)
+            }
+            for mode, timings in results.items():
+                print(f"{count:>7} {mode:>6} {timings[0]:>9.2f} "
+                      f"{statistics.median(timings):>10.2f} {statistics.mean(timings):>9.2f}")
+            print(f"{count:>7} {'':>6} registry loads: {registry.loads}")
+        finally:
+            shutil.rmtree(skills_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Helpers for map-reduce processing of long inputs.
+Splits text into token-bounded chunks with content-defined boundaries and
+caches per-chunk results on disk so unchanged sections are not re-processed.
+"""
+
+import os
+import re
+import hashlib
+from functools import lru_cache
+from typing import Callable, List, Optional
+
+# Rough size of a token in English text, used when tiktoken is unavailable
+CHARS_PER_TOKEN = 4
+
+
+@lru_cache(maxsize=None)
+def get_encoding():
+    """
+    The cl100k_base tokenizer, loaded on first use.
+
+    Returns None if tiktoken is not installed or its encoding file cannot be
+    downloaded (e.g. offline), in which case tokens are estimated.
+    """
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens with a local tokenizer, or estimate them from the length."""
+    encoding = get_encoding()
+    if encoding is None:
+        return len(text) // CHARS_PER_TOKEN
+    return len(encoding.encode(text))
+
+
+def _pack(parts: List[str], separator: str, max_tokens: int, counter: Callable[[str], int]) -> List[str]:
+    """Greedily join ``parts`` into pieces of at most ``max_tokens`` (single parts may exceed it)."""
+    pieces, current = [], ""
+    for part in parts:
+        candidate = f"{current}{separator}{part}" if current else part
+        if current and counter(candidate) > max_tokens:
+            pieces.append(current)
+            candidate = part
+        current = candidate
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def _split_characters(text: str, max_tokens: int, counter: Callable[[str], int]) -> List[str]:
+    """Cut text into the longest prefixes that fit the budget, found by binary search."""
+    pieces = []
+    while text:
+        low, high = 1, len(text)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if counter(text[:middle]) <= max_tokens:
+                low = middle
+            else:
+                high = middle - 1
+        pieces.append(text[:low])
+        text = text[low:]
+    return pieces
+
+
+def _split_oversized(paragraph: str, max_tokens: int, counter: Callable[[str], int]) -> List[str]:
+    """Break a paragraph that exceeds the budget at sentence, then word, then character boundaries."""
+    result = []
+    for sentence_piece in _pack(re.split(r"(?<=[.!?])\s+", paragraph), " ", max_tokens, counter):
+        if counter(sentence_piece) <= max_tokens:
+            result.append(sentence_piece)
+            continue
+        for word_piece in _pack(sentence_piece.split(), " ", max_tokens, counter):
+            if counter(word_piece) <= max_tokens:
+                result.append(word_piece)
+            else:
+                result.extend(_split_characters(word_piece, max_tokens, counter))
+    return result
+
+
+def split_by_token_budget(
+    text: str,
+    max_tokens: int,
+    counter: Callable[[str], int] = count_tokens
+) -> List[str]:
+    """
+    Split text into chunks of at most ``max_tokens`` tokens.
+
+    Chunks are built from whole paragraphs. Besides the budget, a chunk also
+    ends after any paragraph whose content hash marks it as a boundary (once
+    the chunk is a quarter full), so boundaries depend on local content and
+    an edit to one section leaves the other chunks unchanged.
+
+    Args:
+        text: Input text
+        max_tokens: Token budget per chunk
+        counter: Token counting function
+
+    Returns:
+        List of chunk strings
+    """
+    paragraphs = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if counter(paragraph) > max_tokens:
+            paragraphs.extend(_split_oversized(paragraph, max_tokens, counter))
+        else:
+            paragraphs.append(paragraph)
+
+    chunks, current, current_tokens = [], [], 0
+    for paragraph in paragraphs:
+        tokens = counter(paragraph)
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append("\n\n".join(current))
+            current, current_tokens = [], 0
+
+        current.append(paragraph)
+        current_tokens += tokens
+
+        is_boundary = hashlib.sha256(paragraph.encode("utf-8")).digest()[0] % 4 == 0
+        if is_boundary and current_tokens >= max_tokens // 4:
+            chunks.append("\n\n".join(current))
+            current, current_tokens = [], 0
+
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+class ChunkResultCache:
+    """On-disk cache of per-chunk results, one file per (namespace, chunk hash)."""
+
+    def __init__(self, cache_dir: str = "data/chunk_cache"):
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def get(self, namespace: str, text: str) -> Optional[str]:
+        path = self._path(namespace, text)
+        if not os.path.exists(path):
+            self.misses += 1
+            return None
+        self.hits += 1
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+
+    def put(self, namespace: str, text: str, result: str) -> None:
+        path = self._path(namespace, text)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(result)
+        os.replace(tmp_path, path)
+
+    def _path(self, namespace: str, text: str) -> str:
+        key = hashlib.sha256(f"{namespace}\0{text}".encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.txt")
@@ -0,0 +1,378 @@
+"""
+NumPy-backed memory store for Semantic Kernel.
+Drop-in replacement for VolatileMemoryStore that keeps each collection's
+embeddings in one contiguous matrix, answers nearest-match queries with a
+single matrix product, and can persist collections to disk for reload with
+memory-mapped embeddings.
+"""
+
+import os
+import json
+import shutil
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from semantic_kernel.memory.memory_record import MemoryRecord
+from semantic_kernel.memory.memory_store_base import MemoryStoreBase
+
+EMBEDDINGS_FILE = "embeddings.npy"
+RECORDS_FILE = "records.jsonl"
+MANIFEST_FILE = "manifest.json"
+
+
+class _Collection:
+    """Embedding matrix plus per-row record metadata for one collection.
+
+    Rows are appended; a delete only clears the row's ``alive`` flag
+    (tombstone) and ``compact`` rewrites the matrix without dead rows.
+    """
+
+    def __init__(self, vectors: Optional[np.ndarray] = None, records: Optional[List[dict]] = None):
+        self.vectors = vectors  # (capacity, dim); may be a read-only memmap after load
+        self.records: List[Optional[dict]] = records or []
+        self.row_by_key: Dict[str, int] = {
+            record["key"]: row for row, record in enumerate(self.records)
+        }
+        self.count = len(self.records)
+        self.alive = np.ones(self.count, dtype=bool)
+        self.norms = (
+            np.linalg.norm(vectors[:self.count], axis=1).astype(np.float32)
+            if vectors is not None else np.zeros(0, dtype=np.float32)
+        )
+
+    @property
+    def dead(self) -> int:
+        return self.count - len(self.row_by_key)
+
+    def upsert(self, records: List[MemoryRecord]) -> None:
+        if not records:
+            return
+        records = list({record._key: record for record in records}.values())
+        vectors = np.asarray([record.embedding for record in records], dtype=np.float32)
+        for record in records:
+            self.remove(record._key)
+        self._reserve(self.count + len(records), vectors.shape[1])
+
+        rows = slice(self.count, self.count + len(records))
+        self.vectors[rows] = vectors
+        self.norms[rows] = np.linalg.norm(vectors, axis=1)
+        self.alive[rows] = True
+        for offset, record in enumerate(records):
+            self.records.append(_to_dict(record))
+            self.row_by_key[record._key] = self.count + offset
+        self.count += len(records)
+
+    def remove(self, key: str) -> None:
+        row = self.row_by_key.pop(key, None)
+        if row is not None:
+            self.alive[row] = False
+            self.records[row] = None
+
+    def compact(self) -> None:
+        """Drop tombstoned rows so the matrix is dense again."""
+        if self.vectors is None:
+            return
+        keep = np.flatnonzero(self.alive[:self.count])
+        self.vectors = np.ascontiguousarray(self.vectors[keep])
+        self.norms = self.norms[keep]
+        self.records = [self.records[row] for row in keep]
+        self.row_by_key = {record["key"]: row for row, record in enumerate(self.records)}
+        self.count = len(keep)
+        self.alive = np.ones(self.count, dtype=bool)
+
+    def scores(self, queries: np.ndarray) -> np.ndarray:
+        """Cosine similarity of each query (rows) against every live row."""
+        if self.count == 0:
+            return np.zeros((len(queries), 0), dtype=np.float32)
+        query_norms = np.linalg.norm(queries, axis=1)
+        scores = queries @ self.vectors[:self.count].T
+        scores /= np.outer(query_norms, self.norms[:self.count]) + 1e-12
+        scores[:, ~self.alive[:self.count]] = -np.inf
+        return scores
+
+    def _reserve(self, size: int, dim: int) -> None:
+        if self.vectors is not None and self.vectors.shape[1] != dim:
+            raise ValueError(f"Embedding dimension {dim} does not match collection dimension {self.vectors.shape[1]}")
+        capacity = 0 if self.vectors is None else len(self.vectors)
+        writable = self.vectors is not None and not isinstance(self.vectors, np.memmap)
+        if size <= capacity and writable:
+            return
+
+        # Grow geometrically; a memory-mapped matrix is copied into memory on first write
+        capacity = max(size, capacity * 2, 1024)
+        vectors = np.empty((capacity, dim), dtype=np.float32)
+        norms = np.empty(capacity, dtype=np.float32)
+        alive = np.zeros(capacity, dtype=bool)
+        vectors[:self.count] = self.vectors[:self.count] if self.vectors is not None else 0
+        norms[:self.count] = self.norms[:self.count]
+        alive[:self.count] = self.alive[:self.count]
+        self.vectors, self.norms, self.alive = vectors, norms, alive
+
+
+def _to_dict(record: MemoryRecord) -> dict:
+    timestamp = record._timestamp
+    return {
+        "key": record._key,
+        "id": record._id,
+        "is_reference": record._is_reference,
+        "external_source_name": record._external_source_name,
+        "description": record._description,
+        "text": record._text,
+        "additional_metadata": record._additional_metadata,
+        "timestamp": timestamp.isoformat() if isinstance(timestamp, datetime) else timestamp
+    }
+
+
+def _to_record(data: dict, embedding: Optional[np.ndarray]) -> MemoryRecord:
+    timestamp = data["timestamp"]
+    return MemoryRecord(
+        is_reference=data["is_reference"],
+        external_source_name=data["external_source_name"],
+        id=data["id"],
+        description=data["description"],
+        text=data["text"],
+        additional_metadata=data["additional_metadata"],
+        embedding=np.array(embedding) if embedding is not None else None,
+        key=data["key"],
+        timestamp=datetime.fromisoformat(timestamp) if isinstance(timestamp, str) else timestamp
+    )
+
+
+def _read_manifest(path: str) -> Optional[dict]:
+    """Current version of a persisted collection, or None if there is none.
+
+    Collections written before manifests were introduced are read from the
+    unversioned ``embeddings.npy``/``records.jsonl`` pair as version 0.
+    """
+    try:
+        with open(os.path.join(path, MANIFEST_FILE)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        if os.path.exists(os.path.join(path, RECORDS_FILE)):
+            return {"version": 0, "embeddings": EMBEDDINGS_FILE, "records": RECORDS_FILE}
+        return None
+
+
+class NumpyMemoryStore(MemoryStoreBase):
+    """Memory store with contiguous per-collection embedding matrices.
+
+    Layout of ``persist_directory`` (one subdirectory per collection):
+        <collection>/manifest.json          - names the current version's files
+        <collection>/embeddings.<v>.npy     - dense float32 matrix, memory-mapped on load
+        <collection>/records.<v>.jsonl      - one record per matrix row
+
+    Each persist writes a new version and then replaces the manifest, so a
+    reader always sees the old or the new collection, never a mix of both.
+    """
+
+    def __init__(self, persist_directory: Optional[str] = None, compact_ratio: float = 0.25):
+        """
+        Initialize the store. Persisted collections are listed immediately
+        but only loaded when first used.
+
+        Args:
+            persist_directory: Directory for persistence, or None for in-memory only
+            compact_ratio: Compact a collection once this fraction of its rows are deleted
+        """
+        self.persist_directory = persist_directory
+        self.compact_ratio = compact_ratio
+        self._collections: Dict[str, Optional[_Collection]] = {}
+        self._lock = threading.Lock()
+
+        if persist_directory:
+            os.makedirs(persist_directory, exist_ok=True)
+            for name in os.listdir(persist_directory):
+                if _read_manifest(os.path.join(persist_directory, name)) is not None:
+                    self._collections[name] = None
+
+    async def create_collection_async(self, collection_name: str) -> None:
+        with self._lock:
+            self._collections.setdefault(collection_name, _Collection())
+
+    async def get_collections_async(self) -> List[str]:
+        return list(self._collections)
+
+    async def delete_collection_async(self, collection_name: str) -> None:
+        with self._lock:
+            self._collections.pop(collection_name, None)
+            if self.persist_directory:
+                shutil.rmtree(os.path.join(self.persist_directory, collection_name), ignore_errors=True)
+
+    async def does_collection_exist_async(self, collection_name: str) -> bool:
+        return collection_name in self._collections
+
+    async def upsert_async(self, collection_name: str, record: MemoryRecord) -> str:
+        return (await self.upsert_batch_async(collection_name, [record]))[0]
+
+    async def upsert_batch_async(self, collection_name: str, records: List[MemoryRecord]) -> List[str]:
+        with self._lock:
+            collection = self._collection(collection_name)
+            for record in records:
+                record._key = record._id
+            collection.upsert(records)
+            self._maybe_compact(collection)
+        return [record._key for record in records]
+
+    async def get_async(self, collection_name: str, key: str, with_embedding: bool) -> MemoryRecord:
+        records = await self.get_batch_async(collection_name, [key], with_embedding)
+        if not records:
+            raise KeyError(f"Key '{key}' not found in collection '{collection_name}'")
+        return records[0]
+
+    async def get_batch_async(
+        self, collection_name: str, keys: List[str], with_embeddings: bool
+    ) -> List[MemoryRecord]:
+        with self._lock:
+            collection = self._collection(collection_name)
+            rows = [collection.row_by_key[key] for key in keys if key in collection.row_by_key]
+            return [
+                _to_record(collection.records[row], collection.vectors[row] if with_embeddings else None)
+                for row in rows
+            ]
+
+    async def remove_async(self, collection_name: str, key: str) -> None:
+        await self.remove_batch_async(collection_name, [key])
+
+    async def remove_batch_async(self, collection_name: str, keys: List[str]) -> None:
+        with self._lock:
+            collection = self._collection(collection_name)
+            for key in keys:
+                collection.remove(key)
+            self._maybe_compact(collection)
+
+    async def get_nearest_matches_async(
+        self,
+        collection_name: str,
+        embedding: np.ndarray,
+        limit: int,
+        min_relevance_score: float = 0.0,
+        with_embeddings: bool = True
+    ) -> List[Tuple[MemoryRecord, float]]:
+        return (await self.get_nearest_matches_batch_async(
+            collection_name, [embedding], limit, min_relevance_score, with_embeddings
+        ))[0]
+
+    async def get_nearest_match_async(
+        self,
+        collection_name: str,
+        embedding: np.ndarray,
+        min_relevance_score: float = 0.0,
+        with_embedding: bool = True
+    ) -> Tuple[MemoryRecord, float]:
+        matches = await self.get_nearest_matches_async(
+            collection_name, embedding, 1, min_relevance_score, with_embedding
+        )
+        return matches[0] if matches else None
+
+    async def get_nearest_matches_batch_async(
+        self,
+        collection_name: str,
+        embeddings: List[np.ndarray],
+        limit: int,
+        min_relevance_score: float = 0.0,
+        with_embeddings: bool = True
+    ) -> List[List[Tuple[MemoryRecord, float]]]:
+        """
+        Top-``limit`` cosine matches for several query embeddings with one matrix product.
+
+        Args:
+            collection_name: Collection to search
+            embeddings: Query embeddings
+            limit: Maximum matches per query
+            min_relevance_score: Minimum cosine similarity to return
+            with_embeddings: Include embeddings on returned records
+
+        Returns:
+            One list of (record, score) pairs per query, best first
+        """
+        queries = np.asarray(embeddings, dtype=np.float32)
+        with self._lock:
+            collection = self._collection(collection_name)
+            scores = collection.scores(queries)
+            k = min(limit, scores.shape[1])
+
+            results = []
+            for row_scores in scores:
+                top = np.argpartition(-row_scores, k - 1)[:k] if k else np.zeros(0, dtype=int)
+                top = top[np.argsort(-row_scores[top])]
+                results.append([
+                    (
+                        _to_record(collection.records[row], collection.vectors[row] if with_embeddings else None),
+                        float(row_scores[row])
+                    )
+                    for row in top
+                    if row_scores[row] >= min_relevance_score
+                ])
+            return results
+
+    def persist(self, collection_name: Optional[str] = None) -> None:
+        """Compact and write one collection, or every loaded collection, to disk."""
+        if not self.persist_directory:
+            return
+
+        with self._lock:
+            names = [collection_name] if collection_name else list(self._collections)
+            for name in names:
+                collection = self._collections.get(name)
+                if collection is None:
+                    continue  # never loaded, so unchanged on disk
+
+                collection.compact()
+                path = os.path.join(self.persist_directory, name)
+                os.makedirs(path, exist_ok=True)
+                vectors = collection.vectors if collection.vectors is not None else np.zeros((0, 0), np.float32)
+                vectors = np.ascontiguousarray(vectors[:collection.count])
+
+                # Write the new version next to the current one; the manifest
+                # replace below is the single step that switches between them
+                previous = _read_manifest(path)
+                version = previous["version"] + 1 if previous else 1
+                manifest = {
+                    "version": version,
+                    "embeddings": f"embeddings.{version}.npy",
+                    "records": f"records.{version}.jsonl"
+                }
+                np.save(os.path.join(path, manifest["embeddings"]), vectors)
+                with open(os.path.join(path, manifest["records"]), "w") as f:
+                    for record in collection.records:
+                        f.write(json.dumps(record) + "\n")
+
+                tmp_path = os.path.join(path, f"{MANIFEST_FILE}.tmp")
+                with open(tmp_path, "w") as f:
+                    json.dump(manifest, f)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, os.path.join(path, MANIFEST_FILE))
+
+                # Release the memory map before removing the files of the old version
+                collection.vectors = vectors
+                if previous:
+                    for file_name in {previous["embeddings"], previous["records"]}:
+                        try:
+                            os.remove(os.path.join(path, file_name))
+                        except OSError:
+                            pass
+
+    def _collection(self, name: str) -> _Collection:
+        if name not in self._collections:
+            raise ValueError(f"Collection '{name}' does not exist")
+        collection = self._collections[name]
+        if collection is None:
+            collection = self._collections[name] = self._load(name)
+        return collection
+
+    def _load(self, name: str) -> _Collection:
+        path = os.path.join(self.persist_directory, name)
+        manifest = _read_manifest(path)
+        with open(os.path.join(path, manifest["records"])) as f:
+            records = [json.loads(line) for line in f if line.strip()]
+        vectors = None
+        if records:
+            vectors = np.load(os.path.join(path, manifest["embeddings"]), mmap_mode="r")
+        return _Collection(vectors, records)
+
+    def _maybe_compact(self, collection: _Collection) -> None:
+        if collection.count and collection.dead / collection.count > self.compact_ratio:
+            collection.compact()
@@ -0,0 +1,139 @@
+"""
+Process-wide registry of compiled semantic function templates.
+Skills are parsed from disk once per process (keyed by path and mtime),
+registered on a kernel lazily on first use, and reloaded when their files change.
+"""
+
+import os
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+import semantic_kernel as sk
+from semantic_kernel.semantic_functions import PromptTemplate, PromptTemplateConfig
+
+CONFIG_FILE = "config.json"
+PROMPT_FILE = "skprompt.txt"
+
+
+@dataclass(frozen=True)
+class CompiledPrompt:
+    """Parsed config and template text for one semantic function."""
+    path: str
+    mtimes: Tuple[float, float]
+    config: PromptTemplateConfig
+    template: str
+
+
+class PromptTemplateRegistry:
+    """Caches CompiledPrompt objects by function directory and file modification times."""
+
+    def __init__(self):
+        self.loads = 0
+        self._entries: Dict[str, CompiledPrompt] = {}
+        self._lock = threading.Lock()
+
+    def get(self, function_dir: str) -> CompiledPrompt:
+        """
+        Return the compiled prompt in ``function_dir``, re-reading it only if its files changed.
+
+        Args:
+            function_dir: Directory containing config.json and skprompt.txt
+
+        Returns:
+            CompiledPrompt for the directory
+        """
+        function_dir = os.path.abspath(function_dir)
+        config_path = os.path.join(function_dir, CONFIG_FILE)
+        prompt_path = os.path.join(function_dir, PROMPT_FILE)
+        mtimes = (os.stat(config_path).st_mtime, os.stat(prompt_path).st_mtime)
+
+        with self._lock:
+            cached = self._entries.get(function_dir)
+            if cached is not None and cached.mtimes == mtimes:
+                return cached
+
+        with open(config_path) as f:
+            config = PromptTemplateConfig.from_json(f.read())
+        with open(prompt_path) as f:
+            template = f.read()
+
+        compiled = CompiledPrompt(path=function_dir, mtimes=mtimes, config=config, template=template)
+        with self._lock:
+            self._entries[function_dir] = compiled
+            self.loads += 1
+        return compiled
+
+
+# Shared by every SemanticProcessor in the process
+registry = PromptTemplateRegistry()
+
+
+def function_dirs(skills_dir: str, skill_name: str) -> List[Tuple[str, str]]:
+    """
+    List (function name, directory) pairs for a skill.
+
+    A skill directory holding config.json/skprompt.txt directly is a single
+    function named after the skill; otherwise each subdirectory with a
+    skprompt.txt is a function.
+    """
+    skill_dir = os.path.join(skills_dir, skill_name)
+    if os.path.exists(os.path.join(skill_dir, PROMPT_FILE)):
+        return [(skill_name, skill_dir)]
+    return [
+        (name, os.path.join(skill_dir, name))
+        for name in sorted(os.listdir(skill_dir))
+        if os.path.exists(os.path.join(skill_dir, name, PROMPT_FILE))
+    ]
+
+
+class LazySkills:
+    """Per-kernel view of a skills directory that registers functions on first use."""
+
+    def __init__(self, kernel: sk.Kernel, skills_dir: str, prompt_registry: PromptTemplateRegistry = registry):
+        """
+        Initialize the view; nothing is read from disk until a function is requested.
+
+        Args:
+            kernel: Kernel to register functions on
+            skills_dir: Parent directory of the skill directories
+            prompt_registry: Registry of compiled templates
+        """
+        self.kernel = kernel
+        self.skills_dir = skills_dir
+        self.registry = prompt_registry
+        self._functions: Dict[Tuple[str, str], tuple] = {}
+
+    def function(self, skill_name: str, function_name: str = None):
+        """
+        Return a registered semantic function, loading or reloading it as needed.
+
+        Args:
+            skill_name: Skill directory name
+            function_name: Function within the skill (defaults to the skill name)
+        """
+        function_name = function_name or skill_name
+        key = (skill_name, function_name)
+        compiled = self.registry.get(self._function_dir(skill_name, function_name))
+
+        loaded = self._functions.get(key)
+        if loaded is not None and loaded[0] is compiled:
+            return loaded[1]
+
+        template = PromptTemplate(compiled.template, self.kernel.prompt_template_engine, compiled.config)
+        function = self.kernel.register_semantic_function(
+            skill_name, function_name, sk.SemanticFunctionConfig(compiled.config, template)
+        )
+        self._functions[key] = (compiled, function)
+        return function
+
+    def compiled(self, skill_name: str, function_name: str = None) -> CompiledPrompt:
+        """Return the compiled prompt behind a function without registering it."""
+        function_name = function_name or skill_name
+        return self.registry.get(self._function_dir(skill_name, function_name))
+
+    def _function_dir(self, skill_name: str, function_name: str) -> str:
+        skill_dir = os.path.join(self.skills_dir, skill_name)
+        if function_name == skill_name and os.path.exists(os.path.join(skill_dir, PROMPT_FILE)):
+            return skill_dir
+        return os.path.join(skill_dir, function_name)
@@ -0,0 +1,250 @@
+"""
+Response cache for semantic function invocations.
+Completions are keyed by the rendered prompt and completion settings, with an
+optional near-duplicate mode that matches prompts by embedding similarity.
+Storage is pluggable: an in-memory LRU or SQLite on disk.
+"""
+
+import os
+import json
+import time
+import asyncio
+import sqlite3
+import hashlib
+import inspect
+import threading
+from collections import OrderedDict
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+import numpy as np
+
+
+def settings_key(settings: dict) -> str:
+    """Stable hash of completion settings."""
+    return hashlib.sha256(json.dumps(settings, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def cache_key(prompt: str, settings: dict) -> str:
+    """Exact-match key for a rendered prompt under given settings."""
+    return hashlib.sha256(f"{settings_key(settings)}\0{prompt}".encode("utf-8")).hexdigest()
+
+
+def _best_match(
+    candidates: List[Tuple[str, np.ndarray]],
+    embedding: List[float],
+    threshold: float
+) -> Optional[Tuple[str, float]]:
+    """Return the (response, similarity) of the most similar candidate at or above ``threshold``."""
+    if not candidates:
+        return None
+    query = np.asarray(embedding, dtype=np.float32)
+    matrix = np.stack([vector for _, vector in candidates])
+    scores = matrix @ query / (np.linalg.norm(matrix, axis=1) * np.linalg.norm(query) + 1e-12)
+    best = int(np.argmax(scores))
+    if scores[best] < threshold:
+        return None
+    return candidates[best][0], float(scores[best])
+
+
+class InMemoryResponseStore:
+    """LRU store of responses (and optional prompt embeddings) in process memory."""
+
+    blocking = False  # dict lookups are safe to run on the event loop
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (settings hash, response, embedding)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: str, settings_hash: str, response: str, embedding: Optional[List[float]] = None) -> None:
+        vector = np.asarray(embedding, dtype=np.float32) if embedding is not None else None
+        with self._lock:
+            self._entries[key] = (settings_hash, response, vector)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def nearest(self, settings_hash: str, embedding: List[float], threshold: float) -> Optional[Tuple[str, float]]:
+        with self._lock:
+            candidates = [
+                (response, vector) for entry_hash, response, vector in self._entries.values()
+                if entry_hash == settings_hash and vector is not None
+            ]
+        return _best_match(candidates, embedding, threshold)
+
+
+class SQLiteResponseStore:
+    """
+    Persistent store in a SQLite database; eviction drops least recently used rows.
+    Near-duplicate lookups compare against the ``max_scan`` most recently used
+    rows with the same settings, not the whole table.
+    """
+
+    blocking = True  # disk I/O runs in a worker thread, off the event loop
+
+    def __init__(self, path: str = "data/response_cache.sqlite", max_entries: int = 100_000, max_scan: int = 5000):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_scan = max_scan
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                settings_hash TEXT NOT NULL,
+                response TEXT NOT NULL,
+                embedding BLOB,
+                last_used REAL NOT NULL
+            )
+        """)
+        # Near-duplicate scans read the most recently used rows per settings hash
+        self._connection.execute("DROP INDEX IF EXISTS responses_settings")
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS responses_settings_last_used ON responses (settings_hash, last_used)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)"
+        )
+        self._connection.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT response FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._connection.execute(
+                "UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key)
+            )
+            self._connection.commit()
+            return row[0]
+
+    def put(self, key: str, settings_hash: str, response: str, embedding: Optional[List[float]] = None) -> None:
+        blob = np.asarray(embedding, dtype=np.float32).tobytes() if embedding is not None else None
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (key, settings_hash, response, blob, time.time())
+            )
+            self._connection.execute(
+                """DELETE FROM responses WHERE key IN (
+                       SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                   )""",
+                (self.max_entries,)
+            )
+            self._connection.commit()
+
+    def nearest(self, settings_hash: str, embedding: List[float], threshold: float) -> Optional[Tuple[str, float]]:
+        with self._lock:
+            rows = self._connection.execute(
+                """SELECT response, embedding FROM responses
+                   WHERE settings_hash = ? AND embedding IS NOT NULL
+                   ORDER BY last_used DESC LIMIT ?""",
+                (settings_hash, self.max_scan)
+            ).fetchall()
+        candidates = [(response, np.frombuffer(blob, dtype=np.float32)) for response, blob in rows]
+        return _best_match(candidates, embedding, threshold)
+
+
+class SemanticResponseCache:
+    """Cache in front of a completion call, with hit-rate metrics."""
+
+    def __init__(
+        self,
+        store=None,
+        embed: Optional[Callable[[str], List[float]]] = None,
+        similarity_threshold: float = 0.97
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            store: InMemoryResponseStore or SQLiteResponseStore (default in-memory)
+            embed: Optional embedding function (sync or async) enabling near-duplicate hits
+            similarity_threshold: Minimum cosine similarity for a near-duplicate hit
+        """
+        self.store = store or InMemoryResponseStore()
+        self.embed = embed
+        self.similarity_threshold = similarity_threshold
+        self.requests = 0
+        self.exact_hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+
+    async def invoke(
+        self,
+        prompt: str,
+        settings: dict,
+        complete: Callable[[], Awaitable[str]],
+        use_cache: bool = True
+    ) -> str:
+        """
+        Return a cached response for (prompt, settings) or call ``complete`` and cache it.
+
+        Args:
+            prompt: Fully rendered prompt text
+            settings: Completion settings (temperature, top_p, max_tokens, ...)
+            complete: Coroutine function producing the response on a miss
+            use_cache: False to bypass the cache for this call
+        """
+        self.requests += 1
+        if not use_cache:
+            self.bypassed += 1
+            return await complete()
+
+        key = cache_key(prompt, settings)
+        response = await self._store(self.store.get, key)
+        if response is not None:
+            self.exact_hits += 1
+            return response
+
+        settings_hash = settings_key(settings)
+        embedding = None
+        if self.embed is not None:
+            if inspect.iscoroutinefunction(self.embed):
+                embedding = await self.embed(prompt)
+            else:
+                # A synchronous embedding call (often a network request) must not block the event loop
+                embedding = await asyncio.to_thread(self.embed, prompt)
+                if inspect.isawaitable(embedding):
+                    embedding = await embedding
+            match = await self._store(self.store.nearest, settings_hash, embedding, self.similarity_threshold)
+            if match is not None:
+                self.near_hits += 1
+                return match[0]
+
+        self.misses += 1
+        response = await complete()
+        await self._store(self.store.put, key, settings_hash, response, embedding)
+        return response
+
+    async def _store(self, method: Callable, *args):
+        """Call a store method, in a worker thread if the store blocks, so concurrent invocations keep overlapping."""
+        if getattr(self.store, "blocking", False):
+            return await asyncio.to_thread(method, *args)
+        return method(*args)
+
+    def metrics(self) -> dict:
+        """Hit/miss counters and hit rate over cacheable requests."""
+        cacheable = self.requests - self.bypassed
+        hits = self.exact_hits + self.near_hits
+        return {
+            "requests": self.requests,
+            "exact_hits": self.exact_hits,
+            "near_hits": self.near_hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_rate": round(hits / cacheable, 4) if cacheable else 0.0
+        }
@@ -5,14 +5,18 @@ Shows how to use semantic functions for text processing with Azure OpenAI integr
 """
 
 import os
-from typing import Optional
+import asyncio
+from typing import AsyncIterator, Iterable, List, Optional
 from dotenv import find_dotenv, load_dotenv
 from termcolor import cprint
 
 import semantic_kernel as sk
 from semantic_kernel.connectors.ai import AzureOpenAIConnector
-from semantic_kernel.memory import VolatileMemoryStore
-from semantic_kernel.semantic_functions import PromptTemplate, PromptTemplateConfig
+
+from map_reduce import ChunkResultCache, count_tokens, split_by_token_budget
+from numpy_memory_store import NumpyMemoryStore
+from prompt_registry import LazySkills
+from response_cache import SemanticResponseCache
 
 # Load environment variables
 dotenv_path = find_dotenv()
@@ -22,13 +26,35 @@ load_dotenv()
 class SemanticProcessor:
     """Handles text processing using semantic functions."""
 
-    def __init__(self):
-        """Initialize the semantic processor with Azure OpenAI."""
+    def __init__(
+        self,
+        chunk_tokens: int = 2000,
+        max_parallel_chunks: int = 8,
+        chunk_cache_dir: Optional[str] = "data/chunk_cache",
+        response_cache: Optional[SemanticResponseCache] = None,
+        memory_dir: Optional[str] = "data/memory_store"
+    ):
+        """
+        Initialize the semantic processor with Azure OpenAI.
+
+        Args:
+            chunk_tokens: Inputs longer than this are processed with map-reduce
+            max_parallel_chunks: Maximum concurrent chunk summaries
+            chunk_cache_dir: Directory caching per-chunk summaries, or None
+            response_cache: Cache for completions (default in-memory, exact match)
+            memory_dir: Directory persisting semantic memory collections, or None
+        """
+        self.chunk_tokens = chunk_tokens
+        self.max_parallel_chunks = max_parallel_chunks
+        self.chunk_cache = ChunkResultCache(chunk_cache_dir) if chunk_cache_dir else None
+        self.response_cache = response_cache or SemanticResponseCache()
+
         # Initialize the kernel
         self.kernel = sk.Kernel()
 
         # Configure Azure OpenAI
         deployment = os.getenv("AZURE_OPENAI_DEPLOYMENT", "text-davinci-003")
+        self.deployment = deployment
         endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
         api_key = os.getenv("AZURE_OPENAI_API_KEY")
 
@@ -41,71 +67,234 @@ class SemanticProcessor:
             )
         )
 
-        # Initialize memory
-        memory_store = VolatileMemoryStore()
-        self.kernel.register_memory_store(memory_store)
+        # Initialize memory; collections persisted under memory_dir are reloaded on first use
+        self.memory_store = NumpyMemoryStore(memory_dir)
+        self.kernel.register_memory_store(self.memory_store)
 
-        # Import semantic functions
-        self._import_semantic_functions()
+        # Semantic functions are compiled once per process and registered on first use
+        self.skills = LazySkills(self.kernel, "prompts")
 
-    def _import_semantic_functions(self):
-        """Import semantic functions from prompt templates."""
-        # Import summarize skill
-        self.summarize = self.kernel.import_semantic_skill_from_directory(
-            "prompts", "summarize"
-        )
+    def close(self) -> None:
+        """Persist semantic memory collections to ``memory_dir``; call once on shutdown."""
+        self.memory_store.persist()
 
-        # Import analyze skill
-        self.analyze = self.kernel.import_semantic_skill_from_directory(
-            "prompts", "analyze"
-        )
+    def _create_context(self, text: str, analysis_focus: Optional[str] = None):
+        """Create a fresh context so concurrent functions never share mutable state."""
+        context = self.kernel.create_new_context()
+        context["input"] = text
+
+        if analysis_focus:
+            context["focus"] = analysis_focus
+
+        return context
+
+    async def _invoke(self, skill_name: str, context, use_cache: bool = True, through_cache: bool = True) -> str:
+        """
+        Run a semantic function through the response cache.
+
+        The cache key is the rendered prompt plus the function's completion
+        settings and deployment, so identical requests skip the model call.
+        ``through_cache=False`` calls the model directly, for results the
+        caller caches itself (chunk summaries).
+        """
+        function = self.skills.function(skill_name)
+
+        async def complete() -> str:
+            return str(await self.kernel.run_async(function, input_context=context))
+
+        if not through_cache:
+            return await complete()
+
+        compiled = self.skills.compiled(skill_name)
+        prompt = await self.kernel.prompt_template_engine.render_async(compiled.template, context)
+        settings = dict(vars(compiled.config.completion), deployment=self.deployment)
+        return await self.response_cache.invoke(prompt, settings, complete, use_cache=use_cache)
 
     async def process_text(
         self,
         text: str,
-        analysis_focus: Optional[str] = None
+        analysis_focus: Optional[str] = None,
+        use_cache: bool = True
     ) -> dict:
         """
         Process text using semantic functions.
 
+        Summary and analysis do not depend on each other, so they run
+        concurrently, each with its own context. Inputs longer than
+        ``chunk_tokens`` are handed to ``process_long_text``.
+
         Args:
             text: The input text to process
             analysis_focus: Optional focus areas for analysis
+            use_cache: False to bypass the response cache for this call
 
         Returns:
             Dictionary containing summary and analysis
         """
-        try:
-            # Create context with input
-            context = self.kernel.create_new_context()
-            context["input"] = text
-
-            if analysis_focus:
-                context["focus"] = analysis_focus
-
-            # Generate summary
-            print("\nGenerating summary...")
-            summary_result = await self.kernel.run_async(
-                self.summarize["summarize"],
-                input_context=context
-            )
+        if count_tokens(text) > self.chunk_tokens:
+            return await self.process_long_text(text, analysis_focus, use_cache)
 
-            # Generate analysis
-            print("\nPerforming analysis...")
-            analysis_result = await self.kernel.run_async(
-                self.analyze["analyze"],
-                input_context=context
+        try:
+            print("\nGenerating summary and analysis...")
+            summary_result, analysis_result = await asyncio.gather(
+                self._invoke("summarize", self._create_context(text, analysis_focus), use_cache),
+                self._invoke("analyze", self._create_context(text, analysis_focus), use_cache)
             )
 
             return {
-                "summary": str(summary_result),
-                "analysis": str(analysis_result)
+                "summary": summary_result,
+                "analysis": analysis_result
             }
 
         except Exception as e:
             print(f"\nError processing text: {str(e)}")
             raise
 
+    async def process_long_text(
+        self,
+        text: str,
+        analysis_focus: Optional[str] = None,
+        use_cache: bool = True
+    ) -> dict:
+        """
+        Process a long input with map-reduce.
+
+        The text is split into chunks of at most ``chunk_tokens`` tokens and
+        each chunk is summarized in parallel (map). Partial summaries are then
+        grouped under the same budget and summarized again until one summary
+        remains (reduce), and ``analyze`` runs on that summary. Every
+        summarize call is cached by its input, so after editing one section
+        only that chunk and the reduce steps above it are re-run.
+
+        Args:
+            text: The input text to process
+            analysis_focus: Optional focus areas for analysis
+            use_cache: False to bypass the response cache for this call
+
+        Returns:
+            Dictionary containing summary, analysis and chunk counts
+        """
+        chunks = split_by_token_budget(text, self.chunk_tokens)
+        hits_before = self.chunk_cache.hits if self.chunk_cache else 0
+        print(f"\nSummarizing {len(chunks)} chunks...")
+
+        semaphore = asyncio.Semaphore(self.max_parallel_chunks)
+        summaries = await self._summarize_all(chunks, semaphore, use_cache)
+
+        level = 1
+        while len(summaries) > 1:
+            groups = split_by_token_budget("\n\n".join(summaries), self.chunk_tokens)
+            if len(groups) >= len(summaries):
+                # Summaries no longer shrink when grouped; merge pairwise to guarantee progress
+                groups = ["\n\n".join(summaries[i:i + 2]) for i in range(0, len(summaries), 2)]
+            print(f"Reducing {len(summaries)} partial summaries (level {level})...")
+            summaries = await self._summarize_all(groups, semaphore, use_cache)
+            level += 1
+
+        summary = summaries[0] if summaries else ""
+        print("\nPerforming analysis...")
+        analysis_result = await self._invoke(
+            "analyze", self._create_context(summary, analysis_focus), use_cache
+        )
+
+        return {
+            "summary": summary,
+            "analysis": analysis_result,
+            "chunks": len(chunks),
+            "cached_summaries": (self.chunk_cache.hits - hits_before) if self.chunk_cache else 0
+        }
+
+    async def _summarize_all(
+        self,
+        texts: List[str],
+        semaphore: asyncio.Semaphore,
+        use_cache: bool = True
+    ) -> List[str]:
+        """Summarize texts concurrently, serving unchanged inputs from the chunk cache."""
+        namespace = f"summarize/{self.deployment}"
+
+        async def summarize(text: str) -> str:
+            if use_cache and self.chunk_cache is not None:
+                cached = await asyncio.to_thread(self.chunk_cache.get, namespace, text)
+                if cached is not None:
+                    return cached
+
+            # Summaries are cached once: in the chunk cache when there is one, else in the response cache
+            async with semaphore:
+                result = await self._invoke(
+                    "summarize", self._create_context(text), use_cache, through_cache=self.chunk_cache is None
+                )
+
+            if self.chunk_cache is not None:
+                await asyncio.to_thread(self.chunk_cache.put, namespace, text, result)
+            return result
+
+        return list(await asyncio.gather(*(summarize(text) for text in texts)))
+
+    async def process_many(
+        self,
+        texts: Iterable[str],
+        analysis_focus: Optional[str] = None,
+        concurrency: int = 4
+    ) -> AsyncIterator[tuple]:
+        """
+        Pipeline many documents through summarize and analyze.
+
+        Documents are pulled from ``texts`` only as workers free up: a bounded
+        queue of ``concurrency`` items sits between the reader and the
+        workers, so a large or lazy input is never read far ahead of
+        processing. Results go through a queue of the same size, so workers
+        pause when the caller stops consuming instead of buffering every
+        finished document.
+
+        Args:
+            texts: Documents to process; may be a lazy iterable
+            analysis_focus: Optional focus areas for analysis
+            concurrency: Maximum number of documents processed at once
+
+        Yields:
+            (index, result) tuples as documents complete, where result is the
+            process_text dictionary or the exception raised for that document
+        """
+        queue = asyncio.Queue(maxsize=concurrency)
+        results = asyncio.Queue(maxsize=concurrency)
+
+        async def produce():
+            try:
+                for index, text in enumerate(texts):
+                    await queue.put((index, text))
+            finally:
+                for _ in range(concurrency):
+                    await queue.put(None)
+
+        async def work():
+            while (item := await queue.get()) is not None:
+                index, text = item
+                try:
+                    result = await self.process_text(text, analysis_focus)
+                except Exception as e:
+                    result = e
+                await results.put((index, result))
+            await results.put(None)
+
+        producer = asyncio.create_task(produce())
+        tasks = [producer] + [asyncio.create_task(work()) for _ in range(concurrency)]
+
+        try:
+            finished = 0
+            while finished < concurrency:
+                item = await results.get()
+                if item is None:
+                    finished += 1
+                else:
+                    yield item
+
+            # Surface errors raised while reading the input
+            await producer
+        finally:
+            for task in tasks:
+                task.cancel()
+
 async def main():
     """Main function demonstrating semantic function usage."""
     # Initialize processor
@@ -135,13 +324,15 @@ async def main():
         print("\nAnalysis:")
         print(results["analysis"])
 
+        print(f"\nResponse cache: {processor.response_cache.metrics()}")
+
     except Exception as e:
         print(f"\nError in main: {str(e)}")
         raise
+    finally:
+        processor.close()
 
 if __name__ == "__main__":
-    import asyncio
-
     try:
         asyncio.run(main())
     except Exception as e:
@@ -0,0 +1,70 @@
+"""
+Tests for the NumPy memory store and its on-disk persistence.
+
+Run with:
+    python -m pytest test_numpy_memory_store.py
+"""
+
+import asyncio
+import json
+import os
+
+import numpy as np
+from semantic_kernel.memory.memory_record import MemoryRecord
+
+from numpy_memory_store import MANIFEST_FILE, NumpyMemoryStore
+
+
+def record(id: str, embedding) -> MemoryRecord:
+    return MemoryRecord(
+        is_reference=False,
+        external_source_name=None,
+        id=id,
+        description=None,
+        text=f"text {id}",
+        additional_metadata=None,
+        embedding=np.asarray(embedding, dtype=np.float32)
+    )
+
+
+def nearest(store: NumpyMemoryStore, embedding) -> str:
+    match, _ = asyncio.run(store.get_nearest_match_async("docs", np.asarray(embedding, dtype=np.float32)))
+    return match._id
+
+
+def test_empty_upsert_is_a_no_op():
+    store = NumpyMemoryStore()
+    asyncio.run(store.create_collection_async("docs"))
+
+    assert asyncio.run(store.upsert_batch_async("docs", [])) == []
+    assert asyncio.run(store.get_nearest_matches_async("docs", np.ones(2), 1)) == []
+
+
+def test_persisted_collection_reloads(tmp_path):
+    store = NumpyMemoryStore(str(tmp_path))
+    asyncio.run(store.create_collection_async("docs"))
+    asyncio.run(store.upsert_batch_async("docs", [record("a", [1, 0]), record("b", [0, 1])]))
+    store.persist()
+    asyncio.run(store.remove_async("docs", "a"))
+    store.persist()
+
+    reloaded = NumpyMemoryStore(str(tmp_path))
+
+    assert nearest(reloaded, [1, 0.1]) == "b"
+    assert sorted(os.listdir(tmp_path / "docs")) == sorted([MANIFEST_FILE, "embeddings.2.npy", "records.2.jsonl"])
+
+
+def test_unfinished_persist_leaves_the_previous_version_readable(tmp_path):
+    store = NumpyMemoryStore(str(tmp_path))
+    asyncio.run(store.create_collection_async("docs"))
+    asyncio.run(store.upsert_batch_async("docs", [record("a", [1, 0])]))
+    store.persist()
+
+    # A crash after writing the next version's data but before the manifest was replaced
+    np.save(tmp_path / "docs" / "embeddings.2.npy", np.zeros((3, 2), dtype=np.float32))
+    (tmp_path / "docs" / "records.2.jsonl").write_text("{}\n")
+
+    reloaded = NumpyMemoryStore(str(tmp_path))
+
+    assert json.loads((tmp_path / "docs" / MANIFEST_FILE).read_text())["version"] == 1
+    assert nearest(reloaded, [1, 0]) == "a"
@@ -0,0 +1,119 @@
+"""
+Tests for the semantic function response cache, using fake completions and embeddings.
+
+Run with:
+    python -m pytest test_response_cache.py
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from response_cache import InMemoryResponseStore, SemanticResponseCache, SQLiteResponseStore
+
+SETTINGS = {"temperature": 0.0, "max_tokens": 100}
+
+
+class FakeCompletion:
+    """Counts completions; each call returns a new response."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def __call__(self) -> str:
+        self.calls += 1
+        return f"response {self.calls}"
+
+
+def embed(prompt: str) -> list:
+    """Bag-of-letters embedding: prompts differing only in case or spacing match exactly."""
+    text = prompt.lower()
+    return [float(text.count(letter)) for letter in "abcdefghijklmnopqrstuvwxyz"]
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return InMemoryResponseStore()
+    return SQLiteResponseStore(str(tmp_path / "responses.sqlite"))
+
+
+def test_exact_hits_reuse_the_response(store):
+    cache = SemanticResponseCache(store)
+    complete = FakeCompletion()
+
+    async def run():
+        first = await cache.invoke("Summarize this", SETTINGS, complete)
+        second = await cache.invoke("Summarize this", SETTINGS, complete)
+        other = await cache.invoke("Summarize this", {**SETTINGS, "temperature": 0.5}, complete)
+        return first, second, other
+
+    assert asyncio.run(run()) == ("response 1", "response 1", "response 2")
+    assert cache.metrics()["exact_hits"] == 1
+    assert cache.metrics()["misses"] == 2
+
+
+def test_near_duplicates_hit_with_an_embedding_function(store):
+    cache = SemanticResponseCache(store, embed=embed, similarity_threshold=0.99)
+    complete = FakeCompletion()
+
+    async def run():
+        await cache.invoke("Summarize this text", SETTINGS, complete)
+        return await cache.invoke("summarize THIS text", SETTINGS, complete)
+
+    assert asyncio.run(run()) == "response 1"
+    assert cache.metrics()["near_hits"] == 1
+
+
+def test_sync_embedding_runs_off_the_event_loop():
+    loop_threads = []
+    embed_threads = []
+
+    def recording_embed(prompt):
+        embed_threads.append(threading.get_ident())
+        return embed(prompt)
+
+    async def run():
+        loop_threads.append(threading.get_ident())
+        cache = SemanticResponseCache(embed=recording_embed)
+        await cache.invoke("Summarize this", SETTINGS, FakeCompletion())
+
+    asyncio.run(run())
+    assert embed_threads and embed_threads[0] != loop_threads[0]
+
+
+def test_bypass_skips_the_cache():
+    cache = SemanticResponseCache()
+    complete = FakeCompletion()
+
+    async def run():
+        await cache.invoke("Summarize this", SETTINGS, complete)
+        return await cache.invoke("Summarize this", SETTINGS, complete, use_cache=False)
+
+    assert asyncio.run(run()) == "response 2"
+    assert cache.metrics()["bypassed"] == 1
+
+
+def test_sqlite_store_persists_and_evicts_least_recently_used(tmp_path):
+    path = str(tmp_path / "responses.sqlite")
+    store = SQLiteResponseStore(path, max_entries=2)
+    store.put("a", "s", "response a")
+    store.put("b", "s", "response b")
+    store.get("a")
+    store.put("c", "s", "response c")
+
+    reopened = SQLiteResponseStore(path, max_entries=2)
+
+    assert reopened.get("a") == "response a"
+    assert reopened.get("b") is None
+    assert reopened.get("c") == "response c"
+
+
+def test_sqlite_nearest_scans_only_recent_rows(tmp_path):
+    store = SQLiteResponseStore(str(tmp_path / "responses.sqlite"), max_scan=1)
+    store.put("old", "s", "old response", embed("alpha"))
+    store.put("new", "s", "new response", embed("omega"))
+
+    assert store.nearest("s", embed("omega"), 0.99) == ("new response", pytest.approx(1.0))
+    assert store.nearest("s", embed("alpha"), 0.99) is None